@@ -1,16 +1,24 @@
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 
-from langgraph_tool_node import tool_node
-from langgraph_score_node import score_products
+from langgraph_tool_node import tool_mapping, make_parse_branch
+from langgraph_score_node import score_products, SCORING_MODE, SALES_WINDOW
 from langgraph_output_node import generate_output
+from node_cache import memoize_node
+from tools.instrumentation import instrument_node
 
 # Define the graph and its state
-from typing import TypedDict, List, Dict, Any, Optional, Tuple
+from typing import TypedDict, List, Dict, Any, Optional, Tuple, Annotated, Sequence, Mapping
+
+
+def merge_dicts(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer letting parallel branches each contribute their own keys."""
+    return {**(left or {}), **(right or {})}
+
 
 class State(TypedDict, total=False):
     store_id: str
     college_profile_data: Dict[str, Any]
-    vendor_data: List[Dict[str, Any]]
+    vendor_data: Sequence[Mapping[str, Any]]  # VendorCatalogColumns or a list of product dicts
     sales_data: Dict[str, Any]
     survey_data: Dict[str, Any]
     trend_data: Dict[str, Any]
@@ -19,20 +27,47 @@ class State(TypedDict, total=False):
     final_output: Dict[str, Any]
     file_inputs: Dict[str, str]
     user_feedback: str
+    scoring_mode: str
+    sales_window: str
+    sales_delta: bool  # Fold the sales file into the store's running aggregates
+    parser_timeouts: Dict[str, float]
+    state_handoff: str
+    parse_timings: Annotated[Dict[str, Dict[str, Any]], merge_dicts]
+    input_digests: Annotated[Dict[str, Optional[str]], merge_dicts]
 
 workflow = StateGraph(State)
 
 
-# Add nodes
-workflow.add_node("parse_files", tool_node)
-workflow.add_node("score_products", score_products)
-workflow.add_node("generate_output", generate_output)
+# Add nodes: one branch per parser, all started together and joined before scoring
+parse_nodes = []
+for key, tool_name in tool_mapping:
+    node_name = f"parse_{key}"
+    workflow.add_node(node_name, instrument_node(node_name)(make_parse_branch(key, tool_name)))
+    workflow.add_edge(START, node_name)
+    parse_nodes.append(node_name)
+
+# Scoring and output are memoized on the digests of the parsed inputs they read plus their parameters,
+# with unset parameters keyed by the env defaults score_products falls back to.
+# Instrumentation wraps the memo, so checkpoint hits show up as fast node runs.
+scored_inputs = ["vendor", "sales", "survey", "trend", "college_profile", "competitor"]
+score_params = {"scoring_mode": SCORING_MODE, "sales_window": SALES_WINDOW}
+workflow.add_node(
+    "score_products",
+    instrument_node("score_products")(
+        memoize_node("score_products", scored_inputs, param_keys=score_params, version=2)(score_products)
+    ),
+)
+workflow.add_node(
+    "generate_output",
+    instrument_node("generate_output")(
+        memoize_node("generate_output", scored_inputs, param_keys={**score_params, "store_id": None}, version=2)(generate_output)
+    ),
+)
 
 # Define flow
-workflow.set_entry_point("parse_files")
-workflow.add_edge("parse_files", "score_products")
+workflow.add_edge(parse_nodes, "score_products")
 workflow.add_edge("score_products", "generate_output")
 workflow.add_edge("generate_output", END)
 
 # Compile into executable workflow
-assortment_workflow = workflow.compile()
\ No newline at end of file
+assortment_workflow = workflow.compile()
@@ -0,0 +1,373 @@
+"""
+Headless batch runner: regenerates the assortment of every store in a directory of bundles.
+
+    python app/batch_runner.py stores/ --vendor vendor_catalog.csv --workers 8
+
+Each subdirectory of ``stores/`` is one store's bundle, holding the same files the
+Streamlit app uploads (see BUNDLE_FILES). A bundle may carry a daily POS delta as
+sales_delta.csv instead of sales_data.csv; it is folded into the store's running aggregates
+(tools/sales_aggregator.py), which the sales windows read. The shared vendor catalog is parsed once in
+this process and handed to every worker, so stores only parse their own inputs. A
+bundle's own vendor_catalog.csv, if any, takes precedence over the shared one.
+
+With ``--sales-cube export.csv`` a multi-store sales export replaces per-bundle sales
+files: it is aggregated once into a store x season x product cube (tools/sales_cube.py),
+each store reads its own slice, and stores without sales read the average of their most
+similar stores.
+
+With ``--matrix`` the workflow is not run per store: each store's inputs are parsed, then
+every store is scored against the shared catalog in one (stores x products) matrix pass
+(app/batch_scoring.py), giving the same assortments.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from AssortmentEngineLanggraph import assortment_workflow
+from batch_scoring import score_stores
+from langgraph_tool_node import DEFAULT_PARSER_TIMEOUTS, input_digest, run_parser, tool_mapping
+from tools.sales_aggregator import SALES_WINDOWS
+from tools.sales_cube import load_profiles, open_cube
+from tools.wrapped_tools import PARSERS
+
+# File name of each input inside a store bundle, as written by the Streamlit upload step
+BUNDLE_FILES = {
+    "vendor": "vendor_catalog.csv",
+    "sales": "sales_data.csv",
+    "survey": "survey_feedback.txt",
+    "trend": "trend_data.txt",
+    "college_profile": "college_profile.json",
+    "competitor": "competitor_data.csv",
+}
+# A bundle's sales file when it is a daily POS delta to fold rather than a full export
+SALES_DELTA_FILE = "sales_delta.csv"
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", os.cpu_count() or 1))
+OUTPUT_FOLDER = "outputs"
+
+# Set once per worker process by _init_worker
+_shared_vendor = None
+_shared_cube = None
+
+
+def find_bundles(bundles_dir: str) -> list:
+    """
+    Lists the store bundles under ``bundles_dir``.
+
+    Returns:
+        List[dict]: Per bundle, sorted by directory name: "store_id" (the college profile's
+        store_id, else the directory name), "file_inputs" (input key -> path) and
+        "sales_delta" (whether the sales input is a SALES_DELTA_FILE).
+
+    Raises:
+        ValueError: When a bundle has both a sales file and a sales delta, or when two
+            bundles resolve to the same store_id (their outputs would overwrite each other).
+    """
+    bundles = []
+    directories = {}
+    for entry in sorted(os.scandir(bundles_dir), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        file_inputs = {
+            key: os.path.join(entry.path, name)
+            for key, name in BUNDLE_FILES.items()
+            if os.path.isfile(os.path.join(entry.path, name))
+        }
+        sales_delta = os.path.isfile(os.path.join(entry.path, SALES_DELTA_FILE))
+        if sales_delta:
+            if "sales" in file_inputs:
+                raise ValueError(f"Bundle {entry.path} has both {BUNDLE_FILES['sales']} and {SALES_DELTA_FILE}")
+            file_inputs["sales"] = os.path.join(entry.path, SALES_DELTA_FILE)
+        if not file_inputs:
+            continue
+        store_id = entry.name
+        if "college_profile" in file_inputs:
+            try:
+                with open(file_inputs["college_profile"], "r", encoding="utf-8") as f:
+                    store_id = json.load(f).get("store_id") or store_id
+            except (OSError, ValueError):
+                pass
+        if store_id in directories:
+            raise ValueError(f"Bundles {directories[store_id]} and {entry.path} both have store_id {store_id!r}")
+        directories[store_id] = entry.path
+        bundles.append({"store_id": store_id, "file_inputs": file_inputs, "sales_delta": sales_delta})
+    return bundles
+
+
+def _init_worker(shared_vendor, shared_cube=None):
+    global _shared_vendor, _shared_cube
+    _shared_vendor = shared_vendor
+    _shared_cube = shared_cube
+
+
+def cube_sales(cube, bundle: dict):
+    """
+    Sales of a bundle's store from the cube: its own slice, or its similar stores' average,
+    in the profile's season when the cube has sales for it.
+
+    Returns:
+        Tuple[CubeSlice, List[str], Optional[str]]: The sales, the store ids read and the input digest.
+    """
+    profile = {"store_id": bundle["store_id"]}
+    if "college_profile" in bundle["file_inputs"]:
+        profile = PARSERS["college_profile"](bundle["file_inputs"]["college_profile"])
+    sales, sources = cube.sales_for(profile)
+    digest = f"sales-cube:{cube.key}:{profile.get('season')}:{','.join(map(str, sources))}" if cube.key else None
+    return sales, sources, digest
+
+
+def output_name(store_id: str) -> str:
+    """
+    File name stem for a store's output. Store ids come from the bundles' profiles, so
+    anything but letters, digits, "_", "." and "-" is replaced (no "../" escapes), and a
+    digest of the raw id keeps sanitized ids from colliding.
+    """
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(store_id)).strip("._") or "store"
+    if slug != str(store_id):
+        slug = f"{slug}-{hashlib.sha256(str(store_id).encode('utf-8')).hexdigest()[:8]}"
+    return slug
+
+
+def write_output(store_id: str, final_output: dict, output_dir: str, output_format: str) -> str:
+    """Writes a store's final products (and rationale, for JSON) to ``output_dir``."""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{output_name(store_id)}_assortment.{output_format}")
+    if output_format == "json":
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"store_id": store_id, **final_output}, f, indent=2)
+    else:
+        pd.DataFrame(final_output["products"], columns=["Product", "Score"]).to_csv(path, index=False)
+    return path
+
+
+def run_store(bundle: dict, output_dir: str = OUTPUT_FOLDER, output_format: str = "csv",
+              scoring_mode: str = None, sales_window: str = None) -> dict:
+    """
+    Runs the workflow for one store bundle and writes its output.
+
+    Returns:
+        Dict[str, any]: "store_id", "status" ("ok" or "error"), "seconds", and "output"
+        (the written path) or "error"; "sales_from" lists the stores a cold start borrowed sales from.
+    """
+    start = time.perf_counter()
+    store_id = bundle["store_id"]
+    file_inputs = dict(bundle["file_inputs"])
+    state = {"store_id": store_id, "input_digests": {}}
+    result = {}
+    if scoring_mode:
+        state["scoring_mode"] = scoring_mode
+    if sales_window:
+        state["sales_window"] = sales_window
+    if bundle.get("sales_delta"):
+        state["sales_delta"] = True
+
+    # The shared catalog replaces the vendor parse branch (it skips inputs it is not given)
+    if "vendor" not in file_inputs and _shared_vendor is not None:
+        state["vendor_data"] = _shared_vendor["data"]
+        state["input_digests"]["vendor"] = _shared_vendor["digest"]
+
+    try:
+        # Likewise the cube slice replaces the sales branch
+        if "sales" not in file_inputs and _shared_cube is not None:
+            state["sales_data"], sources, state["input_digests"]["sales"] = cube_sales(_shared_cube, bundle)
+            if sources != [store_id]:
+                result["sales_from"] = sources
+        final_state = assortment_workflow.invoke({**state, "file_inputs": file_inputs})
+        path = write_output(store_id, final_state["final_output"], output_dir, output_format)
+        result.update({"status": "ok", "output": path})
+    except Exception as e:
+        traceback.print_exc()
+        result.update({"status": "error", "error": str(e)})
+    return {"store_id": store_id, **result, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def parse_store(bundle: dict, sales_window: str = None) -> dict:
+    """
+    Parses a bundle's inputs, except the shared vendor catalog, into a partial state for
+    score_stores. Like the graph's parse branches, a failed parser degrades to an empty result.
+    """
+    state = {"store_id": bundle["store_id"]}
+    if sales_window:
+        state["sales_window"] = sales_window
+    if "sales" not in bundle["file_inputs"] and _shared_cube is not None:
+        state["sales_data"], sources, _ = cube_sales(_shared_cube, bundle)
+        if sources != [bundle["store_id"]]:
+            state["sales_from"] = sources
+    for key, tool_name in tool_mapping:
+        if key != "vendor" and key in bundle["file_inputs"]:
+            state[f"{key}_data"], _ = run_parser(
+                key, tool_name, bundle["file_inputs"][key], DEFAULT_PARSER_TIMEOUTS[key],
+                store_id=bundle["store_id"], sales_delta=bundle.get("sales_delta", False),
+            )
+    return state
+
+
+def _timed_parse(bundle: dict, sales_window: str = None) -> dict:
+    start = time.perf_counter()
+    try:
+        parsed = {"state": parse_store(bundle, sales_window)}
+    except Exception as e:
+        traceback.print_exc()
+        parsed = {"error": str(e)}
+    return {**parsed, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def run_matrix(bundles: list, workers: int, output_dir: str, output_format: str, sales_window: str = None) -> list:
+    """
+    Parses every bundle across a thread pool, then scores all stores in one matrix pass
+    against the shared catalog (see _init_worker) and writes their outputs.
+
+    Returns:
+        List[dict]: Per store, shaped like run_store's result; "seconds" covers its parse.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        parsed = list(pool.map(lambda bundle: _timed_parse(bundle, sales_window), bundles))
+
+    ok = [store for store in parsed if "state" in store]
+    print(f"🧮 Scoring {len(ok)} stores in one matrix pass")
+    scored = iter(score_stores(_shared_vendor["data"], [store["state"] for store in ok]))
+    results = []
+    for bundle, store in zip(bundles, parsed):
+        result = {"store_id": bundle["store_id"]}
+        if "error" in store:
+            result.update({"status": "error", "error": store["error"]})
+        else:
+            final_output = next(scored)["final_output"]
+            path = write_output(bundle["store_id"], final_output, output_dir, output_format)
+            result.update({"status": "ok", "output": path})
+            if "sales_from" in store["state"]:
+                result["sales_from"] = store["state"]["sales_from"]
+        results.append({**result, "seconds": store["seconds"]})
+        print(f"  {result['store_id']}: {result['status']} (parsed in {store['seconds']}s)")
+    return results
+
+
+def run_batch(bundles_dir: str, vendor_path: str = None, workers: int = BATCH_WORKERS,
+              output_dir: str = OUTPUT_FOLDER, output_format: str = "csv", scoring_mode: str = None,
+              sales_window: str = None, sales_cube_path: str = None, matrix: bool = False) -> dict:
+    """
+    Runs every store bundle under ``bundles_dir`` across a process pool.
+
+    Args:
+        bundles_dir (str): Directory with one subdirectory per store.
+        vendor_path (str, optional): Shared vendor catalog; defaults to ``bundles_dir``/vendor_catalog.csv
+            when that file exists.
+        workers (int): Worker processes; 1 runs every store in this process.
+        output_dir (str): Where each store's output file is written.
+        output_format (str): "csv" (Product, Score) or "json" (products and rationale).
+        scoring_mode (str, optional): Overrides SCORING_MODE for every store.
+        sales_window (str, optional): Overrides SALES_WINDOW for every store.
+        sales_cube_path (str, optional): Multi-store sales export; stores without their own
+            sales file score against its cube (their slice, or similar stores' for a cold start).
+
+    Returns:
+        Dict[str, any]: Summary with per-store "results", counts, "seconds" and "stores_per_minute".
+    """
+    start = time.perf_counter()
+    bundles = find_bundles(bundles_dir)
+
+    if vendor_path is None and os.path.isfile(os.path.join(bundles_dir, BUNDLE_FILES["vendor"])):
+        vendor_path = os.path.join(bundles_dir, BUNDLE_FILES["vendor"])
+    shared_vendor = None
+    if vendor_path:
+        vendor_start = time.perf_counter()
+        shared_vendor = {"data": PARSERS["vendor"](vendor_path), "digest": input_digest("vendor", vendor_path)}
+        print(f"📦 Parsed shared vendor catalog in {time.perf_counter() - vendor_start:.2f}s")
+
+    shared_cube = None
+    if sales_cube_path:
+        cube_start = time.perf_counter()
+        profiles = load_profiles(
+            [b["file_inputs"]["college_profile"] for b in bundles if "college_profile" in b["file_inputs"]]
+        )
+        shared_cube = open_cube(sales_cube_path, profiles)
+        print(f"🧊 Loaded sales cube in {time.perf_counter() - cube_start:.2f}s")
+
+    missing = [b["store_id"] for b in bundles if "vendor" not in b["file_inputs"] and shared_vendor is None]
+    if missing:
+        raise ValueError(f"No vendor catalog for stores {missing}; pass --vendor or add one to each bundle")
+
+    if matrix:
+        if shared_vendor is None or any("vendor" in b["file_inputs"] for b in bundles):
+            raise ValueError("Matrix scoring needs one shared vendor catalog and no per-bundle catalogs")
+        if scoring_mode == "reference":
+            raise ValueError("Matrix scoring is vectorized; it cannot use the reference scoring mode")
+
+    print(f"🚀 Running {len(bundles)} stores with {workers} worker(s)")
+    results = []
+    if matrix:
+        _init_worker(shared_vendor, shared_cube)
+        results = run_matrix(bundles, workers, output_dir, output_format, sales_window)
+    elif workers <= 1:
+        _init_worker(shared_vendor, shared_cube)
+        for bundle in bundles:
+            results.append(run_store(bundle, output_dir, output_format, scoring_mode, sales_window))
+            print(f"  {results[-1]['store_id']}: {results[-1]['status']} in {results[-1]['seconds']}s")
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared_vendor, shared_cube)) as pool:
+            futures = [pool.submit(run_store, bundle, output_dir, output_format, scoring_mode, sales_window)
+                       for bundle in bundles]
+            for future in as_completed(futures):
+                results.append(future.result())
+                print(f"  {results[-1]['store_id']}: {results[-1]['status']} in {results[-1]['seconds']}s")
+
+    seconds = time.perf_counter() - start
+    succeeded = sum(1 for r in results if r["status"] == "ok")
+    return {
+        "stores": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "workers": workers,
+        "seconds": round(seconds, 3),
+        "stores_per_minute": round(len(results) / seconds * 60, 2) if seconds else None,
+        "results": sorted(results, key=lambda r: r["store_id"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate assortments for every store bundle in a directory.")
+    parser.add_argument("bundles_dir", help="Directory with one subdirectory of input files per store")
+    parser.add_argument("--vendor", default=None, help="Shared vendor catalog CSV (default: <bundles_dir>/vendor_catalog.csv)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--output-dir", default=OUTPUT_FOLDER)
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("--scoring-mode", choices=["vectorized", "reference"], default=None)
+    parser.add_argument("--sales-window", choices=list(SALES_WINDOWS), default=None,
+                        help=f"Sales signal for scoring; windows need a {SALES_DELTA_FILE} in the bundles")
+    parser.add_argument("--sales-cube", default=None,
+                        help="Multi-store sales export (Store ID, name, units[, Date]) used for bundles without sales")
+    parser.add_argument("--matrix", action="store_true",
+                        help="Parse each store, then score every store against the shared catalog in one matrix pass")
+    args = parser.parse_args()
+
+    summary = run_batch(
+        args.bundles_dir, args.vendor, args.workers, args.output_dir, args.format, args.scoring_mode, args.sales_window,
+        args.sales_cube, args.matrix
+    )
+
+    summary_path = os.path.join(args.output_dir, "batch_summary.json")
+    os.makedirs(args.output_dir, exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    print(
+        f"✅ {summary['succeeded']}/{summary['stores']} stores in {summary['seconds']:.1f}s "
+        f"({summary['stores_per_minute']} stores/min, {summary['workers']} workers); summary: {summary_path}"
+    )
+    for result in summary["results"]:
+        if result["status"] != "ok":
+            print(f"❌ {result['store_id']}: {result['error']}")
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tools.parse_vendor_catalog import load_vendor_catalog
+from langgraph_score_node import SALES_WINDOW, sales_field, scoring_inputs
+from langgraph_output_node import generate_output, parse_tool_content
+from scoring_engine import encode_catalog, align_sales, price_bonus, raw_score_matrix, round_scores, rank_products
+
+# Upper bound on (stores x products) cells scored per vectorized step, to bound peak memory
+MAX_CELLS_PER_STEP = 4_000_000
+
+
+def score_stores(vendor_data, stores, top_k=20, encoding=None):
+    """
+    Scores one shared catalog against many stores in vectorized (stores x products) steps.
+
+    Args:
+        vendor_data (Union[List[dict], VendorCatalogColumns]): Parsed vendor catalog,
+            shared by every store.
+        stores (List[dict]): One partial state per store with "college_profile_data"
+            (a parse_college_profile output) and optionally "store_id" (else the profile's),
+            "sales_data", "sales_window", "trend_data", "survey_data" and "competitor_data".
+        top_k (int): Number of products kept per store (generate_output keeps at most 20).
+        encoding (CatalogEncoding, optional): Pre-built encoding of ``vendor_data``.
+
+    Returns:
+        List[dict]: Per store, in input order: "store_id", "scored_products" (top_k) and
+        "final_output" exactly as a single-store run's generate_output would produce.
+
+    Raises:
+        ValueError: When a store has no store_id, in its state or its profile.
+    """
+    store_ids = []
+    for index, store in enumerate(stores):
+        profile = parse_tool_content(store.get("college_profile_data", {}))
+        store_id = store.get("store_id") or profile.get("store_id")
+        if not store_id:
+            raise ValueError(f"Store {index} has no store_id in its state or college profile")
+        store_ids.append(store_id)
+
+    if encoding is None:
+        encoding = encode_catalog(vendor_data)
+
+    inputs = [scoring_inputs(store) for store in stores]
+    # Each store's sales signal, resolved the way score_products does
+    fields = [
+        sales_field(sales_data, store.get("sales_window") or SALES_WINDOW)
+        for store, (_, sales_data, _, _, _, _) in zip(stores, inputs)
+    ]
+    step = max(1, MAX_CELLS_PER_STEP // max(len(encoding), 1))
+    results = []
+
+    for start in range(0, len(stores), step):
+        chunk = inputs[start:start + step]
+        sales = np.stack([
+            align_sales(encoding, sales_data, field)
+            for (_, sales_data, _, _, _, _), field in zip(chunk, fields[start:start + step])
+        ])
+        price_terms = None
+        if any(price_index for _, _, _, _, _, price_index in chunk):
+            price_terms = np.stack([price_bonus(encoding, price_index) for _, _, _, _, _, price_index in chunk])
+        scores = round_scores(raw_score_matrix(
+            encoding,
+            sales,
+            [store_themes for _, _, store_themes, _, _, _ in chunk],
+            [trend for _, _, _, trend, _, _ in chunk],
+            [survey for _, _, _, _, survey, _ in chunk],
+            price_terms,
+        ))
+
+        for offset, row in enumerate(scores):
+            store = stores[start + offset]
+            store_id = store_ids[start + offset]
+            top_products = rank_products(encoding.names, row, top_k)
+            output = generate_output({**store, "store_id": store_id, "scored_products": top_products})
+            results.append({
+                "store_id": store_id,
+                "scored_products": top_products,
+                "final_output": output["final_output"],
+            })
+
+    return results
+
+
+def score_vendor_file(vendor_file, stores, top_k=20):
+    """Parses the vendor catalog once and scores every store against it."""
+    vendor_data = load_vendor_catalog(vendor_file, columnar=True)
+    return score_stores(vendor_data, stores, top_k=top_k)
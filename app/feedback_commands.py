@@ -0,0 +1,245 @@
+import difflib
+import re
+import threading
+from collections import OrderedDict
+
+from langgraph_output_node import parse_tool_content
+
+_VERBS = r"(?:add|include|remove|delete|drop|swap|replace|move|bump|prioritize)"
+# Splits "add lamp and remove desk" / "add lamp, then remove desk" into single commands
+_CLAUSE_SPLIT = re.compile(rf"\s*(?:;|,|\band\b|\bthen\b)+\s*(?={_VERBS}\b)", re.IGNORECASE)
+_FILLER = r"(?:please\s+|can\s+you\s+|could\s+you\s+)?"
+_ARTICLE = r"(?:the\s+|a\s+|an\s+|some\s+)?"
+
+_COMMANDS = [
+    ("swap", re.compile(rf"^{_FILLER}(?:swap|replace)\s+{_ARTICLE}(.+?)\s+(?:with|for|by)\s+{_ARTICLE}(.+)$", re.I)),
+    ("move_top", re.compile(rf"^{_FILLER}(?:move|bump)\s+{_ARTICLE}(.+?)\s+to\s+(?:the\s+)?top$", re.I)),
+    ("move_top", re.compile(rf"^{_FILLER}prioritize\s+{_ARTICLE}(.+)$", re.I)),
+    ("move_up", re.compile(rf"^{_FILLER}(?:move|bump)\s+up\s+{_ARTICLE}(.+?)(?:\s+by\s+(\d+))?$", re.I)),
+    ("move_up", re.compile(rf"^{_FILLER}(?:move|bump)\s+{_ARTICLE}(.+?)\s+up(?:\s+by\s+(\d+))?$", re.I)),
+    ("remove", re.compile(rf"^{_FILLER}(?:remove|delete|drop)\s+{_ARTICLE}(.+)$", re.I)),
+    ("add", re.compile(rf"^{_FILLER}(?:add|include)\s+{_ARTICLE}(.+)$", re.I)),
+]
+_TRAILING = re.compile(r"(?:\s+(?:from|to|in|into)\s+(?:the\s+)?(?:list|assortment|products|recommendations))?[\s.!]*$", re.I)
+
+FUZZY_CUTOFF = 0.85
+
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase, punctuation-free, singular stem used to compare product names."""
+    words = re.findall(r"[a-z0-9]+", str(text).lower())
+    singular = []
+    for word in words:
+        # "batteries"/"battery" and "hoodies"/"hoodie" both end up as "...ie"
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-1]
+        elif len(word) > 3 and word.endswith("y") and word[-2] not in "aeiou":
+            word = word[:-1] + "ie"
+        elif len(word) > 3 and word.endswith("es") and word[-3] in "sxz":
+            word = word[:-2]
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        singular.append(word)
+    return " ".join(singular)
+
+
+class ProductNameIndex:
+    """Resolves free-text product references to catalog names: exact, normalized, then fuzzy."""
+
+    def __init__(self, names):
+        self.names = list(dict.fromkeys(n for n in names if isinstance(n, str)))
+        self.by_normalized = {}
+        for name in self.names:
+            self.by_normalized.setdefault(normalize_name(name), []).append(name)
+
+    def resolve(self, text: str, candidates=None):
+        """
+        Returns (name, None) when ``text`` names exactly one product, else (None, reason).
+        ``candidates`` restricts the search (e.g. to the products currently recommended).
+        """
+        text = text.strip().strip("'\"")
+        pool = self.names if candidates is None else [n for n in candidates if isinstance(n, str)]
+        if text in pool:
+            return text, None
+
+        query = normalize_name(text)
+        if not query:
+            return None, "empty product name"
+        pool_set = set(pool)
+        if candidates is None:
+            matches = self.by_normalized.get(query, [])
+        else:
+            matches = [n for n in pool if normalize_name(n) == query]
+        matches = [n for n in matches if n in pool_set]
+        if len(matches) == 1:
+            return matches[0], None
+        if len(matches) > 1:
+            return None, f"'{text}' matches several products"
+
+        # Every query word appears in the name, e.g. "lamp" -> "LED Desk Lamp"
+        query_words = set(query.split())
+        contained = [n for n in pool if query_words <= set(normalize_name(n).split())]
+        if len(contained) == 1:
+            return contained[0], None
+        if len(contained) > 1:
+            return None, f"'{text}' matches several products"
+
+        normalized_pool = {}
+        for name in pool:
+            normalized_pool.setdefault(normalize_name(name), []).append(name)
+        close = difflib.get_close_matches(query, list(normalized_pool), n=2, cutoff=FUZZY_CUTOFF)
+        if len(close) == 1 and len(normalized_pool[close[0]]) == 1:
+            return normalized_pool[close[0]][0], None
+        return None, f"could not resolve '{text}'"
+
+
+def _catalog_names(vendor_data):
+    if hasattr(vendor_data, "names"):
+        return vendor_data.names.tolist()
+    return [product.get("name") for product in vendor_data or []]
+
+
+def get_name_index(state: dict) -> ProductNameIndex:
+    vendor_data = parse_tool_content(state.get("vendor_data", []))
+    key = id(vendor_data)
+    with _index_lock:
+        cached = _index_cache.get(key)
+        if cached is not None and cached[0] is vendor_data:
+            return cached[1]
+    index = ProductNameIndex(_catalog_names(vendor_data))
+    with _index_lock:
+        _index_cache[key] = (vendor_data, index)
+        while len(_index_cache) > 8:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def parse_commands(feedback: str):
+    """Splits feedback into (intent, args) commands, or None if any clause is not a plain command."""
+    commands = []
+    for clause in _CLAUSE_SPLIT.split(feedback.strip()):
+        clause = _TRAILING.sub("", clause.strip())
+        if not clause:
+            continue
+        for intent, pattern in _COMMANDS:
+            match = pattern.match(clause)
+            if match:
+                commands.append((intent, [g for g in match.groups()]))
+                break
+        else:
+            return None
+    return commands or None
+
+
+def _insert_by_score(products, entry):
+    """Inserts after every product scoring at least as high, keeping the list ranked."""
+    for position, (_, score) in enumerate(products):
+        if score < entry[1]:
+            return products[:position] + [entry] + products[position:]
+    return products + [entry]
+
+
+def _scored_entries(products, scores):
+    """
+    Normalizes an output's products to (name, score) pairs. An LLM-revised output may list
+    bare names or {"name": ...} dicts; their scores come from ``scores``.
+
+    Returns:
+        Optional[list]: The pairs, or None when an entry's shape or score is unknown.
+    """
+    entries = []
+    for product in products:
+        if isinstance(product, str):
+            name, score = product, None
+        elif isinstance(product, dict):
+            name, score = product.get("name", product.get("product")), product.get("score")
+        elif isinstance(product, (list, tuple)) and len(product) == 2:
+            name, score = product
+        else:
+            return None
+        if not isinstance(name, str):
+            return None
+        score = scores.get(name, score)
+        if isinstance(score, bool) or not isinstance(score, (int, float)):
+            return None
+        entries.append((name, score))
+    return entries
+
+
+def interpret_feedback(state: dict, final_output: dict, feedback: str):
+    """
+    Applies explicit add / remove / swap / move-up commands locally.
+
+    Args:
+        state (dict): Final graph state (vendor catalog and full scored_products).
+        final_output (dict): Current output with 'products' and 'rationale'.
+        feedback (str): Planner feedback.
+
+    Returns:
+        Optional[dict]: Updated {"products", "rationale"} (the current rationale followed by
+        a note per command), or None when the feedback is a question, is not a plain command,
+        names a product ambiguously, or the current products are not in a recognized shape
+        (use the LLM).
+    """
+    commands = parse_commands(feedback)
+    if commands is None:
+        return None
+
+    index = get_name_index(state)
+    scores = dict(state.get("scored_products", []))
+    products = _scored_entries(final_output.get("products", []), scores)
+    if products is None:
+        return None
+    notes = []
+
+    def current_names():
+        return [name for name, _ in products]
+
+    def rescored(name):
+        return (name, scores[name]) if name in scores else None
+
+    for intent, args in commands:
+        if intent == "add":
+            name, _ = index.resolve(args[0])
+            if name is None or rescored(name) is None:
+                return None
+            if name in current_names():
+                notes.append(f"{name} is already in the list.")
+                continue
+            products = _insert_by_score(products, rescored(name))
+            notes.append(f"Added {name} (score {scores[name]}).")
+
+        elif intent == "remove":
+            name, _ = index.resolve(args[0], candidates=current_names())
+            if name is None:
+                return None
+            products = [p for p in products if p[0] != name]
+            notes.append(f"Removed {name}.")
+
+        elif intent == "swap":
+            old, _ = index.resolve(args[0], candidates=current_names())
+            new, _ = index.resolve(args[1])
+            if old is None or new is None or rescored(new) is None:
+                return None
+            # Drop an existing copy of the new product, then take over the old product's slot
+            products = [p for p in products if p[0] != new or p[0] == old]
+            products[current_names().index(old)] = rescored(new)
+            notes.append(f"Replaced {old} with {new} (score {scores[new]}).")
+
+        else:  # move_up / move_top
+            name, _ = index.resolve(args[0], candidates=current_names())
+            if name is None:
+                return None
+            position = current_names().index(name)
+            steps = position if intent == "move_top" else int(args[1] or 1)
+            target = max(position - steps, 0)
+            entry = products.pop(position)
+            products.insert(target, entry)
+            notes.append(f"Moved {name} to position {target + 1}.")
+
+    # The notes extend the rationale, so an LLM-written rationale survives local edits
+    rationale = final_output.get("rationale") or ""
+    return {"products": products, "rationale": f"{rationale}\n\n{' '.join(notes)}" if rationale else " ".join(notes)}
@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from langgraph_output_node import parse_tool_content
+from tools.llm import estimate_tokens  # Re-exported for feedback_helper
+
+# Token budget for the retrieved context placed in each feedback prompt
+CONTEXT_TOKEN_BUDGET = int(os.getenv("FEEDBACK_CONTEXT_TOKENS", 2000))
+# Number of states whose retrieval index is kept in memory
+INDEX_CACHE_ENTRIES = 8
+
+_STATE_KEYS = ("vendor_data", "sales_data", "survey_data", "trend_data", "college_profile_data", "competitor_data")
+
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def build_documents(state: dict):
+    """
+    Flattens the parsed inputs of a run into short retrievable text slices.
+
+    Returns:
+        Tuple[List[str], List[str]]: (pinned, documents). Pinned slices (college profile,
+        competitor price summary, sentiment summaries) are always sent; documents are retrieved.
+    """
+    pinned = []
+    documents = []
+
+    profile = parse_tool_content(state.get("college_profile_data", {}))
+    if profile:
+        pinned.append(f"College profile: {json.dumps(profile)}")
+
+    competitor = parse_tool_content(state.get("competitor_data", {}))
+    if competitor:
+        pinned.append(
+            "Competitor pricing summary: "
+            f"min ${competitor.get('min_price')}, max ${competitor.get('max_price')}, "
+            f"avg ${round(competitor.get('avg_price', 0.0), 2)}; "
+            f"sources: {', '.join(map(str, competitor.get('sources', [])))}"
+        )
+        price_index = competitor.get("price_index", {})
+        for name in competitor.get("products", []):
+            stats = price_index.get(name)
+            if stats:
+                documents.append(
+                    f"Competitor prices for {name}: min ${stats.get('min_price')}, median "
+                    f"${stats.get('median_price')}, max ${stats.get('max_price')} "
+                    f"across {stats.get('source_count')} sources"
+                )
+            else:
+                documents.append(f"Competitors also sell: {name}")
+
+    # Compact catalogs yield one ProductRecord view per row
+    for product in parse_tool_content(state.get("vendor_data", [])) or []:
+        documents.append(
+            f"Catalog product: {product.get('name')} | category: {product.get('category')}"
+            f" / {product.get('sub_category')} | price: ${product.get('price')}"
+            f" | themes: {', '.join(map(str, product.get('themes', [])))}"
+        )
+
+    for name, stats in parse_tool_content(state.get("sales_data", {})).items():
+        documents.append(f"Sales: {name} sold {stats.get('total_units_sold', 0)} units")
+
+    survey = parse_tool_content(state.get("survey_data", {}))
+    if survey:
+        pinned.append(f"Survey average sentiment: {survey.get('average_sentiment')}")
+        for line in survey.get("raw_feedback", []):
+            documents.append(f"Survey feedback: {line}")
+
+    trend = parse_tool_content(state.get("trend_data", {}))
+    if trend:
+        pinned.append(
+            f"Trend average sentiment: {trend.get('average_sentiment')}; "
+            f"top words: {json.dumps(trend.get('top_words', [])[:10])}"
+        )
+        for line in trend.get("raw_mentions", []):
+            documents.append(f"Trend mention: {line}")
+
+    return pinned, documents
+
+
+class ContextIndex:
+    """TF-IDF retrieval index over one run's parsed state."""
+
+    def __init__(self, state: dict):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        # Holding the parsed inputs keeps their ids (the cache key for digest-less states) unique
+        self.sources = tuple(state.get(key) for key in _STATE_KEYS)
+        self.full_state_tokens = None
+        self.pinned, self.documents = build_documents(state)
+        self.pinned_tokens = sum(estimate_tokens(text) for text in self.pinned)
+        self.vectorizer = None
+        if self.documents:
+            self.vectorizer = TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, stop_words="english")
+            try:
+                self.matrix = self.vectorizer.fit_transform(self.documents)
+            except ValueError:  # Only stop words in the corpus
+                self.vectorizer = None
+
+    def select(self, query: str, token_budget: int = CONTEXT_TOKEN_BUDGET) -> list:
+        """Pinned slices plus the most relevant documents that fit in ``token_budget``."""
+        selected = list(self.pinned)
+        remaining = token_budget - self.pinned_tokens
+        if self.vectorizer is None or remaining <= 0:
+            return selected
+
+        scores = (self.matrix @ self.vectorizer.transform([query]).T).toarray().ravel()
+        for i in scores.argsort()[::-1]:
+            if scores[i] <= 0:
+                break
+            cost = estimate_tokens(self.documents[i])
+            if cost > remaining:
+                continue
+            selected.append(self.documents[i])
+            remaining -= cost
+        return selected
+
+
+def _index_key(state: dict):
+    # Digests identify the parsed inputs of a graph run; otherwise key on the objects themselves
+    digests = state.get("input_digests")
+    if digests and all(digests.values()):
+        return json.dumps(digests, sort_keys=True)
+    return tuple(id(state.get(key)) for key in _STATE_KEYS)
+
+
+def get_context_index(state: dict) -> ContextIndex:
+    key = _index_key(state)
+    with _index_lock:
+        if key in _index_cache:
+            _index_cache.move_to_end(key)
+            return _index_cache[key]
+    index = ContextIndex(state)
+    with _index_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > INDEX_CACHE_ENTRIES:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def retrieve_context(state: dict, query: str, token_budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """
+    Returns the slices of ``state`` most relevant to ``query``, one per line, within
+    ``token_budget`` tokens.
+    """
+    slices = get_context_index(state).select(query, token_budget)
+    return "\n".join(f"- {text}" for text in slices)
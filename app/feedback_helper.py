@@ -1,11 +1,30 @@
+import sys
+import os
 import json
-from openai import OpenAI
+import logging
 from langsmith import traceable
 
-client = OpenAI()
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tools.instrumentation import VERBOSE_LOGS
+from tools.llm import chat_completion
+from feedback_context import CONTEXT_TOKEN_BUDGET, estimate_tokens, get_context_index, retrieve_context
+from feedback_commands import interpret_feedback
+
+# "retrieval": only the state slices relevant to the feedback go into the prompt.
+# "full": the whole state is dumped into the prompt (original behaviour).
+FEEDBACK_CONTEXT = os.getenv("FEEDBACK_CONTEXT", "retrieval")
+# Explicit add/remove/swap/move-up commands are applied locally unless this is off
+FEEDBACK_FAST_PATH = os.getenv("FEEDBACK_FAST_PATH", "on").lower() not in ("off", "0", "false")
 
 def safe_json_stringify(data):
+    from tools.snapshot import to_python  # numpy-backed; only needed once a state is dumped
+
     def default_serializer(obj):
+        # Snapshot and compact catalog views serialize as the parsers' plain data
+        try:
+            return to_python(obj)
+        except TypeError:
+            pass
         try:
             return str(obj)
         except:
@@ -14,22 +33,58 @@ def safe_json_stringify(data):
     return json.dumps(data, indent=2, default=default_serializer)
 
 
+def log_prompt_tokens(whole_state: dict, prompt: str, context: str) -> None:
+    """
+    Logs the prompt size. With VERBOSE_LOGS it is compared to what dumping the whole state
+    would have cost, which serializes the state once: O(state), so off the default path.
+    """
+    prompt_tokens = estimate_tokens(prompt)
+    if FEEDBACK_CONTEXT == "full":
+        logging.info(f"Feedback prompt tokens: {prompt_tokens} (full state)")
+        return
+    if not VERBOSE_LOGS:
+        logging.info(f"Feedback prompt tokens: {prompt_tokens}")
+        return
+    index = get_context_index(whole_state)
+    if index.full_state_tokens is None:  # Measured once per state, not per question
+        index.full_state_tokens = estimate_tokens(safe_json_stringify(whole_state))
+    full_prompt_tokens = prompt_tokens - estimate_tokens(context) + index.full_state_tokens
+    logging.info(f"Feedback prompt tokens: {prompt_tokens} (whole-state prompt: {full_prompt_tokens})")
+
+
 @traceable(name="college-assortment-curation.apply_feedback_to_output")
-def apply_feedback_to_output(whole_state: dict, final_output: dict, feedback: str) -> dict:
+def apply_feedback_to_output(whole_state: dict, final_output: dict, feedback: str,
+                             context_token_budget: int = CONTEXT_TOKEN_BUDGET) -> dict:
     """
-    Uses LLM to modify the final_output based on user feedback.
+    Uses LLM to modify the final_output based on user feedback. Explicit commands such as
+    "add lamp" or "swap desk with lamp" that resolve to one catalog product are applied
+    locally without an LLM call.
 
     Args:
         whole_state (dict): Complete state, useful for answering factual questions.
         final_output (dict): Original output with 'products' and 'rationale'
         feedback (str): User feedback or question
+        context_token_budget (int): Token budget for the state slices retrieved into the prompt.
     
     Returns:
         dict: Updated final_output or rationale-only if no product changes are needed.
     """
+    if FEEDBACK_FAST_PATH:
+        local = interpret_feedback(whole_state, final_output, feedback)
+        if local is not None:
+            logging.info(f"Feedback applied locally: {feedback}")
+            return local
+
     products = final_output.get("products", [])
     rationale = final_output.get("rationale", "")
 
+    if FEEDBACK_CONTEXT == "full":
+        context_heading = "Full context (whole_state) for answering questions:"
+        context = safe_json_stringify(whole_state)
+    else:
+        context_heading = "Relevant context from this run's data for answering questions:"
+        context = retrieve_context(whole_state, feedback, context_token_budget)
+
     prompt = f"""
 You are a retail AI assistant improving product recommendations based on planner feedback.
 
@@ -42,8 +97,8 @@ Original rationale:
 Planner feedback:
 "{feedback}"
 
-Full context (whole_state) for answering questions:
-{safe_json_stringify(whole_state)}
+{context_heading}
+{context}
 
 Instructions:
 - If the feedback is a question or unrelated to products, reply with a rationale only. Leave products unchanged.
@@ -65,13 +120,13 @@ Instructions:
 - Keep response concise and focused on the products and rationale. 
 """
 
-    response = client.chat.completions.create(
+    log_prompt_tokens(whole_state, prompt, context)
+
+    content = chat_completion(
         model="gpt-4",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.4
-    )
-
-    content = response.choices[0].message.content.strip()
+    ).strip()
 
     try:
         updated = json.loads(content)
@@ -1,9 +1,11 @@
 import json
-from langchain_core.messages import ToolMessage
+import sys
 
 def parse_tool_content(tool_output):
     """Utility to handle ToolMessage or dict transparently."""
-    if isinstance(tool_output, ToolMessage):
+    # A ToolMessage can only exist once langchain_core is loaded, so never import it here
+    messages = sys.modules.get("langchain_core.messages")
+    if messages is not None and isinstance(tool_output, messages.ToolMessage):
         return json.loads(tool_output.content)
     return tool_output
 
@@ -34,4 +36,4 @@ def generate_output(state):
 Products scoring highest across these factors are prioritized below."""
     )
 
-    return {**state, "final_output": {"products": scored[:20], "rationale": rationale}}
+    return {"final_output": {"products": scored[:20], "rationale": rationale}}
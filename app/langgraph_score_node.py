@@ -1,60 +1,62 @@
 import logging
-import json
-
-def score_products(state):
-    """ If a product has: 
-        2 theme matches → +1.0
-        150 units sold → +1.5
-        Base score: 1.0 + 1.0 + 1.5 = 3.5
-        Trend sentiment = 0.6 → multiplier = 0.5 + 0.5×0.6 = 0.8
-        Survey sentiment = 0.8 → multiplier = 0.5 + 0.5×0.8 = 0.9
-        Final Score = 3.5 × 0.8 × 0.9 = 2.52
-    """
-
-    logging.basicConfig(level=logging.INFO)
-    logging.info("🔍 Scoring Products Node Activated")
-
-    # Deserialize tool messages
-    vendor_data = json.loads(state["vendor_data"].content) if "vendor_data" in state else []
-
-    sales_data = json.loads(state["sales_data"].content) if "sales_data" in state else {}
-
-    trend = json.loads(state["trend_data"].content) if "trend_data" in state else {}
-    trend_sentiment = trend.get("average_sentiment", 0.5)
-
-    survey = json.loads(state["survey_data"].content) if "survey_data" in state else {}
-    survey_sentiment = survey.get("average_sentiment", 0.5)
-
-    profile = json.loads(state["college_profile_data"].content) if "college_profile_data" in state else {}
-    store_themes = profile.get("themes", [])
-
-    logging.info(f"Trend Sentiment Score: {trend_sentiment}")
-    logging.info(f"Survey Sentiment Score: {survey_sentiment}")
-    logging.info(f"Store Themes: {store_themes}")
-
+import os
+
+from langgraph_output_node import parse_tool_content
+from tools.instrumentation import VERBOSE_LOGS
+from tools.sales_aggregator import SALES_WINDOWS
+from scoring_engine import (
+    BASE_SCORE, THEME_MATCH_BONUS, SALES_DIVISOR, SALES_CAP, PRICE_WEIGHT, PRICE_CAP, decode_themes, score_catalog
+)
+
+# "vectorized" uses the columnar NumPy engine; "reference" keeps the per-product loop
+SCORING_MODE = os.getenv("SCORING_MODE", "vectorized")
+# Sales signal for the sales bonus: "all" (all-time units), "7d", "30d", "90d" or "decayed".
+# Windows other than "all" need folded sales deltas (see tools/sales_aggregator.py).
+SALES_WINDOW = os.getenv("SALES_WINDOW", "all")
+
+
+def sales_field(sales_data, window: str) -> str:
+    """The ``sales_data`` field for ``window``, falling back to all-time units when absent."""
+    if window not in SALES_WINDOWS:
+        raise ValueError(f"Unknown sales window: {window}")
+    field = SALES_WINDOWS[window]
+    if field == SALES_WINDOWS["all"] or not sales_data:
+        return field
+    fields = getattr(sales_data, "fields", None) or next(iter(sales_data.values()), {})
+    if field not in fields:
+        logging.warning(f"⚠️ Sales data has no {window} window (not a folded sales delta); using all-time units")
+        return SALES_WINDOWS["all"]
+    return field
+
+
+def score_products_reference(vendor_data, sales_data, store_themes, trend_sentiment, survey_sentiment,
+                             price_index=None, sales_field="total_units_sold"):
+    """Per-product scoring loop, kept as the reference for equivalence tests."""
     product_scores = []
+    price_index = price_index or {}
 
     for product in vendor_data:
         name = product.get("name", "")
         price = product.get("price", 0)
         
         # Some themes are double encoded, so fix them
-        raw_themes = product.get("themes", [])
-        try:
-            themes = json.loads(raw_themes[0]) if raw_themes and isinstance(raw_themes[0], str) else raw_themes
-        except Exception:
-            themes = raw_themes
+        themes = decode_themes(product.get("themes", []))
         
         # Base score logic
-        score = 1.0
+        score = BASE_SCORE
 
         # Theme match bonus
         match_count = sum(1 for theme in themes if theme in store_themes)
-        score += match_count * 0.5
+        score += match_count * THEME_MATCH_BONUS
 
         # Sales bonus
-        sales = sales_data.get(name, {}).get("total_units_sold", 0)
-        score += min(sales / 100, 2.0)  # capped sales weight
+        sales = sales_data.get(name, {}).get(sales_field, 0)
+        score += min(sales / SALES_DIVISOR, SALES_CAP)  # capped sales weight
+
+        # Price competitiveness: discount to the competitor median, capped both ways
+        median = price_index.get(name, {}).get("median_price")
+        if median and price and median > 0 and price > 0:
+            score += PRICE_WEIGHT * min(max((median - price) / median, -PRICE_CAP), PRICE_CAP)
 
         # Sentiment boost
         score *= (0.5 + 0.5 * trend_sentiment)
@@ -62,9 +64,76 @@ def score_products(state):
 
         product_scores.append((name, round(score, 2)))
 
-    # Sort and save
-    product_scores = sorted(product_scores, key=lambda x: x[1], reverse=True)
-    logging.info(f"🏁 Final Sorted Scores: {product_scores}")
+    return sorted(product_scores, key=lambda x: x[1], reverse=True)
+
+
+def scoring_inputs(state):
+    """
+    Extracts (vendor_data, sales_data, store_themes, trend_sentiment, survey_sentiment,
+    price_index) from a state.
+    """
+    # Deserialize tool messages
+    vendor_data = parse_tool_content(state.get("vendor_data", []))
+
+    sales_data = parse_tool_content(state.get("sales_data", {}))
+
+    trend = parse_tool_content(state.get("trend_data", {}))
+    trend_sentiment = trend.get("average_sentiment", 0.5)
+
+    survey = parse_tool_content(state.get("survey_data", {}))
+    survey_sentiment = survey.get("average_sentiment", 0.5)
+
+    profile = parse_tool_content(state.get("college_profile_data", {}))
+    store_themes = profile.get("themes", [])
+
+    competitor = parse_tool_content(state.get("competitor_data", {}))
+    price_index = competitor.get("price_index", {})
+
+    return vendor_data, sales_data, store_themes, trend_sentiment, survey_sentiment, price_index
+
+
+def score_products(state):
+    """ If a product has: 
+        2 theme matches → +1.0
+        150 units sold → +1.5
+        Base score: 1.0 + 1.0 + 1.5 = 3.5
+        Trend sentiment = 0.6 → multiplier = 0.5 + 0.5×0.6 = 0.8
+        Survey sentiment = 0.8 → multiplier = 0.5 + 0.5×0.8 = 0.9
+        Final Score = 3.5 × 0.8 × 0.9 = 2.52
+
+        state["scoring_mode"] selects "vectorized" (default) or "reference", and
+        state["sales_window"] the sales signal (see SALES_WINDOW).
+    """
+
+    logging.basicConfig(level=logging.INFO)
+    logging.info("🔍 Scoring Products Node Activated")
+
+    vendor_data, sales_data, store_themes, trend_sentiment, survey_sentiment, price_index = scoring_inputs(state)
+
+    logging.info(f"Trend Sentiment Score: {trend_sentiment}")
+    logging.info(f"Survey Sentiment Score: {survey_sentiment}")
+    logging.info(f"Store Themes: {store_themes}")
 
-    state["scored_products"] = product_scores
-    return state
\ No newline at end of file
+    field = sales_field(sales_data, state.get("sales_window") or SALES_WINDOW)
+    logging.info(f"Sales Signal: {field}")
+
+    mode = state.get("scoring_mode", SCORING_MODE)
+    if mode == "reference":
+        product_scores = score_products_reference(
+            vendor_data, sales_data, store_themes, trend_sentiment, survey_sentiment, price_index, field
+        )
+    elif mode == "vectorized":
+        product_scores = score_catalog(
+            vendor_data, sales_data, store_themes, trend_sentiment, survey_sentiment, price_index=price_index,
+            sales_field=field,
+        )
+    else:
+        raise ValueError(f"Unknown scoring mode: {mode}")
+
+    # Sort and save; the full list is O(catalog) so it is only logged with VERBOSE_LOGS
+    if VERBOSE_LOGS:
+        logging.info(f"🏁 Final Sorted Scores: {product_scores}")
+    else:
+        logging.info(f"🏁 Scored {len(product_scores)} products, top 5: {product_scores[:5]}")
+
+    return {"scored_products": product_scores}
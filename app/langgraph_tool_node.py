@@ -1,38 +1,141 @@
 import sys
 import os
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 # from uuid import uuid4
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from tools.wrapped_tools import get_all_tools
-
-# Get list of tools and map by name
-tools_list = get_all_tools()
-tools_dict = {tool_.name: tool_ for tool_ in tools_list}
-
-def tool_node(state):
-    inputs = state.get("file_inputs", {})
-    results = {}
-
-    tool_mapping = [
-        ("vendor", "vendor_tool"),
-        ("sales", "sales_tool"),
-        ("survey", "survey_tool"),
-        ("trend", "trend_tool"),
-        ("college_profile", "college_profile_tool"),
-        ("competitor", "competitor_tool"),
-    ]
-
-    for key, tool_name in tool_mapping:
-        if key in inputs:
-            file_path = inputs[key]
-            print(f"Invoking tool: {tool_name} with file: {file_path}")
-            try:
-                tool_func = tools_dict[tool_name]
-                tool_output = tool_func.invoke({"file_path": file_path})
-                results[f"{key}_data"] = tool_output or {}
-            except Exception as e:
-                print(f"Error invoking {tool_name}: {e}")
-                results[f"{key}_data"] = {}
-
-    return {**state, **results}
\ No newline at end of file
+from tools.wrapped_tools import get_all_tools, PARSERS, parser_version
+from tools.parse_cache import file_digest
+from tools.sales_aggregator import aggregate_state
+from node_cache import checkpoint_store, NODE_MEMO_ENABLED
+from tools.instrumentation import propagate_context
+
+
+def get_tools_dict():
+    """LangChain tools by name, built on first use (only the "toolmessage" handoff needs them)."""
+    return {tool_.name: tool_ for tool_ in get_all_tools()}
+
+
+tool_mapping = [
+    ("vendor", "vendor_tool"),
+    ("sales", "sales_tool"),
+    ("survey", "survey_tool"),
+    ("trend", "trend_tool"),
+    ("college_profile", "college_profile_tool"),
+    ("competitor", "competitor_tool"),
+]
+
+# "inprocess": branches hand the parsers' Python objects straight to downstream nodes.
+# "toolmessage": branches go through the LangChain tools and pass JSON ToolMessages.
+STATE_HANDOFF = os.getenv("STATE_HANDOFF", "inprocess")
+
+# Seconds each parser branch may run before it degrades to an empty result.
+# Survey and trend parsing are OpenAI round trips, so they get the most headroom.
+# Override per run with state["parser_timeouts"] = {"trend": 30, ...}.
+DEFAULT_PARSER_TIMEOUTS = {
+    "vendor": 60,
+    "sales": 60,
+    "survey": 120,
+    "trend": 120,
+    "college_profile": 10,
+    "competitor": 60,
+}
+
+
+def run_parser(key, tool_name, file_path, timeout=None, handoff=None, store_id=None, sales_delta=False):
+    """
+    Invokes one parser with a timeout, in-process or through its tool (see STATE_HANDOFF).
+    With ``sales_delta`` the sales file is folded into the aggregates of ``store_id``.
+
+    Returns:
+        Tuple[Any, dict]: The tool output ({} on failure or timeout) and its timing record
+        {"seconds": float, "status": "ok" | "error" | "timeout", "error": str (on failure)}.
+    """
+    print(f"Invoking tool: {tool_name} with file: {file_path}")
+    # A dedicated thread per branch, so a hung parser cannot hold up a shared pool
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"parse_{key}")
+    start = time.perf_counter()
+    timing = {"status": "ok"}
+    args = {"file_path": file_path}
+    if key == "sales" and sales_delta:
+        args.update(store_id=store_id, delta=True)
+    try:
+        if (handoff or STATE_HANDOFF) == "toolmessage":
+            future = executor.submit(propagate_context(get_tools_dict()[tool_name].invoke), args)
+        else:
+            # The copied context keeps LLM calls made by the parser attributed to this run
+            future = executor.submit(propagate_context(PARSERS[key]), **args)
+        output = future.result(timeout=timeout) or {}
+    except FuturesTimeoutError:
+        print(f"Timed out invoking {tool_name} after {timeout}s")
+        output = {}
+        timing = {"status": "timeout", "error": f"timed out after {timeout}s"}
+    except Exception as e:
+        print(f"Error invoking {tool_name}: {e}")
+        output = {}
+        timing = {"status": "error", "error": str(e)}
+    finally:
+        executor.shutdown(wait=False)
+    timing["seconds"] = round(time.perf_counter() - start, 3)
+    return output, timing
+
+
+def input_digest(key, file_path, store_id=None, sales_delta=False):
+    """Content digest identifying a parser's output for ``file_path`` (None if unreadable)."""
+    try:
+        digest = f"{key}:{parser_version(key)}:{file_digest(file_path)}"
+    except OSError:
+        return None
+    if key == "sales" and sales_delta:
+        # A folded delta's output also depends on the store's history already folded in
+        digest += f":{store_id}:{aggregate_state(store_id)}"
+    return digest
+
+
+def make_parse_branch(key, tool_name):
+    """Builds the graph node that parses a single input file as its own branch."""
+
+    def parse_branch(state):
+        inputs = state.get("file_inputs", {})
+        if key not in inputs:
+            return {"parse_timings": {key: {"status": "skipped", "seconds": 0.0}}}
+
+        # Content digest of the input: keys this branch's persisted checkpoint (so a run that fails
+        # later resumes with its parsed inputs) and the memoization of downstream nodes
+        digest = input_digest(key, inputs[key], state.get("store_id"), state.get("sales_delta", False))
+
+        if digest and NODE_MEMO_ENABLED:
+            cached = checkpoint_store.get(digest)
+            if cached is not None:
+                return {
+                    f"{key}_data": cached,
+                    "parse_timings": {key: {"status": "cached", "seconds": 0.0}},
+                    "input_digests": {key: digest},
+                }
+
+        timeout = state.get("parser_timeouts", {}).get(key, DEFAULT_PARSER_TIMEOUTS[key])
+        output, timing = run_parser(
+            key, tool_name, inputs[key], timeout, state.get("state_handoff"), state.get("store_id"),
+            state.get("sales_delta", False),
+        )
+        print(f"Parsed {key} in {timing['seconds']}s ({timing['status']})")
+
+        if timing["status"] != "ok":
+            digest = None  # Degraded result: never reuse it downstream
+        elif digest:
+            checkpoint_store.put(digest, f"parse_{key}", output)
+
+        return {f"{key}_data": output, "parse_timings": {key: timing}, "input_digests": {key: digest}}
+
+    parse_branch.__name__ = f"parse_{key}"
+    return parse_branch
+
+
+def critical_path(parse_timings):
+    """Name and timing of the slowest parser branch, or None when nothing ran."""
+    if not parse_timings:
+        return None
+    key = max(parse_timings, key=lambda k: parse_timings[k].get("seconds", 0.0))
+    return key, parse_timings[key]
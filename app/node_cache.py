@@ -0,0 +1,195 @@
+import functools
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CHECKPOINT_PATH = os.getenv(
+    "CHECKPOINT_PATH",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "checkpoints.sqlite")),
+)
+NODE_MEMO_ENABLED = os.getenv("NODE_MEMO", "on").lower() not in ("off", "0", "false")
+MEMORY_ENTRIES = int(os.getenv("NODE_MEMO_MEMORY_ENTRIES", 32))
+NODE_MEMO_TTL_SECONDS = int(os.getenv("NODE_MEMO_TTL_SECONDS", 7 * 24 * 3600))
+NODE_MEMO_MAX_ENTRIES = int(os.getenv("NODE_MEMO_MAX_ENTRIES", 500))
+
+_MISS = object()
+
+
+def _detached(value):
+    """
+    Copies the plain containers of a result, so no run mutates another's. Snapshot and
+    compact catalog views are read-only and shared as they are.
+    """
+    if isinstance(value, dict):
+        return {key: _detached(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_detached(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_detached(item) for item in value)
+    return value
+
+
+class CheckpointStore:
+    """
+    Node results keyed by the hash of each node's input slice.
+
+    A small in-memory LRU answers repeat runs in the same process; a local SQLite table
+    persists results, so a run that failed or was interrupted replays every node that had
+    already completed and resumes at the first one that had not. Persisted results older
+    than ``ttl_seconds`` are ignored and purged; beyond ``max_entries`` the oldest are evicted.
+    Every hit is a copy (see ``_detached``).
+    """
+
+    def __init__(self, path=CHECKPOINT_PATH, memory_entries=MEMORY_ENTRIES,
+                 ttl_seconds=NODE_MEMO_TTL_SECONDS, max_entries=NODE_MEMO_MAX_ENTRIES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    """CREATE TABLE IF NOT EXISTS node_results (
+                           key TEXT PRIMARY KEY,
+                           node TEXT NOT NULL,
+                           output BLOB NOT NULL,
+                           created_at REAL NOT NULL
+                       )"""
+                )
+        return self._conn
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str, persist: bool = True, default=None):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return _detached(self._memory[key])
+            if not persist:
+                return default
+            row = self._connection().execute(
+                "SELECT output FROM node_results WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                return default
+            try:
+                value = pickle.loads(row[0])
+            except Exception:
+                # E.g. a parse result referencing a snapshot that has since been pruned
+                with self._connection() as conn:
+                    conn.execute("DELETE FROM node_results WHERE key = ?", (key,))
+                return default
+            self._remember(key, value)
+            return _detached(value)
+
+    def put(self, key: str, node: str, value, persist: bool = True) -> None:
+        with self._lock:
+            self._remember(key, _detached(value))
+            if persist:
+                now = time.time()
+                with self._connection() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO node_results (key, node, output, created_at) VALUES (?, ?, ?, ?)",
+                        (key, node, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now),
+                    )
+                    conn.execute("DELETE FROM node_results WHERE created_at < ?", (now - self.ttl_seconds,))
+                    conn.execute(
+                        """DELETE FROM node_results WHERE key NOT IN (
+                               SELECT key FROM node_results ORDER BY created_at DESC LIMIT ?
+                           )""",
+                        (self.max_entries,),
+                    )
+
+    def clear(self, node: str = None) -> None:
+        with self._lock:
+            self._memory.clear()
+            with self._connection() as conn:
+                if node is None:
+                    conn.execute("DELETE FROM node_results")
+                else:
+                    conn.execute("DELETE FROM node_results WHERE node = ?", (node,))
+
+
+checkpoint_store = CheckpointStore()
+
+
+def _param_defaults(param_keys) -> dict:
+    return dict(param_keys) if isinstance(param_keys, dict) else dict.fromkeys(param_keys)
+
+
+def lineage_key(node_name, state, input_keys, param_keys=(), version=1):
+    """
+    Hashes the slice of ``state`` a node depends on: the content digests of its parsed
+    inputs (state["input_digests"], recorded by the parser branches) plus its parameters.
+    ``param_keys`` may map each parameter to the default the node falls back to when the
+    state leaves it unset (such as an env setting), so the key holds the effective value.
+
+    Returns None when the slice cannot be identified, i.e. an input branch degraded to an
+    empty result or parsed data was supplied without a digest; such runs are not memoized.
+    """
+    digests = state.get("input_digests") or {}
+    inputs = {}
+    for key in input_keys:
+        if key in digests:
+            if digests[key] is None:
+                return None
+            inputs[key] = digests[key]
+        elif f"{key}_data" in state:
+            return None
+        else:
+            inputs[key] = None
+
+    payload = json.dumps(
+        {
+            "node": node_name,
+            "version": version,
+            "inputs": inputs,
+            "params": {key: state.get(key) or default for key, default in _param_defaults(param_keys).items()},
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def memoize_node(node_name, input_keys, param_keys=(), version=1):
+    """
+    Decorates a graph node so its returned update is reused whenever the node's input
+    slice (see ``lineage_key``) is unchanged. Bump ``version`` when the node's logic changes.
+    """
+
+    def decorator(node):
+        @functools.wraps(node)
+        def wrapper(state):
+            key = lineage_key(node_name, state, input_keys, param_keys, version) if NODE_MEMO_ENABLED else None
+            if key is None:
+                return node(state)
+            cached = checkpoint_store.get(key, default=_MISS)
+            if cached is not _MISS:
+                print(f"Checkpoint hit: {node_name}")
+                return cached
+            update = node(state)
+            checkpoint_store.put(key, node_name, update)
+            return update
+
+        return wrapper
+
+    return decorator
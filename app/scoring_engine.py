@@ -0,0 +1,334 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+# Score formula weights, shared with the reference loop in langgraph_score_node
+BASE_SCORE = 1.0
+THEME_MATCH_BONUS = 0.5
+SALES_DIVISOR = 100
+SALES_CAP = 2.0
+# Price competitiveness: weight times our discount to the competitor median, capped both ways
+PRICE_WEIGHT = 1.0
+PRICE_CAP = 0.5
+
+# Name of the stored encoding of snapshot catalogs; bump when CatalogEncoding's arrays change
+ENCODING_ARTIFACT = "catalog_encoding_v1"
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def decode_themes(raw_themes):
+    """
+    Some themes are double encoded (a JSON array stored as the first list item), so fix them.
+    Mirrors the per-product decoding of the reference scorer exactly.
+    """
+    try:
+        return json.loads(raw_themes[0]) if raw_themes and isinstance(raw_themes[0], str) else raw_themes
+    except Exception:
+        return raw_themes
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Counts set bits per element of a uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    as_bytes = words.view(np.uint8).reshape(words.shape + (8,))
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=-1)
+
+
+class CatalogEncoding:
+    """
+    Columnar encoding of a vendor catalog for vectorized scoring.
+
+    Themes are interned to integer ids and stored as one bitmask row per product
+    (``theme_bits``, shape ``(n_products, n_words)``). Themes repeated within a single
+    product are kept in a sparse correction (``extra_rows``, ``extra_ids``, ``extra_counts``)
+    so match counts stay identical to the per-product loop.
+    """
+
+    def __init__(self, names, theme_vocab, theme_bits, extra_rows, extra_ids, extra_counts, prices=None,
+                 name_lookup=None):
+        self.names = names
+        self.prices = prices if prices is not None else np.zeros(len(names), dtype=np.float64)
+        self.theme_vocab = theme_vocab
+        self.theme_bits = theme_bits
+        self.extra_rows = extra_rows
+        self.extra_ids = extra_ids
+        self.extra_counts = extra_counts
+        self._name_lookup = name_lookup
+
+    def __len__(self):
+        return len(self.names)
+
+    def name_lookup(self):
+        """(per-product code, unique-name index) pair used to join keyed data by position."""
+        if self._name_lookup is None:
+            codes, uniques = pd.factorize(self.names, use_na_sentinel=False)
+            self._name_lookup = (codes, pd.Index(uniques))
+        return self._name_lookup
+
+    def theme_mask(self, store_themes) -> np.ndarray:
+        """Builds the bitmask (one uint64 per word) of the store themes known to the catalog."""
+        mask = np.zeros(self.theme_bits.shape[1], dtype=np.uint64)
+        for theme in store_themes:
+            theme_id = self.theme_vocab.get(theme)
+            if theme_id is not None:
+                mask[theme_id // 64] |= np.uint64(1) << np.uint64(theme_id % 64)
+        return mask
+
+    def match_counts(self, store_themes) -> np.ndarray:
+        """Number of product themes contained in ``store_themes``, per product."""
+        mask = self.theme_mask(store_themes)
+        matches = _popcount(self.theme_bits & mask).sum(axis=1).astype(np.int64)
+        if len(self.extra_rows):
+            ids = self.extra_ids
+            hit = (mask[ids // 64] >> (ids % 64).astype(np.uint64)) & np.uint64(1)
+            np.add.at(matches, self.extra_rows, hit.astype(np.int64) * self.extra_counts)
+        return matches
+
+    def match_count_matrix(self, store_theme_lists) -> np.ndarray:
+        """Match counts for several stores at once, shape ``(n_stores, n_products)``."""
+        masks = np.stack([self.theme_mask(themes) for themes in store_theme_lists])
+        matches = _popcount(self.theme_bits[None, :, :] & masks[:, None, :]).sum(axis=2).astype(np.int64)
+        if len(self.extra_rows):
+            ids = self.extra_ids
+            hits = (masks[:, ids // 64] >> (ids % 64).astype(np.uint64)) & np.uint64(1)
+            for store_row, store_hits in enumerate(hits):
+                np.add.at(matches[store_row], self.extra_rows, store_hits.astype(np.int64) * self.extra_counts)
+        return matches
+
+
+def _pack_theme_bits(names, rows: np.ndarray, ids: np.ndarray, vocab: dict, prices=None) -> CatalogEncoding:
+    """Packs flat (product row, theme id) pairs into bitmasks plus the repeat correction."""
+    n_themes = max(len(vocab), 1)
+    n_words = max(1, (len(vocab) + 63) // 64)
+    theme_bits = np.zeros((len(names), n_words), dtype=np.uint64)
+
+    # Collapse (product, theme) pairs; repeats beyond the first go to the correction arrays
+    pair_keys, counts = np.unique(rows * n_themes + ids, return_counts=True)
+    pair_rows = pair_keys // n_themes
+    pair_ids = pair_keys % n_themes
+    np.bitwise_or.at(
+        theme_bits,
+        (pair_rows, pair_ids // 64),
+        np.left_shift(np.uint64(1), (pair_ids % 64).astype(np.uint64)),
+    )
+    repeated = counts > 1
+
+    return CatalogEncoding(
+        names=names,
+        theme_vocab=vocab,
+        theme_bits=theme_bits,
+        extra_rows=pair_rows[repeated],
+        extra_ids=pair_ids[repeated],
+        extra_counts=counts[repeated] - 1,
+        prices=prices,
+    )
+
+
+def encode_columns(catalog) -> CatalogEncoding:
+    """Encodes a ``VendorCatalogColumns`` without touching individual products."""
+    lengths = np.diff(catalog.theme_offsets)
+    rows = np.repeat(np.arange(len(catalog), dtype=np.int64), lengths)
+    vocab = {theme: i for i, theme in enumerate(catalog.theme_vocab)}
+    return _pack_theme_bits(
+        catalog.names, rows, catalog.theme_ids.astype(np.int64), vocab, np.asarray(catalog.prices, dtype=np.float64)
+    )
+
+
+def encode_snapshot(catalog) -> CatalogEncoding:
+    """
+    Encodes a snapshot catalog (tools.snapshot) once and stores the result next to the
+    snapshot, so later runs and other processes memory-map the encoding instead.
+    """
+    arrays = catalog.load_derived(ENCODING_ARTIFACT)
+    if arrays is None:
+        encoding = encode_columns(catalog)
+        catalog.save_derived(ENCODING_ARTIFACT, {
+            "theme_bits": encoding.theme_bits,
+            "extra_rows": encoding.extra_rows,
+            "extra_ids": encoding.extra_ids,
+            "extra_counts": encoding.extra_counts,
+        })
+        arrays = catalog.load_derived(ENCODING_ARTIFACT)
+    return CatalogEncoding(
+        names=catalog.names,
+        theme_vocab={theme: i for i, theme in enumerate(catalog.theme_vocab)},
+        prices=np.asarray(catalog.prices, dtype=np.float64),
+        name_lookup=catalog.name_lookup(),
+        **arrays,
+    )
+
+
+def encode_catalog(vendor_data) -> CatalogEncoding:
+    """
+    Interns the catalog's themes and packs them into per-product bitmasks.
+
+    Args:
+        vendor_data (Union[List[dict], VendorCatalogColumns]): Parsed vendor catalog.
+
+    Returns:
+        CatalogEncoding: Columnar catalog ready for ``score_catalog``.
+    """
+    if hasattr(vendor_data, "load_derived"):
+        return encode_snapshot(vendor_data)
+    if hasattr(vendor_data, "theme_offsets"):
+        return encode_columns(vendor_data)
+
+    vocab = {}
+    names = []
+    prices = []
+    rows = []
+    ids = []
+    decoded = {}  # Catalogs repeat a handful of theme strings, so decode each one once
+    for row, product in enumerate(vendor_data):
+        names.append(product.get("name", ""))
+        prices.append(product.get("price", 0))
+        raw_themes = product.get("themes", [])
+        themes = raw_themes
+        if raw_themes and isinstance(raw_themes[0], str):
+            first = raw_themes[0]
+            if first not in decoded:
+                try:
+                    decoded[first] = (True, json.loads(first))
+                except Exception:
+                    decoded[first] = (False, None)
+            ok, value = decoded[first]
+            if ok:
+                themes = value
+        for theme in themes:
+            rows.append(row)
+            ids.append(vocab.setdefault(theme, len(vocab)))
+
+    return _pack_theme_bits(
+        np.array(names, dtype=object),
+        np.asarray(rows, dtype=np.int64),
+        np.asarray(ids, dtype=np.int64),
+        vocab,
+        np.asarray(prices, dtype=np.float64),
+    )
+
+
+def align_sales(encoding: CatalogEncoding, sales_data: dict, field: str = "total_units_sold") -> np.ndarray:
+    """Joins ``sales_data`` to the catalog by position; products without sales get 0."""
+    if not sales_data:
+        return np.zeros(len(encoding), dtype=np.float64)
+    name_codes, unique_names = encoding.name_lookup()
+    if hasattr(sales_data, "field_array"):  # Snapshot views join column to column
+        positions = unique_names.get_indexer(sales_data.names)
+        units = sales_data.field_array(field)
+    else:
+        positions = unique_names.get_indexer(list(sales_data.keys()))
+        units = np.array([stats.get(field, 0) for stats in sales_data.values()], dtype=np.float64)
+    known = positions >= 0
+    per_name = np.zeros(len(unique_names), dtype=np.float64)
+    per_name[positions[known]] = units[known]
+    return per_name[name_codes]
+
+
+def price_bonus(encoding: CatalogEncoding, price_index: dict) -> np.ndarray:
+    """
+    Price-competitiveness term per product: PRICE_WEIGHT times our discount to the
+    competitor median price, clipped to +-PRICE_CAP; 0 without a competitor price.
+    """
+    if not price_index:
+        return np.zeros(len(encoding), dtype=np.float64)
+    median = align_sales(encoding, price_index, field="median_price")
+    price = encoding.prices
+    known = (median > 0) & (price > 0)
+    bonus = np.zeros(len(encoding), dtype=np.float64)
+    bonus[known] = PRICE_WEIGHT * np.clip((median[known] - price[known]) / median[known], -PRICE_CAP, PRICE_CAP)
+    return bonus
+
+
+def round_scores(scores: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of ``round(score, 2)``.
+
+    ``np.round`` differs from Python's correctly rounded ``round`` only when the value
+    sits on (or within float error of) a half-cent, so those are re-rounded in Python
+    once per distinct value.
+    """
+    scaled = scores * 100
+    rounded = np.rint(scaled) / 100
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        values, inverse = np.unique(scores[near_half], return_inverse=True)
+        fixed = np.array([round(v, 2) for v in values.tolist()], dtype=np.float64)
+        rounded[near_half] = fixed[inverse]
+    return rounded
+
+
+def raw_scores(encoding: CatalogEncoding, sales: np.ndarray, store_themes,
+               trend_sentiment: float, survey_sentiment: float, price_terms: np.ndarray = None) -> np.ndarray:
+    """Unrounded scores for every product, following the reference formula step by step."""
+    score = BASE_SCORE + encoding.match_counts(store_themes) * THEME_MATCH_BONUS
+    score = score + np.minimum(sales / SALES_DIVISOR, SALES_CAP)
+    if price_terms is not None:
+        score = score + price_terms
+    score = score * (0.5 + 0.5 * trend_sentiment)
+    score = score * (0.5 + 0.5 * survey_sentiment)
+    return score
+
+
+def raw_score_matrix(encoding: CatalogEncoding, sales: np.ndarray, store_theme_lists,
+                     trend_sentiments, survey_sentiments, price_terms: np.ndarray = None) -> np.ndarray:
+    """``raw_scores`` for many stores: one row per store, one column per product."""
+    score = BASE_SCORE + encoding.match_count_matrix(store_theme_lists) * THEME_MATCH_BONUS
+    score = score + np.minimum(sales / SALES_DIVISOR, SALES_CAP)
+    if price_terms is not None:
+        score = score + price_terms
+    score = score * (0.5 + 0.5 * np.asarray(trend_sentiments, dtype=np.float64))[:, None]
+    score = score * (0.5 + 0.5 * np.asarray(survey_sentiments, dtype=np.float64))[:, None]
+    return score
+
+
+def top_k_order(rounded: np.ndarray, k: int = None) -> np.ndarray:
+    """
+    Indices of the ``k`` best scores (all when ``k`` is None), highest first, with ties
+    kept in catalog order exactly like the stable ``sorted(..., reverse=True)``.
+    """
+    if k is None or k >= len(rounded):
+        return np.argsort(-rounded, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    kth_best = np.partition(-rounded, k - 1)[k - 1]
+    candidates = np.flatnonzero(-rounded <= kth_best)
+    return candidates[np.argsort(-rounded[candidates], kind="stable")][:k]
+
+
+def rank_products(names, rounded: np.ndarray, k: int = None):
+    """Sorts by score (highest first), keeping catalog order for ties like ``sorted``."""
+    order = top_k_order(rounded, k)
+    return list(zip(names[order].tolist(), rounded[order].tolist()))
+
+
+def score_catalog(vendor_data, sales_data: dict, store_themes, trend_sentiment: float,
+                  survey_sentiment: float, encoding: CatalogEncoding = None, price_index: dict = None,
+                  sales_field: str = "total_units_sold"):
+    """
+    Scores the whole catalog in one NumPy pass.
+
+    Args:
+        vendor_data (Union[List[dict], VendorCatalogColumns]): Parsed vendor catalog
+            (ignored when ``encoding`` is given).
+        sales_data (dict): Product name -> {"total_units_sold": int}.
+        store_themes (List[str]): Themes from the college profile.
+        trend_sentiment (float): Average trend sentiment.
+        survey_sentiment (float): Average survey sentiment.
+        encoding (CatalogEncoding, optional): Pre-built catalog encoding to reuse.
+        price_index (dict, optional): Product name -> competitor {"median_price", ...}
+            (parse_competitor_data's "price_index") for the price-competitiveness term.
+        sales_field (str): Units field of ``sales_data`` driving the sales bonus, e.g. a
+            sales aggregate window such as "units_30d".
+
+    Returns:
+        List[Tuple[str, float]]: (name, score) pairs sorted by score, highest first.
+    """
+    if encoding is None:
+        encoding = encode_catalog(vendor_data)
+    sales = align_sales(encoding, sales_data, field=sales_field)
+    price_terms = price_bonus(encoding, price_index) if price_index else None
+    scores = raw_scores(encoding, sales, store_themes, trend_sentiment, survey_sentiment, price_terms)
+    return rank_products(encoding.names, round_scores(scores))
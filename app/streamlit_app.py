@@ -1,15 +1,17 @@
 import streamlit as st
-import altair as alt
 import os
+import sys
 import traceback
 import pandas as pd
-import json
-import re
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-from openai import OpenAI
-from AssortmentEngineLanggraph import assortment_workflow
-from feedback_helper import apply_feedback_to_output
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Charting libraries, the compiled graph and the feedback helper are imported where they
+# are first used, so a fresh Streamlit session renders the upload form without loading them
+from tools.shared_analysis import start_text_analysis, get_text_analysis
+from tools.mention_index import mention_frame
+from tools.instrumentation import track_run, summarize
+from tools.snapshot import open_snapshot
+from tools.sales_aggregator import SALES_WINDOWS, read_delta
 
 # --- Setup ---
 UPLOAD_FOLDER = "uploads"
@@ -31,119 +33,25 @@ if "data_viz" not in st.session_state:
     st.session_state.data_viz = False
 if "show_data_viz" not in st.session_state:
     st.session_state.show_data_viz = False
-
-# --- Caching functions ---
-@st.cache_data
-def load_sales_data(path):
-    return pd.read_csv(path)
-
-@st.cache_data
-def get_top_selling_products(sales_df):
-    return (
-        sales_df.groupby("name")["total_units_sold"]
-        .sum()
-        .reset_index()
-        .sort_values(by="total_units_sold", ascending=False)
-        .head(5)
-    )
-
-@st.cache_data
-def load_trend_text(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
-
-@st.cache_data
-def analyze_trends_with_llm(trend_text):
-    llm_prompt = f"""
-    You are an expert trend analyst.
-    Analyze the social media trend data below and identify the top 5 trending products based ONLY on the number of times each product is explicitly mentioned in the text.
-    - Mentions are case-insensitive.
-    - Count only exact whole word matches for each product, including plural forms (e.g., 'laptop stand' and 'laptop stands' count as the same product).
-    - Do NOT estimate, guess, or add any extra mentions beyond those explicitly in the text.
-    - Your counts must exactly match the real number of occurrences.
-    - Rank products strictly by mention counts, highest first.
-    - If multiple products have the same mention count, sort those products alphabetically.
-    - Return ONLY a JSON array in this exact format, without extra text:
-
-    [
-        {{ "rank": 1, "product": "Product Name", "mentions": 5 }},
-        {{ "rank": 2, "product": "Product Name", "mentions": 4 }},
-        ...
-    ]
-
-    Trend data:
-    \"\"\"
-    {trend_text}
-    \"\"\"
-    """
-
-    client = OpenAI()
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": llm_prompt}
-        ]
-    )
-
-    raw_output = response.choices[0].message.content
-    json_str = re.search(r'\[.*\]', raw_output, re.DOTALL).group(0)
-    trend_items = json.loads(json_str)
-    trend_df = pd.DataFrame(trend_items)
-    return trend_df
-
-@st.cache_data
-def load_survey_text(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
-
-@st.cache_data
-def analyze_survey_with_llm(survey_text):
-    llm_prompt_survey = f"""
-    You are a product analyst.
-    Analyze the following survey feedback text and extract a list of products mentioned along with the exact number of times each product is explicitly mentioned.
-    - Mentions are case-insensitive.
-    - Count only exact whole word matches, including plural forms.
-    - Do NOT guess or add any extra mentions beyond the explicit text.
-    - Return ONLY a JSON array in this exact format:
-    [
-        {{ "product": "Product Name", "mentions": 3 }},
-        {{ "product": "Product Name", "mentions": 2 }},
-            ...
-    ]
-    Survey feedback text:
-    \"\"\"
-    {survey_text}
-    \"\"\"
-    """
-    client = OpenAI()
-    response_survey = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": llm_prompt_survey}
-        ]
-    )
-
-    raw_survey_output = response_survey.choices[0].message.content
-
-    json_match = re.search(r'\[.*\]', raw_survey_output, re.DOTALL)
-    if json_match:
-        json_str_survey = json_match.group(0)
-        survey_products = json.loads(json_str_survey)
-
-        if survey_products and all('product' in item and 'mentions' in item for item in survey_products):
-            product_mentions = {item["product"]: item["mentions"] for item in survey_products}
-        else:
-            product_mentions = {}
-    else:
-        product_mentions = {}
-
-    return product_mentions
-
-@st.cache_data
-def load_competitor_data(path):
-    return pd.read_csv(path)
+if "run_metrics" not in st.session_state:
+    st.session_state.run_metrics = None
+if "sales_delta" not in st.session_state:
+    st.session_state.sales_delta = False
+
+# --- Chart data ---
+# Sales and competitor files are compiled into memory-mapped snapshots once, so every
+# session (and the engine) reads one shared page-cache copy instead of its own DataFrame
+def get_top_selling_products(path, sales_delta=False):
+    if sales_delta:
+        # A POS delta charts its own totals; it is folded into the store's aggregates
+        # only when the workflow runs
+        units = read_delta(path).groupby("name")["units"].sum().nlargest(5)
+        return pd.DataFrame({"name": units.index, "total_units_sold": units.to_numpy()})
+    return pd.DataFrame(open_snapshot("sales", path).top(5), columns=["name", "total_units_sold"])
+
+def get_top_competitor_products(path):
+    price_index = open_snapshot("competitor", path)["price_index"]
+    return pd.DataFrame(price_index.top_listed(5), columns=["product", "frequency"])
 
 # --- Step 1: College Profile ---
 st.subheader("1. College Profile")
@@ -156,6 +64,11 @@ themes = st.multiselect("Themes", ["Tech-savvy", "Climate-conscious", "Budget-mi
 st.subheader("2. Upload Files")
 vendor_file = st.file_uploader("Vendor Catalog (.csv)", type="csv")
 sales_file = st.file_uploader("Sales Data (.csv)", type="csv")
+sales_delta = st.checkbox(
+    "Sales file is a daily POS delta",
+    help="Fold it into this store's running sales aggregates (needs a Date column); "
+         "leave unchecked for a full sales export",
+)
 survey_file = st.file_uploader("Survey Feedback (.txt)", type="txt")
 trend_file = st.file_uploader("Trend Data (.txt)", type="txt")
 profile_file = st.file_uploader("College Profile (.json)", type="json")
@@ -190,8 +103,14 @@ if st.button("🚀 Process Files"):
         with open(paths["competitor"], "wb") as f:
             f.write(competitor_file.read())
 
+        # Analyze trend and survey text in the background, on the engine's backend: the charts
+        # read the shared mention pass (never waiting on an LLM call) and the parsers the rest
+        start_text_analysis(paths["trend"], "trend", catalog_path=paths["vendor"])
+        start_text_analysis(paths["survey"], "survey", catalog_path=paths["vendor"])
+
         # Save paths in session_state
         st.session_state.file_paths = paths
+        st.session_state.sales_delta = sales_delta
         st.session_state.files_processed = True  # ✅ Set the flag
 
 
@@ -207,17 +126,19 @@ if st.button("📊 Data Visualization"):
         st.session_state.data_viz = True
 
 if st.session_state.data_viz:
+    import altair as alt
+
     row1_col1, row1_col2 = st.columns(2)
     row2_col1, row2_col2 = st.columns(2)
 
     # Top Selling Products - row 1, col 1
     try:
-        sales_df = load_sales_data(st.session_state.file_paths["sales"])
-
-        if "name" not in sales_df.columns or "total_units_sold" not in sales_df.columns:
-            row1_col1.warning("Sales file must contain 'name' and 'total_units_sold' columns.")
+        top_products = get_top_selling_products(
+            st.session_state.file_paths["sales"], st.session_state.sales_delta
+        )
+        if top_products.empty:
+            row1_col1.warning("No sales found in the sales file.")
         else:
-            top_products = get_top_selling_products(sales_df)
             chart = (
                 alt.Chart(top_products)
                 .mark_bar()
@@ -239,8 +160,9 @@ if st.session_state.data_viz:
 
     # Top Trending Products - row 1, col 2
     try:
-        trend_text = load_trend_text(st.session_state.file_paths["trend"])
-        trend_df = analyze_trends_with_llm(trend_text)
+        paths = st.session_state.file_paths
+        trend_analysis = get_text_analysis(paths["trend"], "trend", catalog_path=paths["vendor"], backend="local")
+        trend_df = mention_frame(trend_analysis["mentions"], top=5)
 
         bars = alt.Chart(trend_df).mark_bar(color="#FF8C00").encode(
             y=alt.Y("product:N", sort=alt.EncodingSortField(field="mentions", order="descending"), title="Product"),
@@ -265,17 +187,21 @@ if st.session_state.data_viz:
         row1_col2.altair_chart(trend_chart, use_container_width=True)
 
     except Exception as e:
-        row1_col2.error(f"Failed to analyze trend data using LLM: {e}")
+        row1_col2.error(f"Failed to analyze trend data: {e}")
 
     # Word Cloud from Survey Feedback - row 2, col 1
     try:
-        survey_text = load_survey_text(st.session_state.file_paths["survey"])
-        product_mentions = analyze_survey_with_llm(survey_text)
+        paths = st.session_state.file_paths
+        survey_analysis = get_text_analysis(paths["survey"], "survey", catalog_path=paths["vendor"], backend="local")
+        product_mentions = survey_analysis["mentions"]
 
         if not product_mentions:
             row2_col1.warning("No product mentions found or failed to parse survey feedback.")
 
         # Generate and show word cloud inside column
+        from wordcloud import WordCloud
+        import matplotlib.pyplot as plt
+
         wordcloud = WordCloud(
             width=200,
             height=200,
@@ -296,22 +222,11 @@ if st.session_state.data_viz:
 
     # Top Popular Products Among Competitors - row 2, col 2
     try:
-        competitor_df = load_competitor_data(st.session_state.file_paths["competitor"])
-
-        if "name" not in competitor_df.columns:
-            row2_col2.warning("Competitor file must contain a 'name' column.")
+        # Listings per product name, counted when the snapshot was compiled
+        top_competitor_products = get_top_competitor_products(st.session_state.file_paths["competitor"])
+        if top_competitor_products.empty:
+            row2_col2.warning("No products found in the competitor file.")
         else:
-            # Count the occurrences of each product name
-            top_competitor_products = (
-                competitor_df["name"]
-                .value_counts()
-                .reset_index()
-                .rename(columns={"name": "product", "count": "frequency"})
-                .head(5)
-            )
-            top_competitor_products["product"] = top_competitor_products["product"].astype(str)
-            top_competitor_products["frequency"] = top_competitor_products["frequency"].astype(int)
-
             # Create the Altair bar chart
             competitor_chart = (
                 alt.Chart(top_competitor_products)
@@ -340,6 +255,10 @@ if st.session_state.show_data_viz:
 
 # --- Step 5: Run Assortment Engine ---
 st.subheader("5. Run Assortment Engine")
+sales_window = st.selectbox(
+    "Sales Signal", list(SALES_WINDOWS), index=0,
+    help="All-time units, a rolling window or decayed units; windows need a daily POS delta sales file",
+)
 if st.button("🚀 Run Assortment Engine"):
     if "file_paths" not in st.session_state:
         st.error("Please process the files before running the engine.")
@@ -351,11 +270,17 @@ if st.button("🚀 Run Assortment Engine"):
                 "school_type": school_type,
                 "themes": themes
             },
-            "file_inputs": st.session_state.file_paths
+            "file_inputs": st.session_state.file_paths,
+            "sales_window": sales_window,
+            "sales_delta": st.session_state.sales_delta,
         }
 
         try:
-            st.session_state.final_state = assortment_workflow.invoke(state)
+            from AssortmentEngineLanggraph import assortment_workflow
+
+            with track_run() as run:
+                st.session_state.final_state = assortment_workflow.invoke(state)
+            st.session_state.run_metrics = run
             st.success("✅ Assortment Generated!")
         except Exception as e:
             st.error(f"❌ Failed to run engine: {e}")
@@ -386,9 +311,14 @@ if st.session_state.final_state:
             st.warning("Please enter some feedback before applying.")
         else:
             try:
+                from feedback_helper import apply_feedback_to_output
+
                 whole_state = st.session_state.final_state
                 current_output = whole_state["final_output"]
-                updated_output = apply_feedback_to_output(whole_state, current_output, feedback)
+                with track_run(st.session_state.run_metrics.run_id if st.session_state.run_metrics else None) as run:
+                    updated_output = apply_feedback_to_output(whole_state, current_output, feedback)
+                if st.session_state.run_metrics:
+                    st.session_state.run_metrics.records.extend(run.records)
 
                 # Normalize both to list of tuples before comparison
                 def to_tuple_list(products):
@@ -414,6 +344,39 @@ if st.session_state.final_state:
             except Exception as e:
                 st.error(f"Feedback processing failed: {e}")
 
+    # --- Per-run timing: graph nodes and LLM calls ---
+    if st.session_state.run_metrics:
+        with st.expander("⏱️ Run Timing"):
+            import altair as alt
+
+            summary = summarize(st.session_state.run_metrics)
+            node_df = pd.DataFrame([
+                {"node": name, "runs": entry["runs"], "wall_s": round(entry["wall_seconds"], 3),
+                 "cpu_s": round(entry["cpu_seconds"], 3)}
+                for name, entry in summary["nodes"].items()
+            ])
+            if not node_df.empty:
+                st.altair_chart(
+                    alt.Chart(node_df).mark_bar().encode(
+                        x=alt.X("wall_s:Q", title="Wall time (s)"),
+                        y=alt.Y("node:N", sort="-x", title="Node"),
+                        tooltip=["node", "runs", "wall_s", "cpu_s"],
+                    ),
+                    use_container_width=True,
+                )
+                st.dataframe(node_df, use_container_width=True)
+            llm = summary["llm"]
+            st.markdown(
+                f"**LLM calls:** {llm['calls']} ({llm['cache_hits']} cached), "
+                f"{llm['wall_seconds']:.2f}s, {llm['prompt_tokens']:,} prompt / "
+                f"{llm['completion_tokens']:,} completion tokens"
+            )
+            calls = st.session_state.run_metrics.llm_calls()
+            if calls:
+                st.dataframe(pd.DataFrame(calls)[
+                    ["model", "cache", "wall_seconds", "prompt_tokens", "completion_tokens", "tokens_estimated"]
+                ], use_container_width=True)
+
     # --- Optional: Download Updated Results ---
     export_df = pd.DataFrame(
         st.session_state.final_state["final_output"]["products"],
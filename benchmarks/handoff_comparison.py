@@ -0,0 +1,62 @@
+"""
+Compares the in-process state hand-off with the JSON ToolMessage path.
+
+Runs the assortment workflow on a synthetic catalog in both STATE_HANDOFF modes and
+reports wall time and peak traced memory. No LLM inputs are used.
+
+    python benchmarks/handoff_comparison.py --rows 200000 --repeats 3
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Measure the hand-off itself, not parse-cache or checkpoint hits
+os.environ.setdefault("PARSE_CACHE", "off")
+os.environ.setdefault("NODE_MEMO", "off")
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "app"))
+
+from synthetic_data import generate_dataset
+
+
+def measure(workflow, paths, handoff, repeats):
+    timings = []
+    peaks = []
+    for _ in range(repeats):
+        tracemalloc.start()
+        start = time.perf_counter()
+        workflow.invoke({"store_id": "BENCH-001", "file_inputs": paths, "state_handoff": handoff})
+        timings.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {"best_seconds": round(min(timings), 3), "peak_mb": round(max(peaks) / 2**20, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+    from AssortmentEngineLanggraph import assortment_workflow
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = generate_dataset(directory, args.rows, include_text=False)
+        results = {
+            handoff: measure(assortment_workflow, paths, handoff, args.repeats)
+            for handoff in ("toolmessage", "inprocess")
+        }
+
+    print(json.dumps({"rows": args.rows, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
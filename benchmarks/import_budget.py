@@ -0,0 +1,82 @@
+"""
+Fails when the cold import time of an entry point exceeds its budget.
+
+Each module is imported in a fresh interpreter under ``python -X importtime``; the best
+cumulative time over ``--repeats`` runs is compared with IMPORT_BUDGETS_MS. Exits 1 on a
+regression and lists the slowest imports of the offending module.
+
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --scale 1.5   # slower CI machines
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Cold import budget per entry point, in milliseconds. Measured around 0.01s, 0.4s, 0.5s and
+# 1.1-1.3s (langgraph itself takes ~1.1s) on the reference machine, with ~2x headroom.
+IMPORT_BUDGETS_MS = {
+    "tools.llm": 100,
+    "tools.wrapped_tools": 800,
+    "feedback_helper": 1000,
+    "AssortmentEngineLanggraph": 2500,
+    "batch_runner": 2500,
+}
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_times(module: str) -> list:
+    """(self µs, cumulative µs, depth, module) per import of ``module`` in a fresh interpreter."""
+    code = f"import sys; sys.path[:0] = [{ROOT!r}, {os.path.join(ROOT, 'app')!r}]; import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            rows.append((int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2, match.group(4)))
+    return rows
+
+
+def cold_import_ms(module: str, repeats: int):
+    """Best cumulative import time of ``module`` and the import rows of that run."""
+    best = None
+    for _ in range(repeats):
+        rows = import_times(module)
+        total = next(cumulative for _, cumulative, depth, name in reversed(rows) if name == module and depth == 0)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    return best[0] / 1000, best[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=float(os.getenv("IMPORT_BUDGET_SCALE", 1.0)),
+                        help="Multiplier applied to every budget")
+    args = parser.parse_args()
+
+    failed = False
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        budget *= args.scale
+        elapsed, rows = cold_import_ms(module, args.repeats)
+        ok = elapsed <= budget
+        print(f"{'✅' if ok else '❌'} {module:<28} {elapsed:>8.1f} ms  (budget {budget:.0f} ms)")
+        if not ok:
+            failed = True
+            for self_us, _, _, name in sorted(rows, reverse=True)[:8]:
+                print(f"      {self_us / 1000:>8.1f} ms self  {name}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Offline stand-in for the OpenAI API used by the benchmarks.
+
+``install()`` replaces ``tools.llm._request`` with a function that answers each of the
+app's prompts with a small, well-formed canned response, so parsers and feedback run
+end to end with no network and no API key. Call counts and prompt sizes are recorded
+in ``CALLS``.
+"""
+import json
+
+CALLS = {"count": 0, "prompt_chars": 0}
+
+
+def _respond(prompt: str) -> str:
+    if "Planner feedback" in prompt:
+        return json.dumps({"products": [], "rationale": "Benchmark stub response."})
+    if '"word_counts"' in prompt:  # Trend chunk prompt (LLM_CHUNKING)
+        return json.dumps({"average_sentiment": 0.25, "themes": {"tech": [1]}, "word_counts": [["dorm", 3]]})
+    if "line numbers" in prompt:  # Survey chunk prompt (LLM_CHUNKING)
+        return json.dumps({"average_sentiment": 0.3, "themes": {"quality": [1]}})
+    if '"raw_mentions"' in prompt:  # Full trend prompt (ANALYSIS_BACKEND=llm)
+        return json.dumps({"average_sentiment": 0.25, "top_words": [], "themes": {}, "raw_mentions": []})
+    if '"raw_feedback"' in prompt:  # Full survey prompt (ANALYSIS_BACKEND=llm)
+        return json.dumps({"average_sentiment": 0.3, "themes": {}, "raw_feedback": []})
+    if "average_sentiment" in prompt:  # Sentiment-only prompt (hybrid backend)
+        return json.dumps({"average_sentiment": 0.2})
+    return json.dumps({})
+
+
+def stub_request(messages, model: str, temperature) -> str:
+    prompt = "\n".join(message.get("content", "") for message in messages)
+    CALLS["count"] += 1
+    CALLS["prompt_chars"] += len(prompt)
+    return _respond(prompt)
+
+
+def install() -> None:
+    """Routes every tools.llm request to the stub."""
+    import tools.llm
+
+    tools.llm._request = stub_request
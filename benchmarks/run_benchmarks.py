@@ -0,0 +1,221 @@
+"""
+Benchmarks the parsers, scoring, output generation and the full workflow.
+
+Generates seeded synthetic inputs per size, stubs the LLM (no network), and writes
+wall time, throughput and peak traced memory per stage to a JSON file, so regressions
+show up when results from two commits are compared.
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000
+    python benchmarks/run_benchmarks.py --sizes 1000000 --compare benchmarks/results/<previous>.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Measure real work: no parse cache, node memo or LLM response cache hits
+os.environ.setdefault("PARSE_CACHE", "off")
+os.environ.setdefault("NODE_MEMO", "off")
+os.environ.setdefault("LLM_MODE", "off")
+os.environ.setdefault("METRICS_SINK", "off")
+# Parsers read the CSVs; snapshot compile and open are timed as their own stages
+os.environ.setdefault("SNAPSHOTS", "off")
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "app"))
+
+import numpy as np
+import pandas as pd
+
+import llm_stub
+from synthetic_data import generate_dataset
+from tools.text_analysis import DEFAULT_ANALYSIS_BACKEND
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+# The per-product reference scorer is only timed up to this catalog size
+REFERENCE_MAX_ROWS = 100_000
+# Parse branches get this long before timing out (the app defaults are far shorter)
+PARSER_TIMEOUT_SECONDS = 3600
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(func, repeats):
+    """
+    Best and mean wall time over ``repeats`` untraced runs, then peak memory of one traced
+    run and the memory still held by its result.
+    """
+    from tools.shared_analysis import clear_text_analyses
+
+    timings = []
+    for _ in range(repeats):
+        clear_text_analyses()  # Trend/survey analyses are shared in memory by file digest
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    clear_text_analyses()
+    tracemalloc.start()
+    result = func()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {
+        "best_seconds": round(min(timings), 4),
+        "mean_seconds": round(sum(timings) / len(timings), 4),
+        "peak_mb": round(peak / 2**20, 2),
+        "retained_bytes": retained,
+    }
+
+
+def benchmark_size(rows, repeats, seed, directory):
+    from tools import (
+        parse_vendor_catalog, parse_sales_data, parse_competitor_data, parse_college_profile,
+        parse_survey_feedback, parse_trend_data,
+    )
+    from tools.wrapped_tools import PARSERS
+    from langgraph_score_node import score_products
+    from langgraph_output_node import generate_output
+    from AssortmentEngineLanggraph import assortment_workflow
+
+    start = time.perf_counter()
+    paths = generate_dataset(directory, rows, seed=seed)
+    print(f"Generated {rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+    stages = {
+        "parse_vendor_catalog": lambda: parse_vendor_catalog.parse_vendor_catalog(paths["vendor"]),
+        # Same catalog as interned columns with ProductRecord views (compare retained_bytes_per_row)
+        "load_vendor_catalog[compact]": lambda: parse_vendor_catalog.load_vendor_catalog(paths["vendor"], columnar=True),
+        "parse_sales_data": lambda: parse_sales_data.parse_sales_data(paths["sales"]),
+        "parse_competitor_data": lambda: parse_competitor_data.parse_competitor_data(paths["competitor"]),
+        "parse_college_profile": lambda: parse_college_profile.parse_college_profile(paths["college_profile"]),
+        "parse_survey_feedback": lambda: parse_survey_feedback.parse_survey_feedback(paths["survey"]),
+        "parse_trend_data": lambda: parse_trend_data.parse_trend_data(paths["trend"]),
+    }
+
+    # Node inputs exactly as the in-process graph hands them over
+    state = {"store_id": "BENCH-001"}
+    for key, path in paths.items():
+        state[f"{key}_data"] = PARSERS[key](path)
+    scored = {**state, **score_products(state)}
+
+    from tools.snapshot import compile_snapshot, open_snapshot_dir
+    from scoring_engine import score_catalog
+
+    snapshot_dir = os.path.join(directory, "snapshots")
+    for kind in ("vendor", "sales", "competitor"):
+        stages[f"compile_snapshot[{kind}]"] = (
+            lambda kind=kind: compile_snapshot(kind, paths[kind], snapshot_dir, force=True)
+        )
+    vendor_snapshot = compile_snapshot("vendor", paths["vendor"], snapshot_dir)
+    sales_snapshot = compile_snapshot("sales", paths["sales"], snapshot_dir)
+    themes = state["college_profile_data"].get("themes", [])
+
+    def score_from_snapshots():
+        # Unshared views: every run pays the cold open, as a new process would
+        score_catalog(open_snapshot_dir(vendor_snapshot, shared=False), open_snapshot_dir(sales_snapshot, shared=False),
+                      themes, 0.5, 0.5)
+
+    stages["score_catalog[snapshot]"] = score_from_snapshots
+    stages["score_products[vectorized]"] = lambda: score_products({**state, "scoring_mode": "vectorized"})
+    if rows <= REFERENCE_MAX_ROWS:
+        stages["score_products[reference]"] = lambda: score_products({**state, "scoring_mode": "reference"})
+    stages["generate_output"] = lambda: generate_output(scored)
+    stages["assortment_workflow.invoke"] = lambda: assortment_workflow.invoke({
+        "store_id": "BENCH-001",
+        "file_inputs": paths,
+        "parser_timeouts": {key: PARSER_TIMEOUT_SECONDS for key in paths},
+    })
+
+    results = []
+    for stage, func in stages.items():
+        calls_before = llm_stub.CALLS["count"]
+        stats = measure(func, repeats)
+        results.append({
+            "stage": stage,
+            "rows": rows,
+            **stats,
+            "rows_per_second": round(rows / stats["best_seconds"]) if stats["best_seconds"] else None,
+            "retained_bytes_per_row": round(stats["retained_bytes"] / rows, 1),
+            "llm_calls_per_run": (llm_stub.CALLS["count"] - calls_before) / (repeats + 1),
+        })
+        print(
+            f"  {stage:<30} {stats['best_seconds']:>9.4f}s  {stats['peak_mb']:>9.2f} MB"
+            f"  {results[-1]['retained_bytes_per_row']:>9.1f} B/row retained"
+        )
+    return results
+
+
+def compare(baseline_path, results, threshold=0.1):
+    """Prints stages whose best time or peak memory moved by more than ``threshold``."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["stage"], r["rows"]): r for r in json.load(f)["results"]}
+    for result in results:
+        before = baseline.get((result["stage"], result["rows"]))
+        if before is None:
+            continue
+        for metric in ("best_seconds", "peak_mb"):
+            if before[metric] and abs(result[metric] / before[metric] - 1) > threshold:
+                change = (result[metric] / before[metric] - 1) * 100
+                print(f"{result['stage']} @ {result['rows']:,}: {metric} {before[metric]} -> {result[metric]} ({change:+.0f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None, help="Results JSON path (default: benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+    llm_stub.install()
+
+    results = []
+    for rows in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            results.extend(benchmark_size(rows, args.repeats, args.seed, directory))
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "seed": args.seed,
+            "repeats": args.repeats,
+            "analysis_backend": DEFAULT_ANALYSIS_BACKEND,
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'local'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Seeded synthetic inputs for every file the assortment engine reads.
+
+    python benchmarks/synthetic_data.py /tmp/bench-inputs --rows 1000000
+
+The same ``rows`` and ``seed`` always produce byte-identical files. ``rows`` is the
+catalog size. Sales and competitor feeds have ``rows`` lines each. Trend and survey text
+have ``text_lines`` lines, defaulting to ``rows`` capped at MAX_TEXT_LINES, since the LLM
+backends send the whole file in one prompt.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+MAX_TEXT_LINES = 100_000
+
+THEMES = ["Tech-savvy", "Design-focused", "Budget-minded", "Climate-conscious", "Health-conscious",
+          "Cold-weather", "Tech-forward"]
+CATEGORIES = [("Tech", "Audio"), ("Tech", "Accessories"), ("Dorm", "Bedding"), ("Dorm", "Decor"),
+              ("Health", "Supplements"), ("Study", "Supplies")]
+SOURCES = ["Amazon", "Walmart", "Target", "BestBuy", "IKEA", "Costco"]
+PLATFORMS = ["TikTok", "Reddit", "Instagram", "Twitter"]
+TREND_TEMPLATES = [
+    "{platform}: Students love the {product} for dorm decor and study sessions.",
+    "{platform}: Lots of tech gadgets trending, especially {product}s and desk setups.",
+    "{platform}: Wellness and aesthetic bedding posts keep featuring the {product}.",
+    "{platform}: Not impressed with the {product}, too expensive for what it is.",
+]
+SURVEY_TEMPLATES = [
+    "I really love the {product} I got from the campus store, great quality!",
+    "The {product} was too expensive, pricing should be better.",
+    "Please add more {product}s to the selection, delivery was slow last time.",
+    "The dorm supplies are good but the {product} broke after a week.",
+]
+
+
+def _product_names(rows: int) -> np.ndarray:
+    return ("Product " + pd.Series(np.arange(rows)).astype(str)).to_numpy(dtype=object)
+
+
+def _text_lines(rng, names, templates, count):
+    products = rng.integers(0, len(names), count)
+    template_ids = rng.integers(0, len(templates), count)
+    platforms = rng.integers(0, len(PLATFORMS), count)
+    lines = []
+    for product, template, platform in zip(products.tolist(), template_ids.tolist(), platforms.tolist()):
+        fields = {"product": names[product].lower(), "platform": PLATFORMS[platform]}
+        lines.append(templates[template].format(**fields))
+    return "\n".join(lines) + "\n"
+
+
+def generate_dataset(directory: str, rows: int, seed: int = 7, text_lines: int = None,
+                     include_text: bool = True) -> dict:
+    """
+    Writes a full set of engine inputs.
+
+    Args:
+        directory (str): Output directory (created if missing).
+        rows (int): Catalog size; sales and competitor feeds have as many lines.
+        seed (int): Random seed.
+        text_lines (int, optional): Lines of trend and survey text.
+        include_text (bool): Whether to write the trend and survey files.
+
+    Returns:
+        Dict[str, str]: File path per input key, ready for state["file_inputs"].
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    names = _product_names(rows)
+    paths = {
+        "vendor": os.path.join(directory, "vendor_catalog.csv"),
+        "sales": os.path.join(directory, "sales_data.csv"),
+        "college_profile": os.path.join(directory, "college_profile.json"),
+        "competitor": os.path.join(directory, "competitor_data.csv"),
+    }
+
+    # Catalog: themes come from a fixed pool of JSON lists, like the real vendor feed
+    theme_pool = np.array(
+        [json.dumps(list(rng.choice(THEMES, size=rng.integers(1, 4), replace=False))) for _ in range(64)],
+        dtype=object,
+    )
+    categories = rng.integers(0, len(CATEGORIES), rows)
+    prices = np.round(rng.uniform(5, 120, rows), 2)
+    pd.DataFrame({
+        "name": names,
+        "category": np.array([c for c, _ in CATEGORIES], dtype=object)[categories],
+        "sub_category": np.array([s for _, s in CATEGORIES], dtype=object)[categories],
+        "price": prices,
+        "themes": theme_pool[rng.integers(0, len(theme_pool), rows)],
+    }).to_csv(paths["vendor"], index=False)
+
+    # Sales: one line per transaction batch, products repeat
+    pd.DataFrame({
+        "name": names[rng.integers(0, rows, rows)],
+        "total_units_sold": rng.integers(0, 400, rows),
+    }).to_csv(paths["sales"], index=False)
+
+    # Competitors: several sources quote each product around our price
+    quoted = rng.integers(0, rows, rows)
+    pd.DataFrame({
+        "name": names[quoted],
+        "competitor_price": np.round(prices[quoted] * rng.lognormal(0, 0.15, rows), 2),
+        "source": np.array(SOURCES, dtype=object)[rng.integers(0, len(SOURCES), rows)],
+    }).to_csv(paths["competitor"], index=False)
+
+    with open(paths["college_profile"], "w", encoding="utf-8") as f:
+        json.dump({
+            "store_id": "BENCH-001", "college_name": "Benchmark University", "region": "West",
+            "school_type": "Public", "themes": THEMES[:2], "season": "Fall 2025",
+            "housing_type": "Dorm", "enrollment_size": "Large",
+        }, f)
+
+    if include_text:
+        count = min(rows, MAX_TEXT_LINES) if text_lines is None else text_lines
+        paths["trend"] = os.path.join(directory, "trend_data.txt")
+        paths["survey"] = os.path.join(directory, "survey_feedback.txt")
+        with open(paths["trend"], "w", encoding="utf-8") as f:
+            f.write(_text_lines(rng, names, TREND_TEMPLATES, count))
+        with open(paths["survey"], "w", encoding="utf-8") as f:
+            f.write(_text_lines(rng, names, SURVEY_TEMPLATES, count))
+
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write seeded synthetic engine inputs.")
+    parser.add_argument("directory")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--text-lines", type=int, default=None)
+    args = parser.parse_args()
+    print(json.dumps(generate_dataset(args.directory, args.rows, args.seed, args.text_lines), indent=2))
+
+
+if __name__ == "__main__":
+    main()
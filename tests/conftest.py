@@ -0,0 +1,15 @@
+import os
+import sys
+
+# Same import layout as the app: repo root for tools/, app/ for the graph nodes, and
+# benchmarks/ for the synthetic data generator
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "app"))
+sys.path.append(os.path.join(ROOT, "benchmarks"))
+
+# Keep test runs off the shared caches and metrics file
+os.environ.setdefault("PARSE_CACHE", "off")
+os.environ.setdefault("NODE_MEMO", "off")
+os.environ.setdefault("LLM_MODE", "off")
+os.environ.setdefault("METRICS_SINK", "off")
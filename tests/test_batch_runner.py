@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from batch_runner import find_bundles
+
+
+def write_bundle(directory, store_id=None):
+    directory.mkdir()
+    (directory / "sales_data.csv").write_text("name,total_units_sold\nDesk Lamp,3\n", encoding="utf-8")
+    if store_id is not None:
+        (directory / "college_profile.json").write_text(json.dumps({"store_id": store_id}), encoding="utf-8")
+
+
+def test_store_ids_come_from_profiles_or_directories(tmp_path):
+    write_bundle(tmp_path / "a", store_id="UCLA-001")
+    write_bundle(tmp_path / "b")
+    (tmp_path / "empty").mkdir()
+    assert [bundle["store_id"] for bundle in find_bundles(str(tmp_path))] == ["UCLA-001", "b"]
+
+
+def test_duplicate_store_ids_are_rejected(tmp_path):
+    write_bundle(tmp_path / "a", store_id="UCLA-001")
+    write_bundle(tmp_path / "b", store_id="UCLA-001")
+    with pytest.raises(ValueError, match="UCLA-001"):
+        find_bundles(str(tmp_path))
+
+    # A profile's store_id may also collide with another bundle's directory name
+    write_bundle(tmp_path / "c", store_id="d")
+    write_bundle(tmp_path / "d")
+    (tmp_path / "b" / "college_profile.json").unlink()
+    with pytest.raises(ValueError, match="'d'"):
+        find_bundles(str(tmp_path))
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from AssortmentEngineLanggraph import assortment_workflow
+from batch_scoring import score_stores
+from synthetic_data import THEMES, generate_dataset
+from tools.parse_competitor_data import parse_competitor_data
+from tools.parse_sales_data import parse_sales_data
+from tools.parse_vendor_catalog import load_vendor_catalog
+from tools.sales_aggregator import fold_delta
+
+
+@pytest.fixture(scope="module")
+def inputs(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("batch")
+    paths = generate_dataset(str(directory), 400, include_text=False)
+    catalog = pd.read_csv(paths["vendor"])
+    rng = np.random.default_rng(3)
+    days = pd.date_range("2025-08-01", periods=60).strftime("%Y-%m-%d")
+    delta = pd.DataFrame({
+        "Date": rng.choice(days, 2000),
+        "name": rng.choice(catalog["name"].to_numpy(), 2000),
+        "Units Sold": rng.integers(0, 6, 2000),
+    })
+    delta.to_csv(directory / "delta.csv", index=False)
+    return {
+        "vendor": load_vendor_catalog(paths["vendor"], columnar=True),
+        "sales": parse_sales_data(paths["sales"]),
+        "windows": fold_delta(str(directory / "delta.csv"), path=str(directory / "aggregates")),
+        "price_index": parse_competitor_data(paths["competitor"])["price_index"],
+    }
+
+
+def stores(inputs):
+    def profile(store_id, themes):
+        return {"store_id": store_id, "themes": themes}
+
+    return [
+        {"store_id": "A", "college_profile_data": profile("A", THEMES[:2]), "sales_data": inputs["sales"],
+         "trend_data": {"average_sentiment": 0.7}, "survey_data": {"average_sentiment": 0.4}},
+        {"store_id": "B", "college_profile_data": profile("B", THEMES[2:3]), "sales_data": inputs["sales"],
+         "competitor_data": {"price_index": inputs["price_index"]}},
+        {"store_id": "C", "college_profile_data": profile("C", THEMES[:1]), "sales_data": inputs["windows"],
+         "sales_window": "7d", "competitor_data": {"price_index": inputs["price_index"]}},
+        {"store_id": "D", "college_profile_data": profile("D", []), "sales_data": inputs["windows"],
+         "sales_window": "decayed", "trend_data": {"average_sentiment": 0.2}},
+        # A windowed signal over all-time sales falls back to all-time units
+        {"store_id": "E", "college_profile_data": profile("E", THEMES[3:5]), "sales_data": inputs["sales"],
+         "sales_window": "30d"},
+        # The store_id comes from the profile
+        {"college_profile_data": profile("F", THEMES[1:3])},
+    ]
+
+
+def test_matches_single_store_workflow(inputs):
+    batch = stores(inputs)
+    results = score_stores(inputs["vendor"], batch)
+    assert [result["store_id"] for result in results] == ["A", "B", "C", "D", "E", "F"]
+    for store, result in zip(batch, results):
+        store_id = store.get("store_id") or store["college_profile_data"]["store_id"]
+        final_state = assortment_workflow.invoke(
+            {**store, "store_id": store_id, "vendor_data": inputs["vendor"], "file_inputs": {}}
+        )
+        assert result["scored_products"] == final_state["scored_products"][:20], store_id
+        assert result["final_output"] == final_state["final_output"], store_id
+
+
+def test_small_steps_match_one_step(inputs, monkeypatch):
+    import batch_scoring
+
+    batch = stores(inputs)
+    expected = score_stores(inputs["vendor"], batch)
+    monkeypatch.setattr(batch_scoring, "MAX_CELLS_PER_STEP", 1)
+    assert score_stores(inputs["vendor"], batch) == expected
+
+
+def test_store_without_id_is_rejected(inputs):
+    with pytest.raises(ValueError, match="store_id"):
+        score_stores(inputs["vendor"], [{"college_profile_data": {"themes": []}}])
@@ -0,0 +1,15 @@
+from tools.chunked_analysis import weighted_sentiment
+
+
+def test_weighted_by_line_count():
+    assert weighted_sentiment([(["a", "b", "c"], {"average_sentiment": 0.4}), (["d"], {"average_sentiment": -0.4})]) == 0.2
+
+
+def test_null_and_non_numeric_answers():
+    results = [
+        (["a", "b"], {"average_sentiment": None}),  # Counted as neutral
+        (["c", "d"], {"average_sentiment": "n/a"}),  # Left out
+        (["e", "f"], {"average_sentiment": 0.6}),
+    ]
+    assert weighted_sentiment(results) == 0.3
+    assert weighted_sentiment([(["a"], {"average_sentiment": "n/a"})]) == 0.0
@@ -0,0 +1,99 @@
+import pytest
+
+from feedback_commands import interpret_feedback
+
+STATE = {
+    "vendor_data": [{"name": name} for name in ("Coffee Mug", "Desk Lamp", "Notebook")],
+    "scored_products": [("Desk Lamp", 1.5), ("Coffee Mug", 1.2), ("Notebook", 0.9)],
+}
+
+
+@pytest.mark.parametrize("products", [
+    [("Desk Lamp", 1.5), ("Notebook", 0.9)],
+    ["Desk Lamp", "Notebook"],  # An LLM-revised list of bare names
+    [{"name": "Desk Lamp"}, {"name": "Notebook"}],
+])
+def test_add_after_an_llm_turn(products):
+    updated = interpret_feedback(STATE, {"products": products}, "add mug")
+    assert updated["products"] == [("Desk Lamp", 1.5), ("Coffee Mug", 1.2), ("Notebook", 0.9)]
+
+
+@pytest.mark.parametrize("products", [[{"sku": 1}], [["Desk Lamp", 1.5, "extra"]], ["Unknown Product"]])
+def test_unrecognized_products_fall_back_to_the_llm(products):
+    assert interpret_feedback(STATE, {"products": products}, "add mug") is None
+
+
+CATALOG_STATE = {
+    "vendor_data": [
+        {"name": name} for name in ("Desk Lamp", "Coffee Mug", "Notebook", "Shower Caddy", "Laptop Stand", "Laptop", "Floor Lamp")
+    ],
+    "scored_products": [
+        ("Desk Lamp", 1.5), ("Coffee Mug", 1.2), ("Notebook", 0.9), ("Shower Caddy", 0.8), ("Laptop Stand", 0.7),
+        ("Laptop", 0.6), ("Floor Lamp", 0.5),
+    ],
+}
+OUTPUT = {
+    "products": [("Desk Lamp", 1.5), ("Coffee Mug", 1.2), ("Notebook", 0.9)],
+    "rationale": "Recommendations for **UCLA-001** favour dorm essentials.",
+}
+
+
+def apply(feedback, output=OUTPUT):
+    return interpret_feedback(CATALOG_STATE, output, feedback)
+
+
+def names(updated):
+    return [name for name, _ in updated["products"]]
+
+
+def test_add_keeps_the_rationale_and_ranks_by_score():
+    updated = apply("please add the shower caddies")
+    assert names(updated) == ["Desk Lamp", "Coffee Mug", "Notebook", "Shower Caddy"]
+    assert updated["rationale"] == f"{OUTPUT['rationale']}\n\nAdded Shower Caddy (score 0.8)."
+    again = interpret_feedback(CATALOG_STATE, updated, "remove notebook")
+    assert again["rationale"].startswith(updated["rationale"])
+    assert again["rationale"].endswith("Removed Notebook.")
+
+
+def test_duplicate_add_is_a_note():
+    updated = apply("add desk lamp")
+    assert updated["products"] == OUTPUT["products"]
+    assert updated["rationale"].endswith("Desk Lamp is already in the list.")
+
+
+def test_remove_and_swap():
+    assert names(apply("remove the mug")) == ["Desk Lamp", "Notebook"]
+    swapped = apply("swap notebook with laptop stand")
+    assert swapped["products"] == [("Desk Lamp", 1.5), ("Coffee Mug", 1.2), ("Laptop Stand", 0.7)]
+    assert swapped["rationale"].endswith("Replaced Notebook with Laptop Stand (score 0.7).")
+    # Removing something not recommended is left to the LLM
+    assert apply("remove shower caddy") is None
+
+
+def test_moves_clamp_to_the_top():
+    assert names(apply("move notebook up")) == ["Desk Lamp", "Notebook", "Coffee Mug"]
+    moved = apply("bump notebook up by 10")
+    assert names(moved) == ["Notebook", "Desk Lamp", "Coffee Mug"]
+    assert moved["rationale"].endswith("Moved Notebook to position 1.")
+    assert names(apply("prioritize the desk lamp")) == ["Desk Lamp", "Coffee Mug", "Notebook"]
+    assert names(apply("move coffee mug to the top and remove notebook")) == ["Coffee Mug", "Desk Lamp"]
+
+
+def test_ambiguous_and_unknown_names_fall_back_to_the_llm():
+    assert names(apply("add laptops"))[-1] == "Laptop"  # The exact name wins over "Laptop Stand"
+    assert names(apply("add stand"))[-1] == "Laptop Stand"
+    assert names(apply("add floor lamp"))[-1] == "Floor Lamp"
+    assert apply("add lamp") is None  # Desk Lamp or Floor Lamp
+    assert apply("add something nice") is None
+    assert apply("what sells best?") is None
+
+
+def test_fuzzy_match_threshold():
+    from difflib import SequenceMatcher
+
+    from feedback_commands import FUZZY_CUTOFF, normalize_name
+
+    assert SequenceMatcher(None, "notebok", normalize_name("Notebook")).ratio() >= FUZZY_CUTOFF
+    assert names(apply("swap mug with notebok", {"products": [("Coffee Mug", 1.2)]})) == ["Notebook"]
+    assert SequenceMatcher(None, "nbook", normalize_name("Notebook")).ratio() < FUZZY_CUTOFF
+    assert apply("swap mug with nbook", {"products": [("Coffee Mug", 1.2)]}) is None
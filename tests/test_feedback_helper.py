@@ -0,0 +1,41 @@
+import json
+import os
+
+import pytest
+
+import feedback_helper
+from tools import snapshot, wrapped_tools
+from tools.wrapped_tools import PARSERS
+
+UPLOADS = os.path.join(os.path.dirname(__file__), "..", "uploads")
+
+
+def upload_state():
+    return {
+        "vendor_data": PARSERS["vendor"](os.path.join(UPLOADS, "vendor_catalog.csv")),
+        "sales_data": PARSERS["sales"](os.path.join(UPLOADS, "sales_data.csv")),
+        "competitor_data": PARSERS["competitor"](os.path.join(UPLOADS, "competitor_data.csv")),
+    }
+
+
+@pytest.mark.parametrize("snapshots", [True, False])
+def test_full_context_prompt_contains_the_parsed_data(tmp_path, monkeypatch, snapshots):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(wrapped_tools, "SNAPSHOTS_ENABLED", snapshots)
+    monkeypatch.setattr(feedback_helper, "FEEDBACK_CONTEXT", "full")
+    monkeypatch.setattr(feedback_helper, "FEEDBACK_FAST_PATH", False)
+    state = upload_state()
+    prompts = []
+
+    def chat_completion(messages, **kwargs):
+        prompts.append(messages[0]["content"])
+        return json.dumps({"products": [], "rationale": "ok"})
+
+    monkeypatch.setattr(feedback_helper, "chat_completion", chat_completion)
+    feedback_helper.apply_feedback_to_output(state, {"products": [], "rationale": ""}, "What sells best?")
+
+    prompt = prompts[0]
+    assert "object at 0x" not in prompt
+    for name in list(state["vendor_data"].names[:3]) + list(state["sales_data"])[:3]:
+        assert name in prompt
+    assert json.loads(feedback_helper.safe_json_stringify(state))["vendor_data"][0]["name"] == state["vendor_data"][0]["name"]
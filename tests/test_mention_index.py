@@ -0,0 +1,59 @@
+import re
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from tools import mention_index
+from tools.mention_index import MentionIndex, _Automaton, product_variants
+
+
+def regex_counts(product_names, texts):
+    """The alternation regex MentionIndex replaced: longest variant first, whole words."""
+    variant_to_product = {}
+    for name in product_names:
+        for variant in product_variants(name):
+            variant_to_product.setdefault(variant, name)
+    alternation = "|".join(re.escape(v) for v in sorted(variant_to_product, key=len, reverse=True))
+    pattern = re.compile(rf"(?<!\w)(?:{alternation})(?!\w)")
+    counts = Counter()
+    for text in texts:
+        counts.update(variant_to_product[match] for match in pattern.findall(text.lower()))
+    return dict(counts)
+
+
+NAMES = ["Laptop", "Laptop Stand", "Desk Lamp", "Lamp", "Battery", "Box", "Mini Fridge", "Dorm Fridge", "Café Mug"]
+
+
+def random_texts(seed, count=300):
+    rng = np.random.default_rng(seed)
+    words = [
+        "laptop", "laptops", "stand", "stands", "desk", "lamp", "lamps", "batteries", "battery", "boxes",
+        "box", "mini", "fridge", "fridges", "dorm", "café", "mug", "mugs", "the", "a", "love", "laptop-stand",
+        "lamp_post", "LAPTOP", "Desk", "x", "my",
+    ]
+    separators = [" ", " ", " ", ", ", ". ", "!", "-", "/"]
+    return [
+        "".join(rng.choice(words) + rng.choice(separators) for _ in range(rng.integers(1, 20)))
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_counts_match_the_regex(seed):
+    texts = random_texts(seed)
+    assert MentionIndex(NAMES).count(texts) == regex_counts(NAMES, texts)
+
+
+def test_pure_python_automaton_matches(monkeypatch):
+    monkeypatch.setattr(mention_index, "ahocorasick", None)
+    index = MentionIndex(NAMES)
+    assert isinstance(index.automaton, _Automaton)
+    texts = random_texts(9)
+    assert index.count(texts) == regex_counts(NAMES, texts)
+
+
+def test_longest_name_wins_once():
+    assert MentionIndex(NAMES).count(["Laptop stands and a laptop, desk lamps"]) == {
+        "Laptop Stand": 1, "Laptop": 1, "Desk Lamp": 1,
+    }
@@ -0,0 +1,104 @@
+import time
+
+from node_cache import CheckpointStore, lineage_key
+
+
+def test_persisted_results_are_capped(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite"), memory_entries=0, max_entries=3)
+    for i in range(5):
+        store.put(f"k{i}", "score_products", {"scored_products": [("P", i)]})
+    assert store.get("k0") is None and store.get("k1") is None
+    assert [store.get(f"k{i}")["scored_products"] for i in (2, 3, 4)] == [[("P", 2)], [("P", 3)], [("P", 4)]]
+
+
+def test_expired_results_are_ignored(tmp_path, monkeypatch):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite"), memory_entries=0, ttl_seconds=60)
+    store.put("old", "score_products", {"scored_products": []})
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert store.get("old") is None
+
+
+def test_hits_are_copies(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite"))
+    update = {"scored_products": [("P", 1.0)], "sales_data": {"P": {"total_units_sold": 3}}}
+    store.put("k", "score_products", update, persist=False)
+    update["scored_products"].append(("Q", 0.5))
+    hit = store.get("k", persist=False)
+    hit["sales_data"]["P"]["total_units_sold"] = 0
+    assert store.get("k", persist=False) == {"scored_products": [("P", 1.0)], "sales_data": {"P": {"total_units_sold": 3}}}
+
+
+def test_unset_params_are_keyed_by_their_defaults():
+    state = {"input_digests": {"sales": "sales:1:abc"}}
+    weekly = lineage_key("score_products", state, ["sales"], {"sales_window": "7d"})
+    assert weekly != lineage_key("score_products", state, ["sales"], {"sales_window": "all"})
+    assert weekly == lineage_key("score_products", {**state, "sales_window": "7d"}, ["sales"], {"sales_window": "all"})
+
+
+RESUME_SCRIPT = """
+import json, sys
+from AssortmentEngineLanggraph import assortment_workflow
+uploads = sys.argv[1]
+state = {
+    "store_id": "UCLA-001",
+    "scoring_mode": sys.argv[2],
+    "file_inputs": {
+        "vendor": f"{uploads}/vendor_catalog.csv",
+        "sales": f"{uploads}/sales_data.csv",
+        "college_profile": f"{uploads}/college_profile.json",
+        "competitor": f"{uploads}/competitor_data.csv",
+    },
+}
+try:
+    final_state = assortment_workflow.invoke(state)
+except ValueError as e:
+    print(json.dumps({"error": str(e)}))
+else:
+    print(json.dumps({key: timing["status"] for key, timing in final_state["parse_timings"].items()}))
+"""
+
+
+def test_second_process_resumes_after_a_failed_score(tmp_path):
+    import json
+    import os
+    import subprocess
+    import sys
+
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    env = {
+        **os.environ,
+        "NODE_MEMO": "on",
+        "PARSE_CACHE": "off",
+        "SNAPSHOTS": "on",
+        "SNAPSHOT_DIR": str(tmp_path / "snapshots"),
+        "CHECKPOINT_PATH": str(tmp_path / "checkpoints.sqlite"),
+        "PYTHONPATH": os.pathsep.join([root, os.path.join(root, "app")]),
+    }
+
+    def run(scoring_mode):
+        result = subprocess.run(
+            [sys.executable, "-c", RESUME_SCRIPT, os.path.join(root, "uploads"), scoring_mode],
+            env=env, cwd=str(tmp_path), capture_output=True, text=True, check=True,
+        )
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    # The first process parses every input, then fails in score_products
+    assert "Unknown scoring mode" in run("broken")["error"]
+    statuses = run("vectorized")
+    assert {statuses[key] for key in ("vendor", "sales", "college_profile", "competitor")} == {"cached"}
+
+
+def _pruned_snapshot():
+    raise FileNotFoundError("snapshot pruned")
+
+
+class PrunedView:
+    def __reduce__(self):
+        return _pruned_snapshot, ()
+
+
+def test_unloadable_results_are_misses(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite"), memory_entries=0)
+    store.put("k", "parse_sales", PrunedView())
+    assert store.get("k") is None
@@ -0,0 +1,14 @@
+import os
+
+import pytest
+
+from tools.parse_cache import ParseCache
+
+
+def test_failed_writes_leave_no_temp_files(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    cache.put("ok", {"rows": 1})
+    with pytest.raises(TypeError):
+        cache.put("broken", {"rows": object()})
+    assert sorted(os.listdir(tmp_path)) == ["ok.json"]
+    assert cache.get("ok") == {"rows": 1} and cache.get("broken") is None
@@ -0,0 +1,36 @@
+import math
+
+import pandas as pd
+import pytest
+
+from tools import parse_competitor_data as competitor_parser
+from tools.parse_competitor_data import parse_competitor_data
+
+
+def test_streaming_matches_in_memory(tmp_path, monkeypatch):
+    path = tmp_path / "competitor_data.csv"
+    pd.DataFrame(
+        [
+            ("Desk Lamp", 19.99, "Amazon"), ("Desk Lamp", 24.5, "Target"), ("Desk Lamp", 21.0, None),
+            (None, 5.0, "Amazon"), ("Coffee Mug", None, "Walmart"), ("Coffee Mug", 8.0, "Walmart"),
+            ("Notebook", 3.25, None), (None, None, None), ("Desk Lamp", 22.0, "Amazon"), ("Notebook", 2.75, "Etsy"),
+        ],
+        columns=["name", "competitor_price", "source"],
+    ).to_csv(path, index=False)
+
+    in_memory = parse_competitor_data(str(path))
+    monkeypatch.setattr(competitor_parser, "STREAMING_THRESHOLD_BYTES", 0)
+    monkeypatch.setattr(competitor_parser, "DEFAULT_CHUNKSIZE", 3)
+    streamed = parse_competitor_data(str(path))
+
+    assert streamed["products"] == in_memory["products"] == ["Desk Lamp", "Coffee Mug", "Notebook"]
+    assert streamed["sources"] == in_memory["sources"] == ["Amazon", "Target", "Walmart", "Etsy"]
+    for key in ("min_price", "max_price", "avg_price"):
+        assert streamed[key] == pytest.approx(in_memory[key])
+    assert list(streamed["price_index"]) == list(in_memory["price_index"])
+    for name, expected in in_memory["price_index"].items():
+        actual = streamed["price_index"][name]
+        assert actual["source_count"] == expected["source_count"], name
+        assert (actual["min_price"], actual["max_price"]) == (expected["min_price"], expected["max_price"])
+        assert math.isclose(actual["median_price"], expected["median_price"], rel_tol=0.02), name
+    assert in_memory["price_index"]["Desk Lamp"]["source_count"] == 2
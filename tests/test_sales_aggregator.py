@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools import sales_aggregator
+from tools.sales_aggregator import SALES_DECAY_HALF_LIFE_DAYS, WINDOW_DAYS, SalesAggregates, fold_delta, read_delta
+
+
+def write_delta(path, rows):
+    pd.DataFrame(rows, columns=["Date", "name", "Units Sold", "Revenue"]).to_csv(path, index=False)
+    return str(path)
+
+
+def recompute(rows):
+    """Brute-force aggregates over every row folded so far."""
+    df = pd.DataFrame(rows, columns=["Date", "name", "units", "revenue"])
+    df["day"] = pd.to_datetime(df["Date"]).to_numpy().astype("datetime64[D]").astype(np.int64)
+    as_of = df["day"].max()
+    age = as_of - df["day"]
+    expected = {}
+    for name, group in df.groupby("name"):
+        g_age = age[group.index]
+        stats = {
+            "total_units_sold": group["units"].sum(),
+            "total_revenue": group["revenue"].sum(),
+            "decayed_units": (group["units"] * 0.5 ** (g_age / SALES_DECAY_HALF_LIFE_DAYS)).sum(),
+            "avg_units_per_day": group["units"].sum() / group["day"].nunique(),
+            "last_sale_date": str(np.datetime64(int(group["day"].max()), "D")),
+        }
+        for days in WINDOW_DAYS:
+            stats[f"units_{days}d"] = group["units"][g_age < days].sum()
+            stats[f"revenue_{days}d"] = group["revenue"][g_age < days].sum()
+        expected[name] = stats
+    return expected
+
+
+def test_late_row_for_unseen_day_counts_as_a_sale_day(tmp_path):
+    aggregate = tmp_path / "agg"
+    for day in ("2025-01-10", "2025-01-20", "2025-01-15"):
+        view = fold_delta(write_delta(tmp_path / f"{day}.csv", [(day, "Mug", 2, 10.0)]), path=str(aggregate))
+    assert view["Mug"]["avg_units_per_day"] == 2.0
+    assert view["Mug"]["total_units_sold"] == 6
+    assert view["Mug"]["units_7d"] == 4
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_fold_matches_recompute(tmp_path, seed):
+    rng = np.random.default_rng(seed)
+    names = [f"P{i}" for i in range(30)]
+    # Each delta covers its own days, delivered out of order (late and very late deltas)
+    days = pd.date_range("2025-01-01", periods=300).strftime("%Y-%m-%d").tolist()
+    rng.shuffle(days)
+    aggregate = tmp_path / "agg"
+    rows = []
+    for i, chunk in enumerate(np.array_split(np.array(days[:150]), 50)):
+        delta = [
+            (day, name, int(rng.integers(0, 9)), round(float(rng.uniform(0, 50)), 2))
+            for day in chunk for name in rng.choice(names, int(rng.integers(1, 8)), replace=False)
+        ]
+        rows.extend(delta)
+        view = fold_delta(write_delta(tmp_path / f"delta_{i}.csv", delta), path=str(aggregate))
+
+    expected = recompute(rows)
+    assert set(view) == set(expected)
+    for name, stats in expected.items():
+        actual = view[name]
+        for field, value in stats.items():
+            if field == "last_sale_date":
+                assert actual[field] == value
+            else:
+                assert actual[field] == pytest.approx(value, abs=1e-3), (name, field)
+
+
+def test_refolding_the_same_delta_is_a_no_op(tmp_path):
+    delta = write_delta(tmp_path / "d.csv", [("2025-03-01", "Mug", 3, 9.0)])
+    fold_delta(delta, path=str(tmp_path / "agg"))
+    view = fold_delta(delta, path=str(tmp_path / "agg"))
+    assert view["Mug"]["total_units_sold"] == 3
+
+
+def test_corrected_export_for_a_folded_day_is_rejected(tmp_path):
+    fold_delta(write_delta(tmp_path / "a.csv", [("2025-03-01", "Mug", 3, 9.0)]), path=str(tmp_path / "agg"))
+    corrected = write_delta(tmp_path / "b.csv", [("2025-03-01", "Mug", 4, 12.0), ("2025-03-02", "Mug", 1, 3.0)])
+    with pytest.raises(ValueError, match="2025-03-01"):
+        fold_delta(corrected, path=str(tmp_path / "agg"))
+    assert SalesAggregates.load(str(tmp_path / "agg")).view()["Mug"]["total_units_sold"] == 3
+
+
+def test_stores_fold_into_separate_aggregates(tmp_path, monkeypatch):
+    monkeypatch.setattr(sales_aggregator, "SALES_AGGREGATE_DIR", str(tmp_path / "aggregates"))
+    delta = write_delta(tmp_path / "sales_data.csv", [("2025-03-01", "Mug", 3, 9.0)])
+    fold_delta(delta, "STORE-A")
+    assert fold_delta(delta, "STORE-B")["Mug"]["total_units_sold"] == 3
+    assert sales_aggregator.aggregate_path("STORE-A") != sales_aggregator.aggregate_path("STORE-B")
+    assert sales_aggregator.aggregate_path("../x").startswith(str(tmp_path / "aggregates"))
+    with pytest.raises(ValueError):
+        fold_delta(delta)
+
+
+def test_saved_aggregates_round_trip(tmp_path):
+    path = write_delta(tmp_path / "d.csv", [("2025-03-01", "Mug", 3, 9.0), ("2025-03-02", "Pen", 1, 1.5)])
+    aggregates = SalesAggregates(str(tmp_path / "agg"))
+    aggregates.fold(read_delta(path))
+    aggregates.save()
+    assert SalesAggregates.load(str(tmp_path / "agg")).view().to_python() == aggregates.view().to_python()
+
+
+def test_chunked_read_matches_whole_read(tmp_path):
+    rows = [(f"2025-03-{day:02d}", f"P{i % 7}", i % 5, float(i)) for i in range(200) for day in (1 + i % 9,)]
+    path = write_delta(tmp_path / "d.csv", rows)
+    pd.testing.assert_frame_equal(read_delta(path, chunksize=13), read_delta(path))
+
+
+def test_dated_export_is_parsed_whole_unless_folding_is_requested(tmp_path, monkeypatch):
+    from tools.wrapped_tools import parse_sales_input
+
+    monkeypatch.setattr(sales_aggregator, "SALES_AGGREGATE_DIR", str(tmp_path / "aggregates"))
+    columns = ["Date", "name", "total_units_sold"]
+    first = tmp_path / "export_a.csv"
+    pd.DataFrame([("2025-09-01", "Mug", 2), ("2025-09-02", "Mug", 3)], columns=columns).to_csv(first, index=False)
+    refreshed = tmp_path / "export_b.csv"
+    pd.DataFrame(
+        [("2025-09-01", "Mug", 2), ("2025-09-02", "Mug", 3), ("2025-09-03", "Mug", 1)], columns=columns
+    ).to_csv(refreshed, index=False)
+
+    assert parse_sales_input(str(first), "STORE-A")["Mug"]["total_units_sold"] == 5
+    assert parse_sales_input(str(refreshed), "STORE-A")["Mug"]["total_units_sold"] == 6
+    assert not os.path.exists(sales_aggregator.aggregate_path("STORE-A"))
+    assert parse_sales_input(str(first), "STORE-A", delta=True)["Mug"]["units_7d"] == 5
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.sales_cube import build_cube, load_cube, save_cube, season_of
+
+STORES = [f"S{i}" for i in range(6)]
+
+
+@pytest.fixture(scope="module")
+def export(tmp_path_factory):
+    rng = np.random.default_rng(4)
+    n = 2000
+    df = pd.DataFrame({
+        "Store ID": rng.choice(STORES, n),
+        "name": rng.choice([f"P{i}" for i in range(15)], n),
+        "Units Sold": rng.integers(1, 20, n),
+        "Date": (pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, n), "D")).strftime("%Y-%m-%d"),
+    })
+    path = tmp_path_factory.mktemp("cube") / "sales_export.csv"
+    df.to_csv(path, index=False)
+    df["season"] = season_of(pd.to_datetime(df["Date"]))
+    profiles = [
+        {"store_id": store, "region": ["East", "West"][i % 2], "school_type": ["Public", "Private"][i % 3 == 0],
+         "enrollment_size": "Large", "season": "Fall 2025", "themes": [["Tech-savvy"], ["Budget-minded"]][i // 3]}
+        for i, store in enumerate(STORES)
+    ]
+    return str(path), df, profiles
+
+
+def units(rows):
+    return {name: {"total_units_sold": int(v)} for name, v in rows.groupby("name")["Units Sold"].sum().items()}
+
+
+def test_slices_and_rollups_match_groupby(export):
+    path, df, profiles = export
+    cube = build_cube(path, profiles)
+    for store in STORES:
+        assert cube.store_sales(store).to_python() == units(df[df["Store ID"] == store])
+        assert cube.store_sales(store, "Fall 2025").to_python() == units(
+            df[(df["Store ID"] == store) & (df["season"] == "Fall 2025")]
+        )
+    region = df["Store ID"].map({p["store_id"]: p["region"] for p in profiles})
+    assert cube.rollup("region", "West").to_python() == units(df[region == "West"])
+    assert cube.rollup("season", "Spring 2025").to_python() == units(df[df["season"] == "Spring 2025"])
+
+
+def test_cold_start_uses_themes_and_season(export):
+    path, df, profiles = export
+    cube = build_cube(path, profiles)
+    new_store = {"store_id": "NEW", "region": "Nowhere", "school_type": "Public", "enrollment_size": "Small",
+                 "season": "Spring 2025", "themes": ["Budget-minded"]}
+    # Public (S1, S2, S4, S5) plus the Budget-minded theme (S3, S4, S5)
+    assert cube.similar_stores(new_store) == [("S4", 2), ("S5", 2)]
+    sales, sources = cube.sales_for(new_store)
+    assert sources == ["S4", "S5"]
+    pooled = df[df["Store ID"].isin(sources) & (df["season"] == "Spring 2025")]
+    expected = pooled.groupby("name")["Units Sold"].sum() / 2
+    assert {name: stats["total_units_sold"] for name, stats in sales.items()} == {
+        name: int(round(v)) for name, v in expected.items()
+    }
+
+    unlike = {"store_id": "NEW", "region": "Nowhere", "school_type": "Online", "themes": ["Outdoors"]}
+    assert cube.similar_stores(unlike) == []
+    assert len(cube.sales_for(unlike)[0]) == 0
+
+
+def test_profile_season_without_sales_reads_every_season(export):
+    path, df, profiles = export
+    cube = build_cube(path, profiles)
+    sales, _ = cube.sales_for({"store_id": "S0", "season": "Fall 2031"})
+    assert sales.to_python() == units(df[df["Store ID"] == "S0"])
+
+
+def test_round_trip(export, tmp_path):
+    path, _, profiles = export
+    cube = build_cube(path, profiles)
+    save_cube(cube, str(tmp_path / "cube.npz"))
+    loaded = load_cube(str(tmp_path / "cube.npz"))
+    assert loaded.store_sales("S2").to_python() == cube.store_sales("S2").to_python()
+    assert loaded.similar_stores(profiles[0]) == cube.similar_stores(profiles[0])
@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pytest
+
+from langgraph_score_node import score_products_reference
+from scoring_engine import score_catalog
+from synthetic_data import THEMES, generate_dataset
+from tools.parse_competitor_data import parse_competitor_data
+from tools.parse_sales_data import parse_sales_data
+from tools.parse_vendor_catalog import load_vendor_catalog, parse_vendor_catalog
+
+UPLOADS = os.path.join(os.path.dirname(__file__), "..", "uploads")
+SENTIMENTS = [(0.5, 0.5), (0.3, 0.6), (1.0, 1.0), (0.0, 0.85)]
+
+
+def assert_equivalent(vendor_data, sales_data, store_themes, price_index):
+    for trend, survey in SENTIMENTS:
+        for prices in (None, price_index):
+            expected = score_products_reference(vendor_data, sales_data, store_themes, trend, survey, prices)
+            assert score_catalog(vendor_data, sales_data, store_themes, trend, survey, price_index=prices) == expected
+
+
+def parsed_inputs(paths):
+    return (
+        parse_vendor_catalog(paths["vendor"]),
+        load_vendor_catalog(paths["vendor"], columnar=True),
+        parse_sales_data(paths["sales"]),
+        parse_competitor_data(paths["competitor"])["price_index"],
+    )
+
+
+def test_uploads():
+    paths = {key: os.path.join(UPLOADS, f"{key}.csv") for key in ("vendor_catalog", "sales_data", "competitor_data")}
+    records, columns, sales, price_index = parsed_inputs({
+        "vendor": paths["vendor_catalog"], "sales": paths["sales_data"], "competitor": paths["competitor_data"],
+    })
+    for vendor_data in (records, columns):
+        assert_equivalent(vendor_data, sales, ["Tech-savvy", "Budget-minded"], price_index)
+
+
+@pytest.mark.parametrize("rows", [50, 5000])
+def test_synthetic(tmp_path, rows):
+    records, columns, sales, price_index = parsed_inputs(generate_dataset(str(tmp_path), rows, include_text=False))
+    for vendor_data in (records, columns):
+        assert_equivalent(vendor_data, sales, THEMES[:2], price_index)
+
+
+def test_half_cent_ties():
+    # Sales in half units put raw scores on (or a float error away from) half-cents, where
+    # NumPy's rounding differs from round(); equal scores keep catalog order
+    units = np.arange(0, 400, 0.5)
+    vendor_data = [
+        {"name": f"P{i}", "price": 10.0, "themes": ["Tech-savvy"] if i % 3 else []} for i in range(len(units))
+    ]
+    sales = {f"P{i}": {"total_units_sold": float(u)} for i, u in enumerate(units)}
+    price_index = {f"P{i}": {"median_price": 10.0 + (i % 7) * 0.05} for i in range(0, len(units), 2)}
+    assert_equivalent(vendor_data, sales, ["Tech-savvy"], price_index)
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from tools import parse_trend_data as trend_parser, shared_analysis
+from tools.parse_survey_feedback import parse_survey_feedback
+from tools.parse_trend_data import parse_trend_data
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    shared_analysis.clear_text_analyses()
+    passes, llm_calls = [], []
+    analyze_text = shared_analysis.analyze_text
+    monkeypatch.setattr(shared_analysis, "analyze_text", lambda *args: passes.append(args[1]) or analyze_text(*args))
+    monkeypatch.setattr(
+        shared_analysis, "llm_average_sentiment", lambda lines, temperature: llm_calls.append("hybrid") or 0.9
+    )
+    monkeypatch.setattr(
+        trend_parser, "llm_trend_analysis",
+        lambda lines: llm_calls.append("llm") or {"average_sentiment": 0.1, "raw_mentions": lines},
+    )
+    pd.DataFrame({
+        "name": ["Desk Lamp", "Mini Fridge"], "category": ["Dorm", "Dorm"], "sub_category": ["Lighting", "Kitchen"],
+        "price": [20.0, 90.0], "themes": ["[]", "[]"],
+    }).to_csv(tmp_path / "vendor_catalog.csv", index=False)
+    (tmp_path / "trend_data.txt").write_text("Love my desk lamp\nThe mini fridge is great tech\n", encoding="utf-8")
+    (tmp_path / "survey_feedback.txt").write_text("More dorm supplies please\n", encoding="utf-8")
+    yield {
+        "catalog": str(tmp_path / "vendor_catalog.csv"),
+        "trend": str(tmp_path / "trend_data.txt"),
+        "survey": str(tmp_path / "survey_feedback.txt"),
+        "passes": passes,
+        "llm_calls": llm_calls,
+    }
+    shared_analysis.clear_text_analyses()
+
+
+@pytest.mark.parametrize("backend", ["local", "hybrid", "llm"])
+def test_parsers_read_the_prefetched_pass(files, backend):
+    # What "Process Files" starts, then the charts, then the engine's trend parser
+    shared_analysis.get_text_analysis(files["trend"], "trend", catalog_path=files["catalog"], backend=backend)
+    charts = shared_analysis.get_text_analysis(files["trend"], "trend", catalog_path=files["catalog"], backend="local")
+    parsed = parse_trend_data(files["trend"], backend=backend)
+
+    assert files["passes"] == ["trend"]
+    assert files["llm_calls"] == ([] if backend == "local" else [backend])
+    assert charts["mentions"] == {"Desk Lamp": 1, "Mini Fridge": 1}
+    expected = {"local": charts["average_sentiment"], "hybrid": 0.9, "llm": 0.1}[backend]
+    assert parsed["average_sentiment"] == expected
+    if backend != "llm":
+        assert parsed["themes"] == charts["themes"] and parsed["raw_mentions"] == charts["lines"]
+
+
+def test_charts_never_wait_on_the_llm(files, monkeypatch):
+    import threading
+
+    release = threading.Event()
+    monkeypatch.setattr(shared_analysis, "llm_average_sentiment", lambda lines, temperature: release.wait(5) and 0.9)
+    pending = shared_analysis.start_text_analysis(files["survey"], "survey", catalog_path=files["catalog"], backend="hybrid")
+    charts = shared_analysis.get_text_analysis(files["survey"], "survey", catalog_path=files["catalog"], backend="local")
+    assert not pending.done()
+    assert charts["themes"]["dorm"] == ["More dorm supplies please"]
+    release.set()
+    assert parse_survey_feedback(files["survey"], backend="hybrid")["average_sentiment"] == 0.9
+    assert files["passes"] == ["survey"]
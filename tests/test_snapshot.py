@@ -0,0 +1,104 @@
+import json
+import os
+import pickle
+import time
+
+import pandas as pd
+import pytest
+
+from langgraph_score_node import score_products_reference
+from scoring_engine import score_catalog
+from synthetic_data import THEMES, generate_dataset
+from tools.parse_competitor_data import parse_competitor_data
+from tools.parse_sales_data import parse_sales_data
+from tools.parse_vendor_catalog import parse_vendor_catalog
+from tools import snapshot
+from tools.snapshot import Snapshot, open_snapshot, to_python
+
+
+@pytest.fixture(scope="module", params=[50, 5000])
+def dataset(request, tmp_path_factory):
+    directory = tmp_path_factory.mktemp(f"snapshot{request.param}")
+    paths = generate_dataset(str(directory), request.param, include_text=False)
+    # Duplicate names, a blank theme cell and a double-listed theme
+    with open(paths["vendor"], "a", encoding="utf-8") as f:
+        f.write('Product 1,Dorm,Decor,3.5,\nProduct 2,Dorm,Decor,0,"[""Tech-savvy"", ""Tech-savvy""]"\n')
+    snapshot_dir = str(directory / "snapshots")
+    snapshots = {kind: open_snapshot(kind, paths[kind], snapshot_dir) for kind in ("vendor", "sales", "competitor")}
+    return paths, snapshots
+
+
+def test_snapshots_match_the_parsers(dataset):
+    paths, snapshots = dataset
+    assert snapshots["vendor"].to_records() == parse_vendor_catalog(paths["vendor"])
+    sales = parse_sales_data(paths["sales"])
+    assert snapshots["sales"].to_python() == sales and dict(snapshots["sales"]) == sales
+    competitor = parse_competitor_data(paths["competitor"])
+    assert json.loads(json.dumps(snapshots["competitor"], default=to_python)) == json.loads(json.dumps(competitor))
+
+
+def test_scores_match_from_snapshots(dataset):
+    paths, snapshots = dataset
+    vendor, sales = parse_vendor_catalog(paths["vendor"]), parse_sales_data(paths["sales"])
+    price_index = parse_competitor_data(paths["competitor"])["price_index"]
+    for prices, snapshot_prices in ((None, None), (price_index, snapshots["competitor"]["price_index"])):
+        expected = score_products_reference(vendor, sales, THEMES[:2], 0.3, 0.6, prices)
+        assert score_catalog(snapshots["vendor"], snapshots["sales"], THEMES[:2], 0.3, 0.6,
+                             price_index=snapshot_prices) == expected
+        assert score_products_reference(snapshots["vendor"], snapshots["sales"], THEMES[:2], 0.3, 0.6,
+                                        snapshot_prices) == expected
+
+
+def test_snapshot_views_pickle(dataset):
+    _, snapshots = dataset
+    assert pickle.loads(pickle.dumps(snapshots["vendor"])) is snapshots["vendor"]
+    assert Snapshot(snapshots["vendor"].snapshot.path).manifest["kind"] == "vendor"
+
+
+def test_missing_values_stay_missing(tmp_path):
+    vendor, sales = tmp_path / "vendor_catalog.csv", tmp_path / "sales_data.csv"
+    vendor.write_text(
+        "name,category,sub_category,price,themes\n"
+        'Desk Lamp,Dorm,Lighting,20,"[""Tech-savvy""]"\n'
+        ",Dorm,,5,\n"
+        "nan,,Kitchen,9,Budget\n"
+        ",Dorm,Lighting,7,\n",
+        encoding="utf-8",
+    )
+    sales.write_text("name,total_units_sold\nDesk Lamp,3\n,4\nnan,1\n", encoding="utf-8")
+    snapshot_dir = str(tmp_path / "snapshots")
+    catalog, sales_view = open_snapshot("vendor", str(vendor), snapshot_dir), open_snapshot("sales", str(sales), snapshot_dir)
+
+    expected = parse_vendor_catalog(str(vendor))
+    assert pd.DataFrame(catalog.to_records()).equals(pd.DataFrame(expected))
+    assert [pd.isna(name) for name in catalog.names] == [False, True, True, True]
+    assert "nan" not in catalog.theme_vocab
+    codes, uniques = catalog.name_lookup()
+    expected_codes, expected_uniques = pd.factorize(pd.Series(catalog.names), use_na_sentinel=False)
+    assert codes.tolist() == expected_codes.tolist() and len(uniques) == len(expected_uniques)
+    assert sales_view.to_python() == parse_sales_data(str(sales)) == {"Desk Lamp": {"total_units_sold": 3}}
+
+
+def test_open_views_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "MAX_OPEN_SNAPSHOTS", 2)
+    paths = generate_dataset(str(tmp_path), 20, include_text=False)
+    for kind in ("vendor", "sales", "competitor"):
+        open_snapshot(kind, paths[kind], str(tmp_path / "snapshots"))
+    assert len(snapshot._opened) <= 2
+
+
+def test_old_snapshots_are_pruned(tmp_path, monkeypatch):
+    root = str(tmp_path / "snapshots")
+    monkeypatch.setattr(snapshot, "MAX_OPEN_SNAPSHOTS", 0)
+    paths = [generate_dataset(str(tmp_path / f"d{i}"), 20, seed=i, include_text=False)["sales"] for i in range(3)]
+    compiled = [snapshot.compile_snapshot("sales", path, root) for path in paths]
+    for i, path in enumerate(compiled):
+        stamp = time.time() - 100 + i
+        os.utime(os.path.join(path, "manifest.json"), (stamp, stamp))
+    expired = time.time() - snapshot.SNAPSHOT_MAX_AGE_SECONDS - 10
+    os.utime(os.path.join(compiled[0], "manifest.json"), (expired, expired))
+
+    # Room for one snapshot: the expired one goes, then the least recently opened
+    monkeypatch.setattr(snapshot, "SNAPSHOT_MAX_BYTES", snapshot._directory_bytes(compiled[2]))
+    snapshot.prune_snapshots(root)
+    assert [os.path.isdir(path) for path in compiled] == [False, False, True]
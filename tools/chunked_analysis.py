@@ -0,0 +1,195 @@
+import json
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.instrumentation import propagate_context
+from tools.llm import chat_completion, estimate_tokens
+from tools.llm_gateway import LLM_MAX_CONCURRENCY
+
+# "auto": chunk only when the lines exceed one chunk's token budget (default)
+# "on": always map-reduce over chunks; "off": one prompt per file (original behaviour)
+LLM_CHUNKING = os.getenv("LLM_CHUNKING", "auto").lower()
+# Token budget of the lines placed in one chunk prompt
+LLM_CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", 4000))
+# Words returned per chunk; the reduce step sums them and keeps the overall top 20
+CHUNK_TOP_WORDS = 50
+
+
+def use_chunking(lines, mode: str = None, max_tokens: int = LLM_CHUNK_TOKENS) -> bool:
+    """Whether ``lines`` should be analyzed in chunks under ``mode`` (default LLM_CHUNKING)."""
+    mode = (mode or LLM_CHUNKING).lower()
+    if mode == "on":
+        return True
+    if mode == "off":
+        return False
+    return sum(estimate_tokens(line) for line in lines) > max_tokens
+
+
+def chunk_lines(lines, max_tokens: int = LLM_CHUNK_TOKENS) -> list:
+    """
+    Splits lines into consecutive batches of at most ``max_tokens`` estimated tokens
+    (a single longer line gets a batch of its own).
+
+    Returns:
+        List[Tuple[int, List[str]]]: (index of the first line, lines) per batch.
+    """
+    chunks = []
+    start, batch, used = 0, [], 0
+    for i, line in enumerate(lines):
+        cost = estimate_tokens(line) + 4  # Line number and separators
+        if batch and used + cost > max_tokens:
+            chunks.append((start, batch))
+            start, batch, used = i, [], 0
+        batch.append(line)
+        used += cost
+    if batch:
+        chunks.append((start, batch))
+    return chunks
+
+
+def _numbered(lines) -> str:
+    return "\n".join(f"{i}. {line}" for i, line in enumerate(lines, 1))
+
+
+def _complete_json(prompt: str, temperature: float) -> dict:
+    content = chat_completion(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": prompt.strip()}],
+        temperature=temperature
+    ).strip()
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        raise ValueError("LLM response could not be parsed as JSON:\n" + content)
+
+
+def map_chunks(build_prompt, lines, temperature: float, max_tokens: int = LLM_CHUNK_TOKENS) -> list:
+    """
+    Sends one prompt per chunk of ``lines`` concurrently (the LLM gateway bounds in-flight
+    requests and rate) and returns [(chunk lines, parsed JSON answer)] in input order.
+    Each chunk is cached separately, so an appended file only pays for its new chunks.
+    """
+    chunks = [batch for _, batch in chunk_lines(lines, max_tokens)]
+    if not chunks:
+        return []
+    workers = min(len(chunks), LLM_MAX_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-chunk") as pool:
+        futures = [
+            pool.submit(propagate_context(_complete_json), build_prompt(batch), temperature)
+            for batch in chunks
+        ]
+        return [(batch, future.result()) for batch, future in zip(chunks, futures)]
+
+
+def weighted_sentiment(results) -> float:
+    """
+    Average sentiment over all lines: chunk averages weighted by their line counts. Chunks
+    whose answer has no numeric sentiment (null, a string, ...) are left out.
+    """
+    total = weighted = 0.0
+    for batch, answer in results:
+        try:
+            sentiment = float(answer.get("average_sentiment") or 0.0)
+        except (TypeError, ValueError):
+            continue
+        if sentiment != sentiment:  # NaN
+            continue
+        total += len(batch)
+        weighted += sentiment * len(batch)
+    return round(weighted / total, 3) if total else 0.0
+
+
+def merge_themes(results, keywords) -> dict:
+    """Maps each keyword to the matching lines of every chunk, from 1-based line numbers."""
+    themes = {keyword: [] for keyword in keywords}
+    for batch, answer in results:
+        for keyword, numbers in (answer.get("themes") or {}).items():
+            if keyword not in themes:
+                continue
+            for number in numbers or []:
+                if isinstance(number, int) and 1 <= number <= len(batch):
+                    themes[keyword].append(batch[number - 1])
+    return themes
+
+
+def sum_word_counts(results, n: int = 20) -> list:
+    """Sums the per-chunk [word, count] pairs and returns the ``n`` most frequent."""
+    counts = Counter()
+    for _, answer in results:
+        for pair in answer.get("word_counts") or []:
+            try:
+                word, count = pair
+                counts[str(word).lower()] += int(count)
+            except (TypeError, ValueError):
+                continue
+    return [[word, count] for word, count in counts.most_common(n)]
+
+
+def chunked_average_sentiment(lines, temperature: float = 0.2) -> float:
+    """Line-weighted average sentiment from one sentiment-only prompt per chunk."""
+
+    def build_prompt(batch):
+        return f"""
+Analyze the sentiment of each line below (range -1 to 1) and return the average sentiment rounded to 3 decimals.
+Only respond with a JSON object like {{"average_sentiment": float}}. Do not explain anything.
+
+Lines:
+{json.dumps(batch)}
+"""
+
+    return weighted_sentiment(map_chunks(build_prompt, lines, temperature))
+
+
+def chunked_trend_analysis(lines, keywords, temperature: float = 0.3) -> dict:
+    """parse_trend_data's LLM analysis, map-reduced over chunks of lines."""
+
+    def build_prompt(batch):
+        return f"""
+You are a data analyst assistant. Below are numbered social media mentions.
+
+Perform the following:
+1. Analyze the sentiment of each line (range -1 to 1), and return the average sentiment rounded to 3 decimals.
+2. Match each line to these keywords: {keywords} (case-insensitive). Each keyword is a key in "themes"; its value is the list of matching line numbers.
+3. Count the individual words of the lines (alphabetic only, lowercase) and return the {CHUNK_TOP_WORDS} most frequent as ["word", count] arrays.
+
+Return only a JSON object like:
+{{"average_sentiment": float, "themes": {{"keyword": [line numbers], ...}}, "word_counts": [["word", count], ...]}}
+
+Mentions:
+{_numbered(batch)}
+"""
+
+    results = map_chunks(build_prompt, lines, temperature)
+    return {
+        "average_sentiment": weighted_sentiment(results),
+        "top_words": sum_word_counts(results),
+        "themes": merge_themes(results, keywords),
+        "raw_mentions": list(lines),
+    }
+
+
+def chunked_survey_analysis(lines, keywords, temperature: float = 0.2) -> dict:
+    """parse_survey_feedback's LLM analysis, map-reduced over chunks of lines."""
+
+    def build_prompt(batch):
+        return f"""
+You are a language model tasked with analyzing numbered survey feedback lines.
+
+Perform the following:
+1. Analyze the sentiment of each feedback line and calculate the average sentiment score (range -1 to 1, rounded to 3 decimals).
+2. Match each feedback line to any relevant keywords from this list: {keywords}. A line may match more than one theme.
+
+Only respond with a JSON object like:
+{{"average_sentiment": float, "themes": {{"keyword": [line numbers], ...}}}}
+
+Feedback lines:
+{_numbered(batch)}
+"""
+
+    results = map_chunks(build_prompt, lines, temperature)
+    return {
+        "average_sentiment": weighted_sentiment(results),
+        "themes": merge_themes(results, keywords),
+        "raw_feedback": list(lines),
+    }
@@ -0,0 +1,274 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+try:  # Peak RSS comes from getrusage, which is Unix only
+    import resource
+except ImportError:
+    resource = None
+
+# "off" (default): records are only kept for the current run (see track_run)
+# "jsonl": one JSON record per node run / LLM call appended to METRICS_PATH, unrotated
+# "prometheus": running totals rewritten to METRICS_PATH in Prometheus text format
+METRICS_SINK = os.getenv("METRICS_SINK", "off").lower()
+METRICS_PATH = os.getenv(
+    "METRICS_PATH",
+    os.path.abspath(os.path.join(
+        os.path.dirname(__file__), "..", ".cache",
+        "metrics.prom" if METRICS_SINK == "prometheus" else "metrics.jsonl",
+    )),
+)
+# O(n) debug output (full score lists, whole parsed files) is only printed when enabled
+VERBOSE_LOGS = os.getenv("VERBOSE_LOGS", "off").lower() in ("on", "1", "true")
+
+_current_run = contextvars.ContextVar("current_run", default=None)
+_current_llm_call = contextvars.ContextVar("current_llm_call", default=None)
+
+
+class RunMetrics:
+    """Records collected while one workflow run (or feedback call) is being tracked."""
+
+    def __init__(self, run_id=None):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.records = []
+        self._lock = threading.Lock()
+
+    def add(self, record: dict) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def nodes(self) -> list:
+        return [r for r in self.records if r["kind"] == "node"]
+
+    def llm_calls(self) -> list:
+        return [r for r in self.records if r["kind"] == "llm"]
+
+
+class _JsonLinesSink:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, default=str)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class _PrometheusSink:
+    """Keeps per-process totals and rewrites a node_exporter textfile after every record."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def _add(self, metric, labels, value):
+        key = (metric, tuple(sorted(labels.items())))
+        self._totals[key] = self._totals.get(key, 0) + value
+
+    def write(self, record: dict) -> None:
+        with self._lock:
+            if record["kind"] == "node":
+                labels = {"node": record["name"]}
+                self._add("assortment_node_runs_total", labels, 1)
+                self._add("assortment_node_wall_seconds_total", labels, record["wall_seconds"])
+                self._add("assortment_node_cpu_seconds_total", labels, record["cpu_seconds"])
+            else:
+                labels = {"model": record["model"], "cache": record["cache"]}
+                self._add("assortment_llm_calls_total", labels, 1)
+                self._add("assortment_llm_wall_seconds_total", labels, record["wall_seconds"])
+                for kind in ("prompt", "completion"):
+                    self._add("assortment_llm_tokens_total", {**labels, "type": kind}, record[f"{kind}_tokens"] or 0)
+
+            lines = []
+            for (metric, labels), value in sorted(self._totals.items()):
+                rendered = ",".join(f'{name}="{label}"' for name, label in labels)
+                lines.append(f"{metric}{{{rendered}}} {value}")
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(temp_path, self.path)
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_sink():
+    global _sink
+    with _sink_lock:
+        if _sink is None and METRICS_SINK != "off":
+            _sink = _PrometheusSink(METRICS_PATH) if METRICS_SINK == "prometheus" else _JsonLinesSink(METRICS_PATH)
+    return _sink
+
+
+def emit(record: dict) -> None:
+    """Adds a record to the tracked run (if any) and writes it to the configured sink."""
+    run = _current_run.get()
+    record["run_id"] = run.run_id if run is not None else None
+    record["timestamp"] = time.time()
+    if run is not None:
+        run.add(record)
+    sink = get_sink()
+    if sink is not None:
+        try:
+            sink.write(record)
+        except OSError as e:
+            print(f"Could not write metrics to {METRICS_PATH}: {e}")
+
+
+@contextmanager
+def track_run(run_id=None):
+    """Collects every node and LLM record emitted inside the block into a RunMetrics."""
+    run = RunMetrics(run_id)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+def propagate_context(func):
+    """Wraps ``func`` to run in a copy of the caller's context (for worker threads)."""
+    context = contextvars.copy_context()
+    return functools.partial(context.run, func)
+
+
+def _peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource is not None else None
+
+
+def _sizes(mapping) -> dict:
+    """Item counts of sized values; file inputs are reported in bytes. Never serializes data."""
+    sizes = {}
+    for key, value in (mapping or {}).items():
+        if key == "file_inputs" and isinstance(value, dict):
+            for input_key, path in value.items():
+                try:
+                    sizes[f"file:{input_key}"] = os.path.getsize(path)
+                except OSError:
+                    pass
+        elif hasattr(value, "__len__") and not isinstance(value, str):
+            sizes[key] = len(value)
+    return sizes
+
+
+def instrument_node(name: str):
+    """
+    Decorates a graph node to emit wall time, process CPU time, peak-RSS growth and the
+    sizes of its input state and returned update. CPU time is process-wide, so branches
+    running in parallel overlap.
+    """
+
+    def decorator(node):
+        @functools.wraps(node)
+        def wrapper(state):
+            rss_before = _peak_rss_kb()
+            cpu_start = time.process_time()
+            start = time.perf_counter()
+            status = "ok"
+            update = None
+            try:
+                update = node(state)
+                return update
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                rss_after = _peak_rss_kb()
+                emit({
+                    "kind": "node",
+                    "name": name,
+                    "status": status,
+                    "wall_seconds": round(time.perf_counter() - start, 6),
+                    "cpu_seconds": round(time.process_time() - cpu_start, 6),
+                    "peak_rss_delta_kb": rss_after - rss_before if rss_before is not None else None,
+                    "input_sizes": _sizes(state),
+                    "output_sizes": _sizes(update),
+                })
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def llm_call(model: str, messages):
+    """
+    Times one chat completion. Inside the block, ``record_usage`` stores the API's token
+    usage and the yielded dict takes "cache" and the "completion" text; counts missing on
+    exit are estimated from the text, and cache hits count zero tokens.
+    """
+    call = {
+        "kind": "llm",
+        "model": model,
+        "cache": "off",
+        "prompt_chars": sum(len(m.get("content", "")) for m in messages),
+        "completion_chars": 0,
+        "completion": None,
+        "prompt_tokens": None,
+        "completion_tokens": None,
+        "tokens_estimated": False,
+    }
+    token = _current_llm_call.set(call)
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield call
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        _current_llm_call.reset(token)
+        call["wall_seconds"] = round(time.perf_counter() - start, 6)
+        call["status"] = status
+        call["name"] = model
+        completion = call.pop("completion") or ""
+        call["completion_chars"] = len(completion)
+        if call["cache"] == "hit":
+            call["prompt_tokens"] = call["completion_tokens"] = 0
+        elif call["prompt_tokens"] is None and status == "ok":
+            from tools.llm import estimate_tokens
+
+            call["prompt_tokens"] = sum(estimate_tokens(m.get("content", "")) for m in messages)
+            call["completion_tokens"] = estimate_tokens(completion) if completion else 0
+            call["tokens_estimated"] = True
+        emit(call)
+
+
+def record_usage(usage) -> None:
+    """Stores an OpenAI ``usage`` object on the LLM call in progress."""
+    call = _current_llm_call.get()
+    if call is not None and usage is not None:
+        call["prompt_tokens"] = getattr(usage, "prompt_tokens", None)
+        call["completion_tokens"] = getattr(usage, "completion_tokens", None)
+
+
+def summarize(run: RunMetrics) -> dict:
+    """Per-node and LLM totals of a tracked run, for display."""
+    nodes = {}
+    for record in run.nodes():
+        entry = nodes.setdefault(record["name"], {"runs": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0})
+        entry["runs"] += 1
+        entry["wall_seconds"] += record["wall_seconds"]
+        entry["cpu_seconds"] += record["cpu_seconds"]
+    calls = run.llm_calls()
+    return {
+        "nodes": nodes,
+        "llm": {
+            "calls": len(calls),
+            "cache_hits": sum(1 for c in calls if c["cache"] == "hit"),
+            "wall_seconds": sum(c["wall_seconds"] for c in calls),
+            "prompt_tokens": sum(c["prompt_tokens"] or 0 for c in calls),
+            "completion_tokens": sum(c["completion_tokens"] or 0 for c in calls),
+        },
+    }
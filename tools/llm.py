@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from tools.instrumentation import llm_call, record_usage
+
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "llm_cache.sqlite")),
+)
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000))
+
+# "cache": serve from the cache, call OpenAI on a miss and store the answer (default)
+# "replay": serve only from the cache and fail on a miss (offline benchmarks and CI)
+# "off": always call OpenAI, never read or write the cache
+LLM_MODE = os.getenv("LLM_MODE", "cache").lower()
+
+
+_encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken when installed (it ships with langchain_openai), else ~4 chars/token."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+class LLMReplayMiss(RuntimeError):
+    """Raised in replay mode when a prompt has no cached response."""
+
+
+def normalize_prompt(text: str) -> str:
+    """Collapses whitespace so prompts differing only in indentation share a cache entry."""
+    return " ".join(text.split())
+
+
+def cache_key(model: str, temperature, messages) -> str:
+    normalized = [
+        {"role": message["role"], "content": normalize_prompt(message["content"])}
+        for message in messages
+    ]
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": normalized},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite-backed prompt -> response cache shared by every process on the host.
+
+    Entries older than ``ttl_seconds`` are ignored and purged; beyond ``max_entries``
+    the least recently used entries are evicted.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                       key TEXT PRIMARY KEY,
+                       model TEXT NOT NULL,
+                       content TEXT NOT NULL,
+                       created_at REAL NOT NULL,
+                       last_used REAL NOT NULL
+                   )"""
+            )
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key: str, model: str, content: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, model, content, now, now),
+            )
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._conn.execute(
+                """DELETE FROM responses WHERE key NOT IN (
+                       SELECT key FROM responses ORDER BY last_used DESC LIMIT ?
+                   )""",
+                (self.max_entries,),
+            )
+
+
+_cache = None
+_init_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    global _cache
+    with _init_lock:
+        if _cache is None:
+            _cache = LLMCache()
+    return _cache
+
+
+def chat_completion(messages, model: str, temperature=None, mode: str = None) -> str:
+    """
+    Runs a chat completion through the shared LLM cache.
+
+    Args:
+        messages (List[dict]): OpenAI chat messages ({"role", "content"}).
+        model (str): Model name, e.g. "gpt-4o-mini".
+        temperature (float, optional): Sampling temperature; None keeps the API default.
+        mode (str, optional): Overrides LLM_MODE ("cache", "replay" or "off").
+
+    Returns:
+        str: The assistant message content.
+    """
+    mode = (mode or LLM_MODE).lower()
+    with llm_call(model, messages) as call:
+        if mode == "off":
+            content = _request(messages, model, temperature)
+            call["completion"] = content
+            return content
+
+        cache = get_llm_cache()
+        key = cache_key(model, temperature, messages)
+        content = cache.get(key)
+        if content is not None:
+            call["cache"] = "hit"
+            call["completion"] = content
+            return content
+        call["cache"] = "miss"
+        if mode == "replay":
+            raise LLMReplayMiss(f"No cached {model} response for prompt hash {key[:12]} (LLM_MODE=replay)")
+
+        content = _request(messages, model, temperature)
+        call["completion"] = content
+        cache.put(key, model, content)
+        return content
+
+
+def _request(messages, model: str, temperature) -> str:
+    from tools.llm_gateway import get_gateway
+
+    content, usage = get_gateway().complete(messages, model, temperature)
+    record_usage(usage)
+    return content
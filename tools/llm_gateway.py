@@ -0,0 +1,168 @@
+import asyncio
+import os
+import random
+import threading
+import time
+
+# One pooled AsyncOpenAI client per process, driven by a dedicated event loop thread
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", 120))
+# Per-process budgets; 0 disables a limit
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", 500))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", 200_000))
+# Retries for 429s, 5xx, timeouts and connection errors: full-jitter exponential backoff
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 5))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", 0.5))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", 30))
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at ``per_minute`` units per minute.
+
+    ``acquire`` waits until ``amount`` units are available; ``debit`` charges units
+    after the fact (e.g. completion tokens), possibly leaving the bucket in debt.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float) -> None:
+        amount = min(amount, self.capacity)  # A single oversized request waits for a full bucket
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return
+                await asyncio.sleep((amount - self.level) / self.rate)
+
+    def debit(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+
+def _retryable(error) -> bool:
+    import openai
+
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _retry_after(error):
+    """Seconds the API asked us to wait (Retry-After header), if any."""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after=None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+    return max(delay, retry_after or 0.0)
+
+
+class LLMGateway:
+    """Rate-limited, retrying access to the OpenAI chat API over one pooled async client."""
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True)
+        self._thread.start()
+        self._client = None
+        self._semaphore = None
+        self._requests = None
+        self._tokens = None
+        asyncio.run_coroutine_threadsafe(self._setup(), self._loop).result()
+
+    async def _setup(self):
+        # Created on the gateway loop: asyncio primitives and httpx pools bind to it
+        import httpx
+        import openai
+
+        self._client = openai.AsyncOpenAI(
+            max_retries=0,  # Retries are handled here, with the rate limiter in the loop
+            timeout=LLM_REQUEST_TIMEOUT_SECONDS,
+            http_client=openai.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS
+                )
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        self._requests = TokenBucket(LLM_REQUESTS_PER_MINUTE) if LLM_REQUESTS_PER_MINUTE > 0 else None
+        self._tokens = TokenBucket(LLM_TOKENS_PER_MINUTE) if LLM_TOKENS_PER_MINUTE > 0 else None
+
+    async def acomplete(self, messages, model: str, temperature=None):
+        """
+        Runs one chat completion on the gateway loop.
+
+        Returns:
+            Tuple[str, Any]: The assistant message content and the API ``usage`` object.
+        """
+        from tools.llm import estimate_tokens
+
+        kwargs = {"model": model, "messages": messages}
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+
+        attempt = 0
+        while True:
+            if self._requests is not None:
+                await self._requests.acquire(1)
+            if self._tokens is not None:
+                await self._tokens.acquire(prompt_tokens)
+            try:
+                async with self._semaphore:
+                    response = await self._client.chat.completions.create(**kwargs)
+            except Exception as e:
+                if not _retryable(e) or attempt >= LLM_MAX_RETRIES:
+                    raise
+                delay = backoff_delay(attempt, _retry_after(e))
+                print(f"⚠️ OpenAI {type(e).__name__}, retry {attempt + 1}/{LLM_MAX_RETRIES} in {delay:.1f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            usage = getattr(response, "usage", None)
+            if self._tokens is not None and usage is not None:
+                # The prompt estimate was charged up front; settle to the actual total
+                self._tokens.debit((usage.total_tokens or 0) - prompt_tokens)
+            return response.choices[0].message.content, usage
+
+    def submit(self, messages, model: str, temperature=None):
+        """Schedules a completion from any thread; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(self.acomplete(messages, model, temperature), self._loop)
+
+    def complete(self, messages, model: str, temperature=None):
+        """Blocking wrapper around ``acomplete`` for synchronous callers."""
+        return self.submit(messages, model, temperature).result()
+
+
+_gateway = None
+_gateway_pid = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    """The process-wide gateway (recreated after a fork, whose loop thread does not survive)."""
+    global _gateway, _gateway_pid
+    with _gateway_lock:
+        if _gateway is None or _gateway_pid != os.getpid():
+            _gateway = LLMGateway()
+            _gateway_pid = os.getpid()
+    return _gateway
@@ -0,0 +1,155 @@
+from collections import Counter, deque
+
+import pandas as pd
+
+try:  # Optional C implementation; the pure-Python automaton below gives identical counts
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def product_variants(name: str) -> list:
+    """Lowercase spellings counted as a mention of ``name``: singular and plural forms."""
+    base = name.strip().lower()
+    if not base:
+        return []
+    variants = [base, base + "s"]
+    if base.endswith(("s", "x", "z", "ch", "sh")):
+        variants.append(base + "es")
+    if base.endswith("y") and base[-2:-1] not in ("a", "e", "i", "o", "u"):
+        variants.append(base[:-1] + "ies")
+    return variants
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class _Automaton:
+    """Pure-Python Aho-Corasick automaton with the ``iter`` interface of pyahocorasick."""
+
+    def __init__(self, words: dict):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for word, value in words.items():
+            state = 0
+            for ch in word:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][ch] = nxt
+                state = nxt
+            self.out[state].append(value)
+
+        # Breadth-first failure links; each state also reports the outputs of its suffixes
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter(self, text: str):
+        """Yields (end index, value) for every occurrence of every word in ``text``."""
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for value in out[state]:
+                yield end, value
+
+
+class MentionIndex:
+    """
+    Counts catalog product mentions in free text in one linear pass.
+
+    Every product name and its plural forms are compiled into a single Aho-Corasick
+    automaton (pyahocorasick when installed). Matching is case-insensitive on whole
+    words. At each position the longest name wins, so "laptop stands" counts once for
+    "Laptop Stand" and not again for "Laptop".
+    """
+
+    def __init__(self, product_names):
+        self.products = []
+        seen = set()
+        variants = {}
+        for name in product_names:
+            if not isinstance(name, str) or name in seen:
+                continue
+            seen.add(name)
+            product_id = len(self.products)
+            self.products.append(name)
+            for variant in product_variants(name):
+                variants.setdefault(variant, (len(variant), product_id))
+
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for variant, value in variants.items():
+                self.automaton.add_word(variant, value)
+            if variants:
+                self.automaton.make_automaton()
+        else:
+            self.automaton = _Automaton(variants)
+        self.empty = not variants
+
+    def find(self, lowered: str):
+        """
+        Non-overlapping whole-word mentions in lowercase text as (start, end, product id),
+        leftmost first and longest at each start.
+        """
+        if self.empty:
+            return []
+        candidates = []
+        for end, (length, product_id) in self.automaton.iter(lowered):
+            start = end - length + 1
+            if start > 0 and _is_word_char(lowered[start - 1]):
+                continue
+            if end + 1 < len(lowered) and _is_word_char(lowered[end + 1]):
+                continue
+            candidates.append((start, -length, product_id))
+        candidates.sort()
+
+        matches = []
+        position = 0
+        for start, negative_length, product_id in candidates:
+            if start >= position:
+                position = start - negative_length
+                matches.append((start, position, product_id))
+        return matches
+
+    def count_into(self, counts: Counter, lowered: str) -> None:
+        """Adds the mentions in one lowercase line or document to ``counts`` (by product name)."""
+        for _, _, product_id in self.find(lowered):
+            counts[self.products[product_id]] += 1
+
+    def count(self, texts) -> dict:
+        """Mention counts per product over an iterable of lines or posts (mentioned products only)."""
+        counts = Counter()
+        for text in texts:
+            self.count_into(counts, text.lower())
+        return dict(counts)
+
+    def count_file(self, file_path: str) -> dict:
+        """Streams a text file line by line, so arbitrarily many posts fit in memory."""
+        with open(file_path, "r", encoding="utf-8") as f:
+            return self.count(f)
+
+
+def mention_frame(mentions: dict, top: int = 5) -> pd.DataFrame:
+    """Top products by mention count (ties alphabetical) as a rank/product/mentions frame."""
+    ranked = sorted(((p, c) for p, c in mentions.items() if c > 0), key=lambda item: (-item[1], item[0]))[:top]
+    return pd.DataFrame(
+        [{"rank": i + 1, "product": product, "mentions": count} for i, (product, count) in enumerate(ranked)],
+        columns=["rank", "product", "mentions"],
+    )
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+CACHE_DIR = os.getenv(
+    "PARSE_CACHE_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "parsed")),
+)
+MAX_CACHE_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+MAX_CACHE_AGE_SECONDS = int(os.getenv("PARSE_CACHE_MAX_AGE_SECONDS", 30 * 24 * 3600))
+CACHE_ENABLED = os.getenv("PARSE_CACHE", "on").lower() not in ("off", "0", "false")
+
+_MISS = object()
+_digest_memo = {}  # (path, size, mtime_ns) -> digest, so unchanged files are hashed once per process
+
+
+def file_digest(file_path: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's bytes, read in 1 MB blocks.
+
+    Args:
+        file_path (str): Path to the input file.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _digest_memo:
+        return _digest_memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    _digest_memo[memo_key] = digest.hexdigest()
+    return _digest_memo[memo_key]
+
+
+class ParseCache:
+    """
+    Persistent on-disk cache of parsed input files.
+
+    Entries are JSON files named by sha256(parser name, parser version, content digest).
+    An entry's mtime is its write time (age-based eviction) and a hit stamps its atime
+    explicitly (size-based eviction drops the least recently used entries first).
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, max_age_seconds=MAX_CACHE_AGE_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(parser_name: str, parser_version, digest: str) -> str:
+        return hashlib.sha256(f"{parser_name}:{parser_version}:{digest}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str, default=None):
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return default
+        if time.time() - stat.st_mtime > self.max_age_seconds:
+            self._remove(path)
+            return default
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self._remove(path)
+            return default
+        os.utime(path, (time.time(), stat.st_mtime))
+        return value
+
+    def put(self, key: str, value) -> None:
+        # Write to a temp file first so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Drops expired entries, then least recently used ones until under ``max_bytes``."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.max_age_seconds:
+                self._remove(path)
+            else:
+                entries.append((stat.st_atime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+_default_cache = None
+
+
+def get_parse_cache() -> ParseCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ParseCache()
+    return _default_cache
+
+
+def cached_parse(parser_name: str, parser_version, parse_func, file_path: str):
+    """
+    Parses ``file_path`` with ``parse_func`` unless a result for the same file content,
+    parser name and parser version is already cached.
+
+    Args:
+        parser_name (str): Stable name of the parser.
+        parser_version: Bump whenever the parser's output changes.
+        parse_func (Callable[[str], Any]): Parser taking the file path.
+        file_path (str): Path to the input file.
+
+    Returns:
+        Any: The parsed structure, from the cache or freshly parsed.
+    """
+    if not CACHE_ENABLED:
+        return parse_func(file_path)
+
+    cache = get_parse_cache()
+    key = cache.key(parser_name, parser_version, file_digest(file_path))
+    parsed = cache.get(key, _MISS)
+    if parsed is not _MISS:
+        print(f"Parse cache hit: {parser_name} ({file_path})")
+        return parsed
+
+    parsed = parse_func(file_path)
+    cache.put(key, parsed)
+    return parsed
@@ -1,5 +1,7 @@
 import json
 
+PARSER_VERSION = 1
+
 def parse_college_profile(file_path: str) -> dict:
     """
     Parses a college profile JSON file and returns a dictionary of store characteristics.
@@ -1,29 +1,196 @@
+import math
+import os
+
+import numpy as np
 import pandas as pd
 
-def parse_competitor_data(file_path: str) -> dict:
-    """
-    Parses competitor product and pricing data from CSV and returns pricing benchmarks.
+PARSER_VERSION = 3
 
-    Args:
-        file_path (str): Path to the competitor data CSV.
+REQUIRED_COLUMNS = ["name", "competitor_price", "source"]
+COLUMN_DTYPES = {"name": str, "competitor_price": "float64", "source": str}
 
-    Returns:
-        Dict[str, any]: Summary statistics across all competitor products.
+# Files at least this large are read chunk by chunk and their medians are approximated
+STREAMING_THRESHOLD_BYTES = int(os.getenv("COMPETITOR_STREAMING_THRESHOLD_BYTES", 256 * 1024 * 1024))
+DEFAULT_CHUNKSIZE = int(os.getenv("COMPETITOR_CHUNKSIZE", 1_000_000))
+# Relative error bound of the streaming median (log-bucket sketch)
+QUANTILE_RELATIVE_ERROR = float(os.getenv("COMPETITOR_QUANTILE_RELATIVE_ERROR", 0.01))
+
+# Sketch buckets are offset into [0, _BUCKET_SPAN); bucket 0 holds non-positive prices
+_BUCKET_SPAN = 4096
+# (product, source) pairs are packed as product << _SOURCE_BITS | source
+_SOURCE_BITS = 32
+
+
+def _intern(values: pd.Series, index: pd.Index):
+    """Integer codes of ``values`` in ``index``, appending unseen values in first-seen order."""
+    codes = index.get_indexer(values)
+    missing = codes < 0
+    if missing.any():
+        index = index.append(pd.Index(values[missing].unique()))
+        codes[missing] = index.get_indexer(values[missing])
+    return codes.astype(np.int64), index
+
+
+def _price_buckets(prices: np.ndarray, gamma: float) -> np.ndarray:
+    """Log-spaced sketch bucket of each price; bucket i covers (gamma^(i-h-1), gamma^(i-h)]."""
+    half = _BUCKET_SPAN // 2
+    buckets = np.zeros(len(prices), dtype=np.int64)
+    positive = prices > 0
+    exponents = np.ceil(np.log(prices[positive]) / math.log(gamma))
+    buckets[positive] = np.clip(exponents, 1 - half, half - 1).astype(np.int64) + half
+    return buckets
+
+
+def _sketch_medians(keys: np.ndarray, counts: np.ndarray, n_products: int, gamma: float) -> np.ndarray:
+    """
+    Median per product code from sorted (code * _BUCKET_SPAN + bucket) keys and their counts:
+    the mean of the representatives of the buckets holding the two middle values (one for
+    odd counts), like ``Series.median``. NaN for products without a price.
     """
-    df = pd.read_csv(file_path)
+    half = _BUCKET_SPAN // 2
+    buckets = keys % _BUCKET_SPAN
+    values = np.where(buckets == 0, 0.0, 2 * np.power(gamma, (buckets - half).astype(np.float64)) / (gamma + 1))
 
-    required_columns = ["name", "competitor_price", "source"]
+    codes = keys // _BUCKET_SPAN
+    totals = np.bincount(codes, weights=counts, minlength=n_products).astype(np.int64)
+    cumulative = np.cumsum(counts)
+    before = np.concatenate(([0], np.cumsum(totals)[:-1]))
+
+    medians = np.full(n_products, np.nan)
+    priced = np.flatnonzero(totals)
+    lower = np.searchsorted(cumulative, before[priced] + (totals[priced] + 1) // 2)
+    upper = np.searchsorted(cumulative, before[priced] + totals[priced] // 2 + 1)
+    medians[priced] = (values[lower] + values[upper]) / 2
+    return medians
+
+
+def _index_records(stats: pd.DataFrame) -> dict:
+    stats = stats.sort_index()
+    return {
+        name: {
+            "min_price": min_price,
+            "median_price": median_price,
+            "max_price": max_price,
+            "source_count": source_count,
+        }
+        for name, min_price, median_price, max_price, source_count in zip(
+            stats.index.tolist(),
+            stats["min_price"].tolist(),
+            stats["median_price"].tolist(),
+            stats["max_price"].tolist(),
+            stats["source_count"].astype(np.int64).tolist(),
+        )
+    }
 
-    for col in required_columns:
-        if col not in df.columns:
-            raise ValueError(f"Missing required column: {col}")
 
+def _parse_in_memory(file_path: str) -> dict:
+    df = pd.read_csv(file_path, usecols=REQUIRED_COLUMNS, dtype=COLUMN_DTYPES)
+    df = df[df["name"].notna()]
     prices = df["competitor_price"]
 
+    grouped = df.groupby("name", sort=False)
+    stats = grouped["competitor_price"].agg(min_price="min", median_price="median", max_price="max")
+    stats["source_count"] = grouped["source"].nunique()
+
     return {
         "min_price": float(prices.min()),
         "max_price": float(prices.max()),
         "avg_price": float(prices.mean()),
         "products": df["name"].unique().tolist(),
-        "sources": df["source"].unique().tolist()
+        "sources": df["source"].dropna().unique().tolist(),
+        "price_index": _index_records(stats),
     }
+
+
+def _parse_streaming(file_path: str, chunksize: int, relative_error: float) -> dict:
+    """
+    Aggregates chunk by chunk on integer product codes. Memory grows with the number of
+    products, sources and occupied sketch buckets, not with the number of rows. Missing
+    values are handled as in _parse_in_memory: rows without a name are skipped, and
+    missing sources are neither listed nor counted.
+    """
+    gamma = (1 + relative_error) / (1 - relative_error)
+    names = pd.Index([], dtype=object)
+    sources = pd.Index([], dtype=object)
+    mins = np.empty(0)
+    maxs = np.empty(0)
+    price_sum = 0.0
+    price_count = 0
+    source_pairs = np.empty(0, dtype=np.int64)
+    bucket_keys = np.empty(0, dtype=np.int64)
+    bucket_counts = np.empty(0, dtype=np.int64)
+
+    for chunk in pd.read_csv(file_path, chunksize=chunksize, usecols=REQUIRED_COLUMNS, dtype=COLUMN_DTYPES):
+        chunk = chunk[chunk["name"].notna()]
+        codes, names = _intern(chunk["name"], names)
+        has_source = chunk["source"].notna().to_numpy()
+        source_codes, sources = _intern(chunk["source"][has_source], sources)
+        prices = chunk["competitor_price"].to_numpy()
+
+        grown = len(names) - len(mins)
+        mins = np.concatenate((mins, np.full(grown, np.inf)))
+        maxs = np.concatenate((maxs, np.full(grown, -np.inf)))
+        priced = ~np.isnan(prices)
+        np.minimum.at(mins, codes[priced], prices[priced])
+        np.maximum.at(maxs, codes[priced], prices[priced])
+        price_sum += float(prices[priced].sum())
+        price_count += int(priced.sum())
+
+        source_pairs = np.union1d(source_pairs, (codes[has_source] << _SOURCE_BITS) | source_codes)
+
+        chunk_keys = codes[priced] * _BUCKET_SPAN + _price_buckets(prices[priced], gamma)
+        merged_keys, inverse = np.unique(np.concatenate((bucket_keys, chunk_keys)), return_inverse=True)
+        weights = np.concatenate((bucket_counts, np.ones(len(chunk_keys), dtype=np.int64)))
+        bucket_keys = merged_keys
+        bucket_counts = np.bincount(inverse.ravel(), weights=weights, minlength=len(merged_keys)).astype(np.int64)
+
+    has_price = mins <= maxs
+    stats = pd.DataFrame(
+        {
+            "min_price": np.where(has_price, mins, np.nan),
+            "median_price": _sketch_medians(bucket_keys, bucket_counts, len(names), gamma),
+            "max_price": np.where(has_price, maxs, np.nan),
+            "source_count": np.bincount(source_pairs >> _SOURCE_BITS, minlength=len(names)),
+        },
+        index=names,
+    )
+
+    return {
+        "min_price": float(mins[has_price].min()) if price_count else math.nan,
+        "max_price": float(maxs[has_price].max()) if price_count else math.nan,
+        "avg_price": price_sum / price_count if price_count else math.nan,
+        "products": names.tolist(),
+        "sources": sources.tolist(),
+        "price_index": _index_records(stats),
+    }
+
+
+def parse_competitor_data(file_path: str, chunksize: int = None,
+                          relative_error: float = QUANTILE_RELATIVE_ERROR) -> dict:
+    """
+    Parses competitor product and pricing data from CSV and returns pricing benchmarks.
+
+    Args:
+        file_path (str): Path to the competitor data CSV.
+        chunksize (int, optional): Rows per chunk for streaming aggregation. Defaults to
+            streaming in DEFAULT_CHUNKSIZE rows once the file reaches STREAMING_THRESHOLD_BYTES.
+        relative_error (float): Relative error of the streaming median. Streamed medians come
+            from a log-bucket sketch; in-memory medians are exact.
+
+    Returns:
+        Dict[str, any]: Summary statistics across all competitor products, plus
+        "price_index": product name -> {"min_price", "median_price", "max_price", "source_count"}.
+        Rows without a product name are skipped; missing sources are not counted.
+    """
+    header = pd.read_csv(file_path, nrows=0).columns
+
+    for col in REQUIRED_COLUMNS:
+        if col not in header:
+            raise ValueError(f"Missing required column: {col}")
+
+    if chunksize is None and os.path.getsize(file_path) >= STREAMING_THRESHOLD_BYTES:
+        chunksize = DEFAULT_CHUNKSIZE
+
+    if chunksize:
+        return _parse_streaming(file_path, chunksize, relative_error)
+    return _parse_in_memory(file_path)
@@ -1,40 +1,69 @@
+import os
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
-def parse_sales_data(file_path: str) -> dict:
+PARSER_VERSION = 1
+
+REQUIRED_COLUMNS = ["name", "total_units_sold"]
+# Only the needed columns are read, with fixed dtypes (float units keep blank cells summable)
+COLUMN_DTYPES = {"name": str, "total_units_sold": "float64"}
+
+# Files at least this large are aggregated chunk by chunk, keeping peak memory bounded
+STREAMING_THRESHOLD_BYTES = int(os.getenv("SALES_STREAMING_THRESHOLD_BYTES", 256 * 1024 * 1024))
+DEFAULT_CHUNKSIZE = int(os.getenv("SALES_CHUNKSIZE", 1_000_000))
+
+def parse_sales_data(file_path: str, chunksize: int = None) -> dict:
     """
     Parses sales data CSV and returns aggregated product-level metrics.
 
     Args:
         file_path (str): Path to the sales data CSV file.
+        chunksize (int, optional): Rows per chunk for streaming aggregation. Defaults to
+            streaming in DEFAULT_CHUNKSIZE rows once the file reaches STREAMING_THRESHOLD_BYTES.
 
     Returns:
         Dict[str, dict]: Dictionary with product name as key and metrics as values.
     """
-    df = pd.read_csv(file_path)
-
-    required_columns = [
-        "name", "total_units_sold"
-    ]
+    # Validate the header before reading the body
+    header = pd.read_csv(file_path, nrows=0).columns
 
-    for col in required_columns:
-        if col not in df.columns:
+    for col in REQUIRED_COLUMNS:
+        if col not in header:
             raise ValueError(f"Missing required column: {col}")
 
     # Convert Date to datetime
     # df["Date"] = pd.to_datetime(df["Date"], errors='coerce')
     # df.dropna(subset=["Date"], inplace=True)
 
+    if chunksize is None and os.path.getsize(file_path) >= STREAMING_THRESHOLD_BYTES:
+        chunksize = DEFAULT_CHUNKSIZE
+
+    read_options = {"usecols": REQUIRED_COLUMNS, "dtype": COLUMN_DTYPES}
+
     # Aggregate by product
-    product_stats = {}
-    grouped = df.groupby("name")
+    if chunksize:
+        totals = None
+        for chunk in pd.read_csv(file_path, chunksize=chunksize, **read_options):
+            partial = chunk.groupby("name", sort=False)["total_units_sold"].sum()
+            totals = partial if totals is None else totals.add(partial, fill_value=0)
+        if totals is None:
+            return {}
+    else:
+        df = pd.read_csv(file_path, **read_options)
+        totals = df.groupby("name", sort=False)["total_units_sold"].sum()
+
+    totals = totals.sort_index()
+    units = totals.to_numpy().astype(np.int64).tolist()
 
-    for name, group in grouped:
-        product_stats[name] = {
-            "total_units_sold": int(group["total_units_sold"].sum()),
+    product_stats = {
+        name: {
+            "total_units_sold": units_sold,
             # "total_revenue": float(group["Revenue"].sum()),
             # "avg_units_per_day": float(group.groupby("Date")["Units Sold"].sum().mean()),
             # "store_coverage": group["Store ID"].nunique(),
             # "last_sale_date": group["Date"].max().strftime("%Y-%m-%d")
         }
-    return product_stats
\ No newline at end of file
+        for name, units_sold in zip(totals.index.tolist(), units)
+    }
+    return product_stats
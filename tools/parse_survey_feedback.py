@@ -1,31 +1,54 @@
 import os
 import json
-from openai import OpenAI
+from tools.instrumentation import VERBOSE_LOGS
+from tools.llm import chat_completion
+from tools.chunked_analysis import use_chunking, chunked_survey_analysis
+from tools.text_analysis import resolve_backend
+from tools.shared_analysis import ANALYSIS_KEYWORDS, get_text_analysis
 
-def parse_survey_feedback(file_path: str) -> dict:
+PARSER_VERSION = 2
+
+SURVEY_KEYWORDS = ANALYSIS_KEYWORDS["survey"]
+
+def parse_survey_feedback(file_path: str, backend: str = None) -> dict:
     """
     Parses survey feedback from a TXT file and returns sentiment summaries and key themes using LLM.
     Keeps the same structure and key names as the original version using TextBlob.
 
     Args:
         file_path (str): Path to the TXT file.
+        backend (str, optional): "llm", "local" or "hybrid" (see tools.text_analysis);
+            defaults to SURVEY_ANALYSIS_BACKEND / ANALYSIS_BACKEND.
 
     Returns:
         Dict[str, any]: Dictionary containing sentiment scores and extracted feedback themes.
     """
-    client = OpenAI()
+    # Shared with the Streamlit prefetch, which may already have analyzed this file
+    analysis = get_text_analysis(file_path, "survey", backend=resolve_backend("survey", backend))
+    if "llm_result" in analysis:
+        return analysis["llm_result"]
+    return {
+        "average_sentiment": analysis["average_sentiment"],
+        "themes": analysis["themes"],
+        "raw_feedback": analysis["lines"],
+    }
 
-    try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            text = file.read()
-        # print("\ntext: ", text)
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Survey feedback TXT file not found: {file_path}")
 
-    feedback_lines = [line.strip() for line in text.split("\n") if line.strip()]
+def llm_survey_analysis(feedback_lines) -> dict:
+    """
+    The "llm" backend: one prompt (or one per chunk, see LLM_CHUNKING) computes the whole
+    analysis of the feedback lines.
+
+    Returns:
+        Dict[str, any]: Same structure as parse_survey_feedback.
+    """
     # print("\nfeedback_lines: ", feedback_lines)
 
-    keywords = ["pricing", "delivery", "selection", "dorm", "health", "tech", "supplies"]
+    keywords = SURVEY_KEYWORDS
+
+    # Long files are analyzed chunk by chunk, concurrently, and reduced locally (LLM_CHUNKING)
+    if use_chunking(feedback_lines):
+        return chunked_survey_analysis(feedback_lines, keywords, temperature=0.2)
 
     prompt = f"""
 You are a language model tasked with analyzing survey feedback.
@@ -44,21 +67,20 @@ Feedback lines:
 {json.dumps(feedback_lines)}
 """
 
-    response = client.chat.completions.create(
+    content = chat_completion(
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt.strip()}],
         temperature=0.2
-    )
-
-    content = response.choices[0].message.content.strip()
+    ).strip()
 
     try:
         result = json.loads(content)
     except json.JSONDecodeError:
         raise ValueError("LLM response could not be parsed as JSON:\n" + content)
 
-    print("\n avg_sentiment: ", result.get("average_sentiment"))
-    print("\n themes: ", result.get("themes"))
+    if VERBOSE_LOGS:
+        print("\n avg_sentiment: ", result.get("average_sentiment"))
+        print("\n themes: ", result.get("themes"))
     # print("\n feedback_lines : ", result.get("raw_feedback"))
     # print("\n LLM response: ", content)
     # print("\n result: ", result)
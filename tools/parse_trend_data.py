@@ -1,28 +1,52 @@
 import os
 import json
-from openai import OpenAI
+from tools.llm import chat_completion
+from tools.chunked_analysis import use_chunking, chunked_trend_analysis
+from tools.text_analysis import resolve_backend
+from tools.shared_analysis import ANALYSIS_KEYWORDS, get_text_analysis
 
-def parse_trend_data(file_path: str) -> dict:
+PARSER_VERSION = 2
+
+TREND_KEYWORDS = ANALYSIS_KEYWORDS["trend"]
+
+def parse_trend_data(file_path: str, backend: str = None) -> dict:
     """
     Parses trend data from a text file (social mentions) using an LLM to identify sentiment,
     themes, and keyword frequency. Keeps the same structure as the original TextBlob version.
 
     Args:
         file_path (str): Path to the trend data .txt file.
+        backend (str, optional): "llm", "local" or "hybrid" (see tools.text_analysis);
+            defaults to TREND_ANALYSIS_BACKEND / ANALYSIS_BACKEND.
 
     Returns:
         Dict[str, any]: Dictionary with keyword frequency, sentiment, and trend themes.
     """
-    client = OpenAI()
+    # Shared with the Streamlit prefetch, which may already have analyzed this file
+    analysis = get_text_analysis(file_path, "trend", backend=resolve_backend("trend", backend))
+    if "llm_result" in analysis:
+        return analysis["llm_result"]
+    return {
+        "average_sentiment": analysis["average_sentiment"],
+        "top_words": analysis["top_words"],
+        "themes": analysis["themes"],
+        "raw_mentions": analysis["lines"],
+    }
 
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            text = f.read()
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Trend data TXT file not found: {file_path}")
 
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-    keywords = ["tech", "decor", "desk", "aesthetic", "study", "wellness", "bedding", "gadgets"]
+def llm_trend_analysis(lines) -> dict:
+    """
+    The "llm" backend: one prompt (or one per chunk, see LLM_CHUNKING) computes the whole
+    analysis of the trend lines.
+
+    Returns:
+        Dict[str, any]: Same structure as parse_trend_data.
+    """
+    keywords = TREND_KEYWORDS
+
+    # Long files are analyzed chunk by chunk, concurrently, and reduced locally (LLM_CHUNKING)
+    if use_chunking(lines):
+        return chunked_trend_analysis(lines, keywords, temperature=0.3)
 
     prompt = f"""
 You are a data analyst assistant.
@@ -55,13 +79,11 @@ Perform the following:
 Only return a JSON object. Do not include any explanation, formatting, or code.
     """
 
-    response = client.chat.completions.create(
+    content = chat_completion(
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt.strip()}],
         temperature=0.3
-    )
-
-    content = response.choices[0].message.content.strip()
+    ).strip()
 
     try:
         result = json.loads(content)
@@ -1,37 +1,270 @@
+import json
+from collections.abc import Mapping, Sequence
+
+import numpy as np
 import pandas as pd
 
-def parse_vendor_catalog(file_path: str) -> list:
+PARSER_VERSION = 3
+
+REQUIRED_COLUMNS = ["name", "category", "sub_category", "price", "themes"]
+COLUMN_DTYPES = {"name": str, "category": str, "sub_category": str, "price": "float64", "themes": str}
+
+
+def parse_theme_cell(cell) -> list:
     """
-    Parses a vendor catalog CSV file and returns a list of product dictionaries.
+    Parses one `themes` cell into a list of theme strings. Accepts JSON arrays
+    (the sample CSV stores '["Tech-savvy", "Design-focused"]') and comma separated text.
+    """
+    if not isinstance(cell, str):
+        return []
+    text = cell.strip()
+    if text.startswith("["):
+        try:
+            parsed = json.loads(text)
+            if isinstance(parsed, list):
+                return [str(t).strip() for t in parsed if str(t).strip()]
+        except json.JSONDecodeError:
+            pass
+    themes = [t.strip().strip('[]"\'').strip() for t in text.split(",")]
+    return [t for t in themes if t]
+
+
+def intern_strings(values):
+    """
+    Interns a string column: (vocabulary, int32 ids) with ``vocabulary[ids]`` equal to
+    ``values``. Blank cells are kept as a vocabulary entry of their own.
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+    return np.asarray(uniques, dtype=object), codes.astype(np.int32)
+
+
+class ProductRecord(Mapping):
+    """
+    Read-only dict view of one catalog row, with the keys of ``parse_vendor_catalog``'s
+    dicts. Holds only the catalog and the row number; fields are read on access.
+    """
+
+    __slots__ = ("_catalog", "_row")
+
+    FIELDS = ("name", "category", "sub_category", "price", "themes")
+
+    def __init__(self, catalog, row: int):
+        self._catalog = catalog
+        self._row = row
+
+    def __getitem__(self, key):
+        catalog, row = self._catalog, self._row
+        if key == "name":
+            return catalog.names[row]
+        if key == "category":
+            return catalog.category_vocab[catalog.category_ids[row]]
+        if key == "sub_category":
+            return catalog.sub_category_vocab[catalog.sub_category_ids[row]]
+        if key == "price":
+            return float(catalog.prices[row])
+        if key == "themes":
+            return catalog.themes(row)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def to_python(self) -> dict:
+        return dict(self)
+
+
+class VendorCatalogColumns(Sequence):
+    """
+    Columnar vendor catalog: one array per field. Categories, sub-categories and themes are
+    interned to integer ids; themes are stored CSR-style (row i owns
+    ``theme_ids[theme_offsets[i]:theme_offsets[i + 1]]``).
+
+    Indexing or iterating yields ProductRecord views, so code written against the
+    list-of-dicts catalog reads it unchanged without one dict per product being kept.
+    """
+
+    def __init__(self, names, category_vocab, category_ids, sub_category_vocab, sub_category_ids, prices,
+                 theme_vocab, theme_offsets, theme_ids):
+        self.names = names
+        self.category_vocab = category_vocab
+        self.category_ids = category_ids
+        self.sub_category_vocab = sub_category_vocab
+        self.sub_category_ids = sub_category_ids
+        self.prices = prices
+        self.theme_vocab = theme_vocab
+        self.theme_offsets = theme_offsets
+        self.theme_ids = theme_ids
+
+    @classmethod
+    def from_columns(cls, columns: dict):
+        """Rebuilds a catalog from ``to_columns`` output (e.g. a parse cache entry)."""
+        return cls(
+            names=np.array(columns["names"], dtype=object),
+            category_vocab=np.array(columns["category_vocab"], dtype=object),
+            category_ids=np.array(columns["category_ids"], dtype=np.int32),
+            sub_category_vocab=np.array(columns["sub_category_vocab"], dtype=object),
+            sub_category_ids=np.array(columns["sub_category_ids"], dtype=np.int32),
+            prices=np.array(columns["prices"], dtype=np.float64),
+            theme_vocab=list(columns["theme_vocab"]),
+            theme_offsets=np.array(columns["theme_offsets"], dtype=np.int64),
+            theme_ids=np.array(columns["theme_ids"], dtype=np.int32),
+        )
+
+    @property
+    def categories(self) -> np.ndarray:
+        return self.category_vocab[self.category_ids]
+
+    @property
+    def sub_categories(self) -> np.ndarray:
+        return self.sub_category_vocab[self.sub_category_ids]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [ProductRecord(self, i) for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("catalog row out of range")
+        return ProductRecord(self, row)
+
+    def __iter__(self):
+        return (ProductRecord(self, row) for row in range(len(self)))
+
+    def themes(self, row: int) -> list:
+        return [self.theme_vocab[i] for i in self.theme_ids[self.theme_offsets[row]:self.theme_offsets[row + 1]]]
+
+    def to_columns(self) -> dict:
+        """JSON-serializable columns, the inverse of ``from_columns``."""
+        return {
+            "names": self.names.tolist(),
+            "category_vocab": np.asarray(self.category_vocab).tolist(),
+            "category_ids": np.asarray(self.category_ids).tolist(),
+            "sub_category_vocab": np.asarray(self.sub_category_vocab).tolist(),
+            "sub_category_ids": np.asarray(self.sub_category_ids).tolist(),
+            "prices": np.asarray(self.prices).tolist(),
+            "theme_vocab": list(self.theme_vocab),
+            "theme_offsets": np.asarray(self.theme_offsets).tolist(),
+            "theme_ids": np.asarray(self.theme_ids).tolist(),
+        }
+
+    def to_records(self) -> list:
+        """The list-of-dicts form returned by ``parse_vendor_catalog``."""
+        vocab = self.theme_vocab
+        ids = self.theme_ids.tolist()
+        offsets = self.theme_offsets.tolist()
+        return [
+            {
+                "name": name,
+                "category": category,
+                "sub_category": sub_category,
+                "price": price,
+                "themes": [vocab[i] for i in ids[start:end]],
+            }
+            for name, category, sub_category, price, start, end in zip(
+                self.names.tolist(),
+                self.categories.tolist(),
+                self.sub_categories.tolist(),
+                self.prices.tolist(),
+                offsets[:-1],
+                offsets[1:],
+            )
+        ]
+
+    def to_python(self) -> list:
+        return self.to_records()
+
+
+def load_vendor_catalog(file_path: str, columnar: bool = False):
+    """
+    Loads a vendor catalog CSV with vectorized parsing; each distinct `themes` cell is
+    parsed once and its themes interned.
 
     Args:
         file_path (str): Path to the vendor catalog CSV file.
+        columnar (bool): Return a VendorCatalogColumns instead of a list of dicts.
 
     Returns:
-        List[dict]: List of parsed product dictionaries.
+        Union[List[dict], VendorCatalogColumns]: The parsed catalog.
     """
-    
-    df = pd.read_csv(file_path)
-    required_columns = [
-        "name", "category", "sub_category", "price", "themes"
-    ]
-
-    for col in required_columns:
-        if col not in df.columns:
+    # Validate the schema from the header before loading the body
+    header = pd.read_csv(file_path, nrows=0).columns
+    for col in REQUIRED_COLUMNS:
+        if col not in header:
             raise ValueError(f"Missing required column: {col}")
 
-    products = []
-    for _, row in df.iterrows():
-        product = {
-            "name": row["name"],
-            "category": row["category"],
-            "sub_category": row["sub_category"],
-            "price": float(row["price"]),
-            # "vendor": row["Vendor"],
-            # "stock": int(row["Stock"]),
-            # "eligible_colleges": [c.strip() for c in str(row["Eligible Colleges"]).split(",") if c.strip()],
-            "themes": [t.strip() for t in str(row["themes"]).split(",") if t.strip()]
-        }
-        products.append(product)
+    df = pd.read_csv(file_path, usecols=REQUIRED_COLUMNS, dtype=COLUMN_DTYPES)
+
+    cell_codes, cells = pd.factorize(df["themes"])
+    cell_themes = [parse_theme_cell(cell) for cell in cells]
+
+    if not columnar:
+        cell_themes.append([])  # code -1 (blank cell)
+        return [
+            {
+                "name": name,
+                "category": category,
+                "sub_category": sub_category,
+                "price": price,
+                # "vendor": row["Vendor"],
+                # "stock": int(row["Stock"]),
+                # "eligible_colleges": [c.strip() for c in str(row["Eligible Colleges"]).split(",") if c.strip()],
+                "themes": list(cell_themes[code]),
+            }
+            for name, category, sub_category, price, code in zip(
+                df["name"].tolist(),
+                df["category"].tolist(),
+                df["sub_category"].tolist(),
+                df["price"].tolist(),
+                cell_codes.tolist(),
+            )
+        ]
 
-    return products
\ No newline at end of file
+    vocab = {}
+    cell_ids = [[vocab.setdefault(t, len(vocab)) for t in themes] for themes in cell_themes]
+
+    cell_lengths = np.array([len(ids) for ids in cell_ids] + [0], dtype=np.int64)  # code -1 (blank) -> 0
+    cell_starts = np.concatenate(([0], np.cumsum(cell_lengths[:-1])))
+    cell_flat = np.array([i for ids in cell_ids for i in ids], dtype=np.int32)
+
+    row_lengths = cell_lengths[cell_codes]
+    theme_offsets = np.concatenate(([0], np.cumsum(row_lengths))).astype(np.int64)
+    # Gather each row's ids from its cell's slice in one shot
+    within_row = np.arange(theme_offsets[-1]) - np.repeat(theme_offsets[:-1], row_lengths)
+    theme_ids = cell_flat[np.repeat(cell_starts[cell_codes], row_lengths) + within_row]
+
+    category_vocab, category_ids = intern_strings(df["category"])
+    sub_category_vocab, sub_category_ids = intern_strings(df["sub_category"])
+
+    return VendorCatalogColumns(
+        names=df["name"].to_numpy(dtype=object),
+        category_vocab=category_vocab,
+        category_ids=category_ids,
+        sub_category_vocab=sub_category_vocab,
+        sub_category_ids=sub_category_ids,
+        prices=df["price"].to_numpy(dtype=np.float64),
+        theme_vocab=list(vocab),
+        theme_offsets=theme_offsets,
+        theme_ids=theme_ids,
+    )
+
+
+def parse_vendor_catalog(file_path: str) -> list:
+    """
+    Parses a vendor catalog CSV file and returns a list of product dictionaries.
+
+    Args:
+        file_path (str): Path to the vendor catalog CSV file.
+
+    Returns:
+        List[dict]: List of parsed product dictionaries.
+    """
+    return load_vendor_catalog(file_path)
@@ -0,0 +1,510 @@
+"""
+Incremental, time-windowed sales aggregates folded from daily POS deltas.
+
+A delta is a sales CSV with a date column: ``Date``, ``name``, ``Units Sold`` and optionally
+``Revenue`` (``total_units_sold``/``total_revenue`` and any capitalization work too). Folding
+a delta updates per-product running aggregates without re-reading earlier deltas:
+
+* all-time units and revenue, and exponentially decayed units, are running sums (the
+  decay is applied as the as-of date advances);
+* rolling 7/30/90-day units and revenue subtract the days that fall out of each window,
+  taken from a table of per-product daily sales covering the longest window.
+
+A daily refresh therefore costs O(delta + products) rather than O(history). Windows end at
+the latest sale date folded in (the "as of" date) rather than the wall clock, so refolding
+the same deltas gives the same aggregates.
+
+Each store has its own aggregates. A delta is folded at most once (by content digest), and
+a different file with sales for a date already folded (such as a corrected re-export) is
+rejected rather than added on top: rebuild the store's aggregates to replace a day.
+
+Folding is opt-in: the workflow folds its sales file only when the run marks it as a
+delta (state["sales_delta"], or a bundle's sales_delta.csv in app/batch_runner.py). Other
+sales files, dated full exports included, are aggregated whole by parse_sales_data.
+
+    python -m tools.sales_aggregator fold --store UCLA-001 uploads/pos_2025-09-01.csv uploads/pos_2025-09-02.csv
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from tools.parse_cache import file_digest
+from tools.parse_sales_data import DEFAULT_CHUNKSIZE, STREAMING_THRESHOLD_BYTES
+
+SALES_AGGREGATE_DIR = os.getenv(
+    "SALES_AGGREGATE_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "sales_aggregates")),
+)
+# Rolling windows, in days ending at the as-of date
+WINDOW_DAYS = (7, 30, 90)
+# Units sold this many days before the as-of date count half
+SALES_DECAY_HALF_LIFE_DAYS = float(os.getenv("SALES_DECAY_HALF_LIFE_DAYS", 14))
+AGGREGATE_FORMAT_VERSION = 1
+
+# Selectable sales signals for scoring: window -> sales_data field
+SALES_WINDOWS = {
+    "all": "total_units_sold",
+    **{f"{days}d": f"units_{days}d" for days in WINDOW_DAYS},
+    "decayed": "decayed_units",
+}
+
+_COLUMN_ALIASES = {
+    "date": "date",
+    "name": "name",
+    "units_sold": "units",
+    "total_units_sold": "units",
+    "revenue": "revenue",
+    "total_revenue": "revenue",
+    "store_id": "store_id",
+}
+_SEPARATOR = "\0"
+
+_lock = threading.Lock()  # One folding thread per process; one writer per aggregate file
+
+
+def _normalize_column(column: str) -> str:
+    return re.sub(r"\s+", "_", str(column).strip().lower())
+
+
+def sales_columns(file_path: str, wanted, required) -> dict:
+    """
+    Maps a sales CSV's columns onto canonical names ("date", "name", "units", "revenue",
+    "store_id"), whatever their spelling ("Units Sold", "total_units_sold", "Store ID", ...).
+
+    Returns:
+        Dict[str, str]: Original column -> canonical name, for the ``wanted`` names present.
+
+    Raises:
+        ValueError: When a ``required`` column is missing.
+    """
+    header = pd.read_csv(file_path, nrows=0).columns
+    columns = {}
+    for column in header:
+        canonical = _COLUMN_ALIASES.get(_normalize_column(column))
+        if canonical in wanted and canonical not in columns.values():
+            columns[column] = canonical
+    for column in required:
+        if column not in columns.values():
+            raise ValueError(f"Missing required column: {column}")
+    return columns
+
+
+def read_delta(file_path: str, chunksize: int = None) -> pd.DataFrame:
+    """
+    Reads a delta into one row per (day, name), with "day" as days since the epoch.
+
+    Args:
+        file_path (str): Path to the delta CSV.
+        chunksize (int, optional): Rows per chunk. Like parse_sales_data, files of at least
+            STREAMING_THRESHOLD_BYTES are read in DEFAULT_CHUNKSIZE-row chunks by default.
+
+    Returns:
+        pd.DataFrame: Columns "day" (int64), "name", "units" and "revenue" (float64).
+    """
+    columns = sales_columns(file_path, ("date", "name", "units", "revenue"), ("date", "name", "units"))
+    if chunksize is None and os.path.getsize(file_path) >= STREAMING_THRESHOLD_BYTES:
+        chunksize = DEFAULT_CHUNKSIZE
+    read_options = {"usecols": list(columns), "dtype": {c: str for c in columns}}
+    chunks = pd.read_csv(file_path, chunksize=chunksize, **read_options) if chunksize else [
+        pd.read_csv(file_path, **read_options)
+    ]
+
+    # Each chunk is reduced to (day, name) sums before the next is read
+    partials = []
+    for chunk in chunks:
+        chunk = chunk.rename(columns=columns)
+        dates = pd.to_datetime(chunk["date"], errors="coerce")
+        chunk = chunk.assign(
+            day=dates.to_numpy().astype("datetime64[D]").astype(np.int64),
+            units=pd.to_numeric(chunk["units"], errors="coerce").fillna(0.0),
+            revenue=pd.to_numeric(chunk["revenue"], errors="coerce").fillna(0.0) if "revenue" in chunk else 0.0,
+        )
+        chunk = chunk[dates.notna().to_numpy() & chunk["name"].notna().to_numpy()]
+        partials.append(chunk.groupby(["day", "name"], sort=False)[["units", "revenue"]].sum())
+    if not partials:
+        return pd.DataFrame({
+            "day": np.zeros(0, dtype=np.int64), "name": np.zeros(0, dtype=object),
+            "units": np.zeros(0, dtype=np.float64), "revenue": np.zeros(0, dtype=np.float64),
+        })
+    return pd.concat(partials).groupby(level=["day", "name"], sort=True)[["units", "revenue"]].sum().reset_index()
+
+
+def _day_to_date(day: int) -> str:
+    return str(np.datetime64(int(day), "D"))
+
+
+def _save_npz(path: str, arrays: dict) -> None:
+    """Writes ``arrays`` to ``path`` through a temporary file, so readers never see a partial file."""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class SalesAggregates:
+    """
+    Per-product running sales aggregates, persisted as a directory: ``aggregates.npz``
+    (manifest, product names and per-product sums) and one ``days/<day>-<n>.npz`` file of
+    per-product sales for each day inside the longest window. A fold reads only the day
+    files it expires or checks, and writes only the days it touches.
+    """
+
+    # Per-product float64 running sums; windows are added per WINDOW_DAYS
+    SUM_FIELDS = (
+        "units", "revenue", "decayed_units", "sale_days",
+        *(f"{kind}_{days}d" for days in WINDOW_DAYS for kind in ("units", "revenue")),
+    )
+    _DAY_COLUMNS = ("product", "units", "revenue")
+
+    def __init__(self, directory: str = None):
+        self.directory = directory
+        self.names = []
+        self.sums = {field: np.zeros(0, dtype=np.float64) for field in self.SUM_FIELDS}
+        self.last_sale_day = np.zeros(0, dtype=np.int64)
+        self.as_of = None
+        self.applied = []
+        self.day_files = {}  # day -> file under days/, for days inside the longest window
+        self._days = {}  # day -> {column: array}, loaded or changed in this process
+        self._changed_days = set()
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def applied_digests(self) -> set:
+        return {entry["sha256"] for entry in self.applied}
+
+    @property
+    def folded_days(self) -> set:
+        return {day for entry in self.applied for day in entry.get("days", [])}
+
+    def _day_rows(self, day: int) -> dict:
+        """Per-product sales of one day inside the longest window (empty if none)."""
+        if day not in self._days:
+            if day in self.day_files:
+                with np.load(os.path.join(self.directory, "days", self.day_files[day]), allow_pickle=False) as data:
+                    self._days[day] = {column: data[column] for column in self._DAY_COLUMNS}
+            else:
+                self._days[day] = {
+                    "product": np.zeros(0, dtype=np.int64),
+                    "units": np.zeros(0, dtype=np.float64),
+                    "revenue": np.zeros(0, dtype=np.float64),
+                }
+        return self._days[day]
+
+    def _window_days(self) -> set:
+        return set(self.day_files) | set(self._days)
+
+    def _product_ids(self, names) -> np.ndarray:
+        """Ids of ``names``, registering unseen products with zeroed aggregates."""
+        names = np.asarray(names, dtype=object)
+        ids = pd.Index(self.names, dtype=object).get_indexer(names).astype(np.int64)
+        unseen = ids < 0
+        if unseen.any():
+            codes, new_names = pd.factorize(names[unseen])
+            ids[unseen] = len(self.names) + codes
+            self.names.extend(new_names.tolist())
+        grow = len(self.names) - len(self.last_sale_day)
+        if grow:
+            for field, values in self.sums.items():
+                self.sums[field] = np.concatenate([values, np.zeros(grow, dtype=np.float64)])
+            self.last_sale_day = np.concatenate([self.last_sale_day, np.full(grow, -1, dtype=np.int64)])
+        return ids
+
+    def _advance(self, as_of: int) -> None:
+        """Moves the as-of date forward: decays, and expires days that leave each window."""
+        as_of = int(as_of)
+        if self.as_of is None:
+            self.as_of = as_of
+            return
+        step = as_of - self.as_of
+        if step <= 0:
+            return
+        self.sums["decayed_units"] *= 0.5 ** (step / SALES_DECAY_HALF_LIFE_DAYS)
+        window_days = self._window_days()
+        for window in WINDOW_DAYS:
+            # Days in (old as_of - window, new as_of - window] drop out of this window
+            for day in sorted(d for d in window_days if self.as_of - window < d <= as_of - window):
+                rows = self._day_rows(day)
+                np.subtract.at(self.sums[f"units_{window}d"], rows["product"], rows["units"])
+                np.subtract.at(self.sums[f"revenue_{window}d"], rows["product"], rows["revenue"])
+        for day in window_days:
+            if day <= as_of - max(WINDOW_DAYS):
+                self.day_files.pop(day, None)
+                self._days.pop(day, None)
+                self._changed_days.discard(day)
+        self.as_of = as_of
+
+    def _new_sale_days(self, ids: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """
+        Marks the (product, day) pairs of a delta not already counted. Late rows for a day
+        with no sales inside the longest window, or older than it, count as new days.
+        """
+        new = days > self.last_sale_day[ids]
+        window_days = self._window_days()
+        for day in np.unique(days[~new]).tolist():
+            check = ~new & (days == day)
+            if day in window_days:
+                new[check] = ~np.isin(ids[check], self._day_rows(day)["product"])
+            else:
+                new[check] = True
+        return new
+
+    def fold(self, delta: pd.DataFrame) -> None:
+        """Adds a ``read_delta`` frame to every aggregate."""
+        if delta.empty:
+            return
+        ids = self._product_ids(delta["name"].tolist())
+        days = delta["day"].to_numpy(dtype=np.int64)
+        units = delta["units"].to_numpy(dtype=np.float64)
+        revenue = delta["revenue"].to_numpy(dtype=np.float64)
+
+        self._advance(max(self.as_of if self.as_of is not None else days.max(), days.max()))
+        np.add.at(self.sums["sale_days"], ids, self._new_sale_days(ids, days))
+        np.add.at(self.sums["units"], ids, units)
+        np.add.at(self.sums["revenue"], ids, revenue)
+        age = self.as_of - days
+        np.add.at(self.sums["decayed_units"], ids, units * 0.5 ** (age / SALES_DECAY_HALF_LIFE_DAYS))
+        for window in WINDOW_DAYS:
+            inside = age < window
+            np.add.at(self.sums[f"units_{window}d"], ids[inside], units[inside])
+            np.add.at(self.sums[f"revenue_{window}d"], ids[inside], revenue[inside])
+        np.maximum.at(self.last_sale_day, ids, days)
+
+        # read_delta sorts by day, so each day is one contiguous run
+        in_window = age < max(WINDOW_DAYS)
+        for day in np.unique(days[in_window]).tolist():
+            start, end = np.searchsorted(days, [day, day + 1])
+            rows = self._day_rows(day)
+            self._days[day] = {
+                "product": np.concatenate([rows["product"], ids[start:end]]),
+                "units": np.concatenate([rows["units"], units[start:end]]),
+                "revenue": np.concatenate([rows["revenue"], revenue[start:end]]),
+            }
+            self._changed_days.add(day)
+
+    def view(self) -> "SalesWindows":
+        return SalesWindows(self)
+
+    def save(self, directory: str = None) -> None:
+        """
+        Writes changed day files, then publishes ``aggregates.npz`` atomically; day files no
+        longer listed in it (expired, superseded or left by an interrupted save) are removed.
+        """
+        directory = self.directory = directory or self.directory
+        days_dir = os.path.join(directory, "days")
+        os.makedirs(days_dir, exist_ok=True)
+        generation = len(self.applied)
+        for day in sorted(self._changed_days):
+            file_name = f"{day}-{generation}.npz"
+            _save_npz(os.path.join(days_dir, file_name), self._days[day])
+            self.day_files[day] = file_name
+        self._changed_days.clear()
+
+        manifest = {
+            "format_version": AGGREGATE_FORMAT_VERSION,
+            "as_of": self.as_of,
+            "half_life_days": SALES_DECAY_HALF_LIFE_DAYS,
+            "day_files": {str(day): file_name for day, file_name in sorted(self.day_files.items())},
+            "applied": self.applied,
+        }
+        _save_npz(os.path.join(directory, "aggregates.npz"), {
+            "manifest": np.frombuffer(json.dumps(manifest).encode("utf-8"), dtype=np.uint8),
+            "names": np.frombuffer(_SEPARATOR.join(self.names).encode("utf-8"), dtype=np.uint8),
+            "last_sale_day": self.last_sale_day,
+            **{f"sum_{field}": values for field, values in self.sums.items()},
+        })
+
+        listed = set(self.day_files.values())
+        for file_name in os.listdir(days_dir):
+            if file_name not in listed:
+                os.remove(os.path.join(days_dir, file_name))
+
+    @classmethod
+    def load(cls, directory: str) -> "SalesAggregates":
+        aggregates = cls(directory)
+        with np.load(os.path.join(directory, "aggregates.npz"), allow_pickle=False) as data:
+            manifest = json.loads(data["manifest"].tobytes().decode("utf-8"))
+            if manifest.get("format_version") != AGGREGATE_FORMAT_VERSION:
+                raise ValueError(f"Unsupported sales aggregate format in {directory}")
+            if manifest["half_life_days"] != SALES_DECAY_HALF_LIFE_DAYS:
+                raise ValueError(
+                    f"{directory} was built with a {manifest['half_life_days']}-day half-life; "
+                    "rebuild it to change SALES_DECAY_HALF_LIFE_DAYS"
+                )
+            names = data["names"].tobytes().decode("utf-8")
+            aggregates.names = names.split(_SEPARATOR) if names or len(data["last_sale_day"]) else []
+            aggregates.last_sale_day = data["last_sale_day"]
+            aggregates.sums = {field: data[f"sum_{field}"] for field in cls.SUM_FIELDS}
+        aggregates.as_of = manifest["as_of"]
+        aggregates.day_files = {int(day): file_name for day, file_name in manifest["day_files"].items()}
+        aggregates.applied = manifest["applied"]
+        return aggregates
+
+
+class SalesWindows(Mapping):
+    """
+    Read-only name -> stats view of SalesAggregates, shaped like parse_sales_data's output
+    ("total_units_sold" is all-time) plus "total_revenue", "units_<N>d"/"revenue_<N>d" per
+    window, "decayed_units", "avg_units_per_day" and "last_sale_date".
+
+    ``names`` and ``field_array`` expose the columns for vectorized joins (see
+    scoring_engine.align_sales).
+    """
+
+    int_fields = ("total_units_sold", *(f"units_{days}d" for days in WINDOW_DAYS))
+
+    def __init__(self, aggregates: SalesAggregates):
+        self.as_of = _day_to_date(aggregates.as_of) if aggregates.as_of is not None else None
+        self.names = np.array(aggregates.names, dtype=object)
+        sums = aggregates.sums
+        sale_days = sums["sale_days"]
+        self._columns = {
+            "total_units_sold": sums["units"],
+            "total_revenue": sums["revenue"],
+            **{f"{kind}_{days}d": sums[f"{kind}_{days}d"] for days in WINDOW_DAYS for kind in ("units", "revenue")},
+            "decayed_units": sums["decayed_units"],
+            "avg_units_per_day": np.divide(sums["units"], sale_days, out=np.zeros_like(sale_days), where=sale_days > 0),
+        }
+        self._last_sale_day = aggregates.last_sale_day
+        self._index = None
+
+    @property
+    def fields(self) -> tuple:
+        return (*self._columns, "last_sale_date")
+
+    def field_array(self, field: str) -> np.ndarray:
+        return self._columns[field]
+
+    def _row(self, row: int) -> dict:
+        stats = {}
+        for field, values in self._columns.items():
+            value = values[row]
+            # Window sums are kept by subtraction, so round away float residue
+            stats[field] = int(round(value)) if field in self.int_fields else round(float(value), 3)
+        stats["last_sale_date"] = _day_to_date(self._last_sale_day[row])
+        return stats
+
+    def __getitem__(self, name):
+        if self._index is None:
+            self._index = pd.Index(self.names)
+        try:
+            row = self._index.get_loc(name)
+        except KeyError:
+            raise KeyError(name) from None
+        return self._row(row)
+
+    def __iter__(self):
+        return iter(self.names.tolist())
+
+    def __len__(self):
+        return len(self.names)
+
+    def top(self, n: int, field: str = "total_units_sold") -> list:
+        """(name, value) of the ``n`` largest ``field`` values, highest first."""
+        values = self._columns[field]
+        order = np.argsort(-values, kind="stable")[:n]
+        return list(zip(self.names[order].tolist(), values[order].tolist()))
+
+    def to_python(self) -> dict:
+        return {name: self._row(row) for row, name in enumerate(self.names.tolist())}
+
+
+def aggregate_path(store_id: str) -> str:
+    """Where the running aggregates of ``store_id`` live (one directory per store)."""
+    digest = hashlib.sha256(str(store_id).encode("utf-8")).hexdigest()[:12]
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(store_id)).strip("._") or "store"
+    return os.path.join(SALES_AGGREGATE_DIR, f"{slug}-{digest}")
+
+
+def aggregate_state(store_id: str) -> str:
+    """Identifies the aggregates a delta for ``store_id`` would be folded into, for memoization keys."""
+    if not store_id:
+        return "none"
+    try:
+        stat = os.stat(os.path.join(aggregate_path(store_id), "aggregates.npz"))
+    except OSError:
+        return "empty"
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def fold_delta(delta_path: str, store_id: str = None, path: str = None) -> SalesWindows:
+    """
+    Folds a delta file into the aggregates of ``store_id`` (or the aggregate directory
+    ``path``), unless that exact file content was already folded, and returns the updated view.
+
+    Raises:
+        ValueError: When neither ``store_id`` nor ``path`` is given, or when the delta has
+        sales for a date already folded from a different file.
+    """
+    if path is None:
+        if not store_id:
+            raise ValueError(f"Dated sales delta {delta_path} needs a store_id to fold into")
+        path = aggregate_path(store_id)
+    with _lock:
+        if os.path.exists(os.path.join(path, "aggregates.npz")):
+            aggregates = SalesAggregates.load(path)
+        else:
+            aggregates = SalesAggregates(path)
+        digest = file_digest(delta_path)
+        if digest in aggregates.applied_digests:
+            print(f"Sales delta already folded: {delta_path}")
+            return aggregates.view()
+        delta = read_delta(delta_path)
+        days = np.unique(delta["day"].to_numpy(dtype=np.int64)).tolist()
+        overlap = sorted(aggregates.folded_days.intersection(days))
+        if overlap:
+            raise ValueError(
+                f"{delta_path} has sales for {', '.join(_day_to_date(day) for day in overlap[:5])}"
+                f"{' ...' if len(overlap) > 5 else ''}, already folded into {path} from another file"
+            )
+        aggregates.fold(delta)
+        aggregates.applied.append({
+            "sha256": digest,
+            "path": os.path.abspath(delta_path),
+            "rows": len(delta),
+            "days": days,
+            "first_date": _day_to_date(delta["day"].min()) if len(delta) else None,
+            "last_date": _day_to_date(delta["day"].max()) if len(delta) else None,
+        })
+        aggregates.save()
+    view = aggregates.view()
+    print(f"📈 Folded {len(delta)} daily sales rows into {path} (as of {view.as_of})")
+    return view
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fold daily sales deltas into running aggregates.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    fold = subcommands.add_parser("fold", help="Fold delta CSVs in order")
+    fold.add_argument("delta_paths", nargs="+")
+    fold.add_argument("--store", default=None, help="Store whose aggregates the deltas are folded into")
+    fold.add_argument("--aggregate", default=None, help="Aggregate directory (overrides --store)")
+    fold.add_argument("--top", type=int, default=5, help="Products to list per window")
+    args = parser.parse_args()
+    if not (args.store or args.aggregate):
+        parser.error("pass --store or --aggregate")
+
+    view = None
+    for delta_path in args.delta_paths:
+        view = fold_delta(delta_path, args.store, args.aggregate)
+    for window, field in SALES_WINDOWS.items():
+        print(f"{window:>8}: {view.top(args.top, field)}")
+
+
+if __name__ == "__main__":
+    main()
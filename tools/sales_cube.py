@@ -0,0 +1,447 @@
+"""
+Pre-aggregated sales cube over store x season x product, with rollups by store profile.
+
+A multi-store sales export (``Store ID``, ``name``, ``Units Sold``/``total_units_sold`` and
+optionally ``Date``) is aggregated once into sparse cells sorted by store, so one store's
+sales are a contiguous slice. Each store's parse_college_profile attributes (region,
+school_type, enrollment_size, season) are joined on, and per-product totals are rolled up
+for every value of those dimensions. A sale's season comes from its date ("Fall 2025")
+when the export has one, else from the store profile.
+
+Scoring a store (in its profile's season), a rollup, or a cold-start store from its most
+similar stores (shared profile attributes and themes) then reads slices of the cube
+instead of re-filtering the raw export.
+
+    python -m tools.sales_cube sales_export.csv stores/ --store BU-012
+"""
+import glob
+import hashlib
+import json
+import os
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from tools.parse_cache import file_digest
+from tools.parse_college_profile import parse_college_profile
+from tools.sales_aggregator import sales_columns
+
+CUBE_DIR = os.getenv(
+    "SALES_CUBE_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "sales_cubes")),
+)
+CUBE_FORMAT_VERSION = 2
+# Store profile attributes the cube is rolled up by; "season" is also a cell dimension
+ROLLUP_DIMENSIONS = ("region", "school_type", "enrollment_size", "season")
+# Stores pooled for a cold-start store, and the fewest shared attributes plus themes a
+# pooled store needs (a store with no similar stores starts without sales)
+SIMILAR_STORES = int(os.getenv("SIMILAR_STORES", 5))
+SIMILAR_STORES_MIN_MATCHES = int(os.getenv("SIMILAR_STORES_MIN_MATCHES", 2))
+# Academic season of each calendar month
+SEASON_BY_MONTH = {
+    1: "Spring", 2: "Spring", 3: "Spring", 4: "Spring", 5: "Spring",
+    6: "Summer", 7: "Summer",
+    8: "Fall", 9: "Fall", 10: "Fall", 11: "Fall", 12: "Fall",
+}
+UNKNOWN = "Unknown"
+
+
+def load_profiles(paths) -> list:
+    """
+    Parses store profiles from JSON files and/or directories (searched recursively for
+    ``*.json``), skipping files that are not valid college profiles.
+    """
+    files = []
+    for path in [paths] if isinstance(paths, str) else paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "**", "*.json"), recursive=True)))
+        else:
+            files.append(path)
+    profiles = []
+    for file_path in files:
+        try:
+            profiles.append(parse_college_profile(file_path))
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+    return profiles
+
+
+def _grouped(keys: np.ndarray, weights: np.ndarray):
+    """(unique keys, summed weights), keys ascending."""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=weights, minlength=len(unique))
+
+
+class CubeSlice(Mapping):
+    """
+    Read-only name -> {"total_units_sold": int} view of a cube slice, shaped like
+    parse_sales_data's output. ``names`` and ``field_array`` expose the columns for
+    vectorized joins (see scoring_engine.align_sales).
+    """
+
+    fields = ("total_units_sold",)
+
+    def __init__(self, products: np.ndarray, product_ids: np.ndarray, units: np.ndarray):
+        self.names = products[product_ids]
+        self._units = units
+        self._index = None
+
+    def field_array(self, field: str) -> np.ndarray:
+        if field != "total_units_sold":
+            raise KeyError(field)
+        return self._units
+
+    def __getitem__(self, name):
+        if self._index is None:
+            self._index = pd.Index(self.names)
+        try:
+            row = self._index.get_loc(name)
+        except KeyError:
+            raise KeyError(name) from None
+        return {"total_units_sold": int(round(self._units[row]))}
+
+    def __iter__(self):
+        return iter(self.names.tolist())
+
+    def __len__(self):
+        return len(self.names)
+
+    def top(self, n: int) -> list:
+        order = np.argsort(-self._units, kind="stable")[:n]
+        return list(zip(self.names[order].tolist(), self._units[order].round().astype(np.int64).tolist()))
+
+    def to_python(self) -> dict:
+        units = self._units.round().astype(np.int64).tolist()
+        return {name: {"total_units_sold": sold} for name, sold in zip(self.names.tolist(), units)}
+
+
+class SalesCube:
+    """
+    Sparse (store, season, product) -> units cells sorted by store, plus per-dimension
+    rollups. Stores without sales (profile only) have empty slices.
+
+    Attributes:
+        stores (np.ndarray): Store ids; a store's index is its position.
+        products (np.ndarray): Product names.
+        seasons (np.ndarray): Season labels.
+        attributes (Dict[str, np.ndarray]): Per store, its value code for each ROLLUP_DIMENSIONS
+            dimension, indexing ``values[dimension]``.
+        themes (List[str]): Profile themes; store i's theme ids are
+            ``store_theme_ids[store_theme_offsets[i]:store_theme_offsets[i + 1]]``.
+    """
+
+    def __init__(self, arrays: dict, meta: dict):
+        self.stores = np.array(meta["stores"], dtype=object)
+        self.products = np.array(meta["products"], dtype=object)
+        self.seasons = np.array(meta["seasons"], dtype=object)
+        self.values = {dimension: meta["values"][dimension] for dimension in ROLLUP_DIMENSIONS}
+        self.meta = meta
+        self.cell_store = arrays["cell_store"]
+        self.cell_season = arrays["cell_season"]
+        self.cell_product = arrays["cell_product"]
+        self.cell_units = arrays["cell_units"]
+        self.store_offsets = arrays["store_offsets"]
+        self.attributes = {dimension: arrays[f"store_{dimension}"] for dimension in ROLLUP_DIMENSIONS}
+        self.themes = meta["themes"]
+        self.store_theme_offsets = arrays["store_theme_offsets"]
+        self.store_theme_ids = arrays["store_theme_ids"]
+        self.rollups = {
+            dimension: (arrays[f"rollup_{dimension}_offsets"], arrays[f"rollup_{dimension}_product"],
+                        arrays[f"rollup_{dimension}_units"])
+            for dimension in ROLLUP_DIMENSIONS
+        }
+        self._store_index = pd.Index(self.stores)
+
+    @property
+    def key(self):
+        """Cache key of the inputs the cube was built from (None when built directly)."""
+        return self.meta.get("key")
+
+    @property
+    def arrays(self) -> dict:
+        arrays = {
+            "cell_store": self.cell_store,
+            "cell_season": self.cell_season,
+            "cell_product": self.cell_product,
+            "cell_units": self.cell_units,
+            "store_offsets": self.store_offsets,
+            "store_theme_offsets": self.store_theme_offsets,
+            "store_theme_ids": self.store_theme_ids,
+        }
+        for dimension in ROLLUP_DIMENSIONS:
+            arrays[f"store_{dimension}"] = self.attributes[dimension]
+            offsets, product, units = self.rollups[dimension]
+            arrays[f"rollup_{dimension}_offsets"] = offsets
+            arrays[f"rollup_{dimension}_product"] = product
+            arrays[f"rollup_{dimension}_units"] = units
+        return arrays
+
+    def __contains__(self, store_id):
+        return store_id in self._store_index
+
+    def _store_position(self, store_id) -> int:
+        try:
+            return self._store_index.get_loc(store_id)
+        except KeyError:
+            raise KeyError(f"Store {store_id!r} is not in the sales cube") from None
+
+    def has_sales(self, store_id) -> bool:
+        if store_id not in self:
+            return False
+        position = self._store_position(store_id)
+        return self.store_offsets[position + 1] > self.store_offsets[position]
+
+    def _season_code(self, season):
+        matches = np.flatnonzero(self.seasons == season)
+        return matches[0] if len(matches) else -1
+
+    def stores_sales(self, store_ids, season: str = None, average: bool = False) -> CubeSlice:
+        """
+        Units per product summed over ``store_ids`` (averaged per store with ``average``),
+        read from each store's slice; ``season`` keeps that season's cells only.
+        """
+        positions = [self._store_position(store_id) for store_id in store_ids]
+        slices = [slice(self.store_offsets[p], self.store_offsets[p + 1]) for p in positions]
+        product = np.concatenate([self.cell_product[s] for s in slices] or [np.zeros(0, dtype=np.int64)])
+        units = np.concatenate([self.cell_units[s] for s in slices] or [np.zeros(0, dtype=np.float64)])
+        if season is not None:
+            season_codes = np.concatenate([self.cell_season[s] for s in slices] or [np.zeros(0, dtype=np.int32)])
+            keep = season_codes == self._season_code(season)
+            product, units = product[keep], units[keep]
+        if len(positions) > 1 or season is None:
+            product, units = _grouped(product, units)
+        if average and positions:
+            units = units / len(positions)
+        return CubeSlice(self.products, product, units)
+
+    def store_sales(self, store_id, season: str = None) -> CubeSlice:
+        """One store's units per product: a contiguous slice of the cells."""
+        return self.stores_sales([store_id], season)
+
+    def rollup(self, dimension: str, value) -> CubeSlice:
+        """Units per product over every store whose ``dimension`` is ``value`` (precomputed)."""
+        if dimension not in self.rollups:
+            raise ValueError(f"Unknown rollup dimension: {dimension}")
+        offsets, product, units = self.rollups[dimension]
+        try:
+            code = self.values[dimension].index(value)
+        except ValueError:
+            code = None
+        if code is None:
+            return CubeSlice(self.products, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64))
+        rows = slice(offsets[code], offsets[code + 1])
+        return CubeSlice(self.products, product[rows], units[rows])
+
+    def similar_stores(self, profile: dict, k: int = SIMILAR_STORES,
+                       min_matches: int = SIMILAR_STORES_MIN_MATCHES) -> list:
+        """
+        Up to ``k`` stores with sales sharing the most ROLLUP_DIMENSIONS attributes plus
+        themes with ``profile`` (ties in cube order), excluding the profile's own store and
+        stores sharing fewer than ``min_matches``.
+
+        Returns:
+            List[Tuple[str, int]]: (store id, shared attribute and theme count), best first.
+        """
+        matches = np.zeros(len(self.stores), dtype=np.int64)
+        for dimension in ROLLUP_DIMENSIONS:
+            values = self.values[dimension]
+            value = str(profile.get(dimension, UNKNOWN))
+            if value in values:
+                matches += self.attributes[dimension] == values.index(value)
+        theme_ids = [self.themes.index(theme) for theme in set(profile.get("themes") or []) if theme in self.themes]
+        if theme_ids:
+            shared = np.isin(self.store_theme_ids, theme_ids)
+            store_of_theme = np.repeat(np.arange(len(self.stores)), np.diff(self.store_theme_offsets))
+            matches += np.bincount(store_of_theme[shared], minlength=len(self.stores))
+        eligible = (np.diff(self.store_offsets) > 0) & (matches >= min_matches)
+        if profile.get("store_id") in self:
+            eligible[self._store_position(profile["store_id"])] = False
+        candidates = np.flatnonzero(eligible)
+        order = candidates[np.argsort(-matches[candidates], kind="stable")][:k]
+        return list(zip(self.stores[order].tolist(), matches[order].tolist()))
+
+    def sales_for(self, profile: dict, k: int = SIMILAR_STORES):
+        """
+        Sales data for scoring the store of ``profile``: its own slice when it has sales,
+        else the per-store average of its ``similar_stores`` (a cold start). Only the
+        profile's season is read when those stores have sales in it.
+
+        Returns:
+            Tuple[CubeSlice, List[str]]: The sales and the store ids they were read from
+            (empty when no store is similar enough).
+        """
+        store_id = profile.get("store_id")
+        if self.has_sales(store_id):
+            sources = [store_id]
+        else:
+            sources = [store for store, _ in self.similar_stores(profile, k)]
+        average = sources != [store_id]
+        season = profile.get("season")
+        if season is not None:
+            sales = self.stores_sales(sources, season, average=average)
+            if len(sales):
+                return sales, sources
+        return self.stores_sales(sources, average=average), sources
+
+
+def season_of(dates: pd.Series) -> pd.Series:
+    """Academic season labels ("Fall 2025") of parsed dates."""
+    return dates.dt.month.map(SEASON_BY_MONTH) + " " + dates.dt.year.astype("Int64").astype(str)
+
+
+def build_cube(sales_path: str, profiles) -> SalesCube:
+    """
+    Aggregates a multi-store sales export into a SalesCube.
+
+    Args:
+        sales_path (str): CSV with a store id, product name and units column, and optionally a date.
+        profiles (List[dict]): parse_college_profile outputs of the stores; stores missing
+            here get "Unknown" attributes, and profiled stores without sales get empty slices.
+
+    Returns:
+        SalesCube: The cube.
+    """
+    columns = sales_columns(sales_path, ("store_id", "name", "units", "date"), ("store_id", "name", "units"))
+    df = pd.read_csv(sales_path, usecols=list(columns), dtype={c: str for c in columns}).rename(columns=columns)
+    df = df[df["store_id"].notna() & df["name"].notna()]
+    units = pd.to_numeric(df["units"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+
+    profiles_by_store = {str(p["store_id"]): p for p in profiles}
+    stores = pd.Index(list(dict.fromkeys([*profiles_by_store, *pd.unique(df["store_id"]).tolist()])))
+    store_codes = stores.get_indexer(df["store_id"]).astype(np.int64)
+
+    store_values = {
+        dimension: [str(profiles_by_store.get(store, {}).get(dimension, UNKNOWN)) for store in stores]
+        for dimension in ROLLUP_DIMENSIONS
+    }
+    if "date" in df:
+        dates = pd.to_datetime(df["date"], errors="coerce")
+        row_seasons = season_of(dates).where(dates.notna(), None)
+        # Undated rows fall back to the store's profile season
+        fallback = np.array(store_values["season"], dtype=object)[store_codes]
+        row_seasons = row_seasons.fillna(pd.Series(fallback, index=row_seasons.index))
+    else:
+        row_seasons = pd.Series(np.array(store_values["season"], dtype=object)[store_codes])
+    season_codes, seasons = pd.factorize(row_seasons.to_numpy(dtype=object))
+    product_codes, products = pd.factorize(df["name"].to_numpy(dtype=object))
+
+    # Cells sorted by (store, season, product): key = (store * seasons + season) * products + product
+    n_seasons, n_products = max(len(seasons), 1), max(len(products), 1)
+    keys, cell_units = _grouped(
+        (store_codes * n_seasons + season_codes) * n_products + product_codes, units
+    )
+    cell_product = keys % n_products
+    cell_season = (keys // n_products) % n_seasons
+    cell_store = keys // (n_products * n_seasons)
+    store_offsets = np.searchsorted(cell_store, np.arange(len(stores) + 1))
+
+    values = {}
+    arrays = {
+        "cell_store": cell_store.astype(np.int32),
+        "cell_season": cell_season.astype(np.int32),
+        "cell_product": cell_product.astype(np.int64),
+        "cell_units": cell_units,
+        "store_offsets": store_offsets.astype(np.int64),
+    }
+    season_list = [str(s) for s in seasons]
+    for dimension in ROLLUP_DIMENSIONS:
+        if dimension == "season":
+            # Seasons are per cell (sale dates), not per store
+            vocab = list(dict.fromkeys(season_list + store_values["season"]))
+            cell_codes = np.array([vocab.index(s) for s in season_list], dtype=np.int64)[cell_season] \
+                if len(cell_season) else np.zeros(0, dtype=np.int64)
+        else:
+            vocab = list(dict.fromkeys(store_values[dimension]))
+            cell_codes = np.array([vocab.index(v) for v in store_values[dimension]], dtype=np.int64)[cell_store] \
+                if len(cell_store) else np.zeros(0, dtype=np.int64)
+        values[dimension] = vocab
+        arrays[f"store_{dimension}"] = np.array([vocab.index(v) for v in store_values[dimension]], dtype=np.int32)
+        rollup_keys, rollup_units = _grouped(cell_codes * n_products + cell_product, cell_units)
+        rollup_value = rollup_keys // n_products
+        arrays[f"rollup_{dimension}_offsets"] = np.searchsorted(rollup_value, np.arange(len(vocab) + 1)).astype(np.int64)
+        arrays[f"rollup_{dimension}_product"] = (rollup_keys % n_products).astype(np.int64)
+        arrays[f"rollup_{dimension}_units"] = rollup_units
+
+    # Profile themes as one id list per store
+    store_themes = [list(dict.fromkeys(profiles_by_store.get(store, {}).get("themes") or [])) for store in stores]
+    themes = list(dict.fromkeys(theme for store_theme in store_themes for theme in store_theme))
+    arrays["store_theme_offsets"] = np.cumsum([0] + [len(t) for t in store_themes]).astype(np.int64)
+    arrays["store_theme_ids"] = np.array(
+        [themes.index(theme) for store_theme in store_themes for theme in store_theme], dtype=np.int32
+    )
+
+    meta = {
+        "stores": stores.tolist(),
+        "themes": themes,
+        "products": [str(p) for p in products],
+        "seasons": season_list,
+        "values": values,
+        "rows": int(len(df)),
+    }
+    return SalesCube(arrays, meta)
+
+
+def cube_key(sales_path: str, profiles) -> str:
+    """Cache key of the cube built from ``sales_path`` and ``profiles``."""
+    payload = json.dumps(
+        {"version": CUBE_FORMAT_VERSION, "sales": file_digest(sales_path), "profiles": profiles},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def save_cube(cube: SalesCube, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        np.savez(f, meta=np.frombuffer(json.dumps(cube.meta).encode("utf-8"), dtype=np.uint8), **cube.arrays)
+    os.replace(temp_path, path)
+
+
+def load_cube(path: str) -> SalesCube:
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+        return SalesCube({name: data[name] for name in data.files if name != "meta"}, meta)
+
+
+def open_cube(sales_path: str, profiles, cube_dir: str = None) -> SalesCube:
+    """The cube of ``sales_path`` and ``profiles``, built on first use and cached on disk."""
+    key = cube_key(sales_path, profiles)
+    path = os.path.join(cube_dir or CUBE_DIR, f"{key}.npz")
+    if os.path.exists(path):
+        try:
+            return load_cube(path)
+        except (OSError, ValueError, KeyError):
+            pass
+    cube = build_cube(sales_path, profiles)
+    cube.meta["key"] = key
+    save_cube(cube, path)
+    print(f"🧊 Built sales cube: {len(cube.stores)} stores x {len(cube.products)} products, "
+          f"{len(cube.cell_units)} cells ({path})")
+    return cube
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a store x season x product sales cube.")
+    parser.add_argument("sales_path", help="Multi-store sales export CSV")
+    parser.add_argument("profiles", nargs="+", help="College profile JSON files or directories")
+    parser.add_argument("--store", default=None, help="Show this store's top products (or its cold-start pool)")
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    profiles = load_profiles(args.profiles)
+    cube = open_cube(args.sales_path, profiles)
+    for dimension in ROLLUP_DIMENSIONS:
+        for value in cube.values[dimension]:
+            print(f"{dimension}={value}: {cube.rollup(dimension, value).top(args.top)}")
+    if args.store:
+        profile = next((p for p in profiles if p["store_id"] == args.store), {"store_id": args.store})
+        sales, sources = cube.sales_for(profile)
+        print(f"{args.store} (from {', '.join(map(str, sources))}): {sales.top(args.top)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import os
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from tools.instrumentation import propagate_context
+from tools.mention_index import MentionIndex
+from tools.parse_cache import file_digest
+from tools.text_analysis import (
+    resolve_backend, read_lines, line_sentiment, compile_keywords, line_words, llm_average_sentiment
+)
+
+# Keyword themes and LLM sentiment temperature per kind of text input
+ANALYSIS_KEYWORDS = {
+    "trend": ["tech", "decor", "desk", "aesthetic", "study", "wellness", "bedding", "gadgets"],
+    "survey": ["pricing", "delivery", "selection", "dorm", "health", "tech", "supplies"],
+}
+SENTIMENT_TEMPERATURE = {"trend": 0.3, "survey": 0.2}
+_LABELS = {"trend": "Trend data", "survey": "Survey feedback"}
+_KEYWORD_PATTERNS = {kind: compile_keywords(keywords) for kind, keywords in ANALYSIS_KEYWORDS.items()}
+
+# Analyses kept in memory, keyed by file digest
+MAX_ANALYSES = int(os.getenv("TEXT_ANALYSIS_CACHE_ENTRIES", 16))
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="text-analysis")
+# Backend layers wait on a shared pass, so they get their own pool (a full pool of waiting
+# layers could otherwise starve the passes they wait on)
+_layer_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="text-sentiment")
+_analyses = OrderedDict()  # (file digest, kind, catalog digest) -> Future of the shared pass
+_layers = OrderedDict()  # (file digest, kind, backend) -> Future of the backend's layer
+_mention_indexes = OrderedDict()  # catalog digest -> MentionIndex
+_lock = threading.Lock()
+
+
+def catalog_mention_index(catalog_path: str) -> MentionIndex:
+    """The mention automaton of a vendor catalog, built once per catalog content."""
+    from tools.parse_vendor_catalog import load_vendor_catalog
+
+    digest = file_digest(catalog_path)
+    with _lock:
+        if digest in _mention_indexes:
+            _mention_indexes.move_to_end(digest)
+            return _mention_indexes[digest]
+    index = MentionIndex(load_vendor_catalog(catalog_path, columnar=True).names.tolist())
+    with _lock:
+        _mention_indexes[digest] = index
+        while len(_mention_indexes) > 4:
+            _mention_indexes.popitem(last=False)
+    return index
+
+
+def analyze_text(lines, kind: str, mention_index: MentionIndex = None) -> dict:
+    """
+    Computes every backend-independent text signal the app uses in one pass over ``lines``.
+
+    Args:
+        lines (List[str]): Non-empty, stripped lines of the file.
+        kind (str): "trend" or "survey"; selects the keyword themes.
+        mention_index (MentionIndex, optional): Catalog products whose mentions are counted.
+
+    Returns:
+        dict: lines, average_sentiment (lexicon), top_words, themes (keyword -> lines) and
+        mentions (product -> count, products with no mention omitted).
+    """
+    patterns = _KEYWORD_PATTERNS[kind]
+
+    words = Counter()
+    themes = {keyword: [] for keyword in patterns}
+    mentions = Counter()
+    sentiment_total = 0.0
+    for line in lines:
+        lowered = line.lower()
+        words.update(line_words(lowered))
+        sentiment_total += line_sentiment(lowered)
+        for keyword, pattern in patterns.items():
+            if pattern.search(line):
+                themes[keyword].append(line)
+        if mention_index is not None:
+            mention_index.count_into(mentions, lowered)
+
+    return {
+        "kind": kind,
+        "lines": lines,
+        "average_sentiment": round(sentiment_total / len(lines), 3) if lines else 0.0,
+        "top_words": [[word, count] for word, count in words.most_common(20)],
+        "themes": themes,
+        "mentions": dict(mentions),
+    }
+
+
+def sentiment_layer(analysis: dict, backend: str) -> dict:
+    """
+    The backend-specific part of an analysis, over the shared pass's lines: "hybrid" asks
+    the LLM for the average sentiment, and "llm" runs the parser's whole LLM analysis
+    (returned as "llm_result", its sentiment as "average_sentiment").
+    """
+    kind = analysis["kind"]
+    if backend == "hybrid":
+        return {"average_sentiment": llm_average_sentiment(analysis["lines"], temperature=SENTIMENT_TEMPERATURE[kind])}
+    # The parsers import this module, so their LLM analyses are imported on first use
+    if kind == "trend":
+        from tools.parse_trend_data import llm_trend_analysis as llm_analysis
+    else:
+        from tools.parse_survey_feedback import llm_survey_analysis as llm_analysis
+    result = llm_analysis(analysis["lines"])
+    return {"average_sentiment": result.get("average_sentiment"), "llm_result": result}
+
+
+def _run(file_path, kind, catalog_path):
+    mention_index = catalog_mention_index(catalog_path) if catalog_path else None
+    return analyze_text(read_lines(file_path, _LABELS[kind]), kind, mention_index)
+
+
+def _run_layer(analysis_future, backend):
+    return sentiment_layer(analysis_future.result(), backend)
+
+
+def _merged(analysis, layer):
+    """A future of ``analysis`` with ``layer`` applied, resolved once both are done."""
+    merged = Future()
+
+    def merge(_):
+        try:
+            merged.set_result({**analysis.result(), **layer.result()})
+        except Exception as e:
+            merged.set_exception(e)
+
+    layer.add_done_callback(lambda _: analysis.add_done_callback(merge))
+    return merged
+
+
+def _cached(cache, key, submit, fallback=None):
+    """The live future under ``key`` (or ``fallback``), else a new one from ``submit``. Hold _lock."""
+    future = cache.get(key, fallback)
+    if future is None or (future.done() and future.exception() is not None):
+        future = submit()
+        cache[key] = future
+        while len(cache) > MAX_ANALYSES:
+            cache.popitem(last=False)
+    elif key in cache:
+        cache.move_to_end(key)
+    return future
+
+
+def start_text_analysis(file_path: str, kind: str, catalog_path: str = None, backend: str = None):
+    """
+    Starts (or joins) the analysis of a trend/survey file in the background.
+
+    Mention counts, keyword themes, top words and lexicon sentiment come from one pass
+    shared by file and catalog digest under every backend; a request without
+    ``catalog_path`` (the parsers do not need mention counts) reuses any pass over the
+    same file. "hybrid" and "llm" add their sentiment on top (see ``sentiment_layer``),
+    shared by file digest and backend. So the Streamlit prefetch is what the trend and
+    survey parsers read, and the charts (backend "local") never wait on an LLM call.
+
+    Returns:
+        concurrent.futures.Future: Resolves to the ``analyze_text`` result with the
+        backend's layer applied.
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"{_LABELS[kind]} TXT file not found: {file_path}")
+    backend = resolve_backend(kind, backend)
+    digest = file_digest(file_path)
+    key = (digest, kind, file_digest(catalog_path) if catalog_path else None)
+
+    with _lock:
+        fallback = None
+        if catalog_path is None:
+            fallback = next((f for k, f in reversed(_analyses.items()) if k[:2] == key[:2]), None)
+        analysis = _cached(
+            _analyses, key, lambda: _executor.submit(propagate_context(_run), file_path, kind, catalog_path), fallback
+        )
+        if backend == "local":
+            return analysis
+        layer = _cached(
+            _layers, (digest, kind, backend),
+            lambda: _layer_executor.submit(propagate_context(_run_layer), analysis, backend),
+        )
+    return _merged(analysis, layer)
+
+
+def get_text_analysis(file_path: str, kind: str, catalog_path: str = None, backend: str = None) -> dict:
+    """Blocking form of ``start_text_analysis``."""
+    return start_text_analysis(file_path, kind, catalog_path, backend).result()
+
+
+def clear_text_analyses() -> None:
+    """Drops every shared analysis and mention index (benchmarks time cold runs)."""
+    with _lock:
+        _analyses.clear()
+        _layers.clear()
+        _mention_indexes.clear()
@@ -0,0 +1,626 @@
+"""
+Compiled binary snapshots of the vendor catalog, sales and competitor inputs.
+
+A snapshot is a directory of ``.npy`` arrays plus a manifest. Numeric columns are
+fixed-width arrays, every string (names, categories, themes, sources) is interned once
+in a NUL-separated UTF-8 table, and the manifest records the source file's SHA-256 and
+each array's dtype and shape. Missing values (NaN) get one reserved id in the table and
+decode back to NaN, as in the parsers' output. Snapshots are opened with memory-mapped arrays, so processes reading
+the same snapshot share one page-cache copy and opening one costs the same at any size.
+
+Snapshots are keyed by (kind, parser version, format version, source content digest),
+compiled on first use through the regular parsers (which validate the input), and
+returned as read-only views with the parsers' usual shapes (see ``open_snapshot``).
+Like the parse cache, snapshots expire after SNAPSHOT_MAX_AGE_SECONDS and the least
+recently opened are pruned beyond SNAPSHOT_MAX_BYTES.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from tools.parse_cache import file_digest
+
+SNAPSHOT_DIR = os.getenv(
+    "SNAPSHOT_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "snapshots")),
+)
+# "on": vendor, sales and competitor parsers return memory-mapped snapshot views
+SNAPSHOTS_ENABLED = os.getenv("SNAPSHOTS", "on").lower() not in ("off", "0", "false")
+SNAPSHOT_MAX_BYTES = int(os.getenv("SNAPSHOT_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", 30 * 24 * 3600))
+# Snapshot views kept open per process; older views are dropped once nothing references them
+MAX_OPEN_SNAPSHOTS = int(os.getenv("SNAPSHOT_OPEN_VIEWS", 16))
+SNAPSHOT_FORMAT_VERSION = 2
+SNAPSHOT_KINDS = ("vendor", "sales", "competitor")
+
+_SEPARATOR = "\0"
+_MANIFEST = "manifest.json"
+_STRINGS = "strings"
+
+_opened = OrderedDict()  # snapshot path -> view, so one process decodes each string table once
+_opened_lock = threading.Lock()
+
+
+def _write_arrays(directory: str, arrays: dict) -> dict:
+    """Saves each array as ``<name>.npy`` and returns its manifest entries."""
+    entries = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        file_name = f"{name}.npy"
+        np.save(os.path.join(directory, file_name), array, allow_pickle=False)
+        entries[name] = {
+            "file": file_name,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+        }
+    return entries
+
+
+def _publish(temp_dir: str, path: str) -> None:
+    """Moves a fully written directory into place; a concurrent writer's copy wins ties."""
+    try:
+        os.rename(temp_dir, path)
+    except OSError:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        if not os.path.isdir(path):
+            raise
+
+
+class StringTable:
+    """
+    Interned strings stored as one NUL-separated UTF-8 blob; a string's id is its position.
+    The entry at ``missing_id`` (if any) stands for a missing value and decodes to NaN.
+    """
+
+    def __init__(self, blob: np.ndarray, count: int, missing_id: int = None):
+        self._blob = blob
+        self._count = count
+        self._missing_id = missing_id
+        self._array = None
+
+    def __len__(self):
+        return self._count
+
+    def array(self) -> np.ndarray:
+        """All strings as an object array, decoded in one pass on first use."""
+        if self._array is None:
+            strings = self._blob.tobytes().decode("utf-8").split(_SEPARATOR) if self._count else []
+            self._array = np.array(strings, dtype=object)
+            if self._missing_id is not None:
+                self._array[self._missing_id] = np.nan
+        return self._array
+
+    def take(self, ids) -> np.ndarray:
+        return self.array()[np.asarray(ids, dtype=np.int64)]
+
+    def __getitem__(self, string_id: int) -> str:
+        return self.array()[string_id]
+
+
+class SnapshotWriter:
+    """Collects interned strings and columns for one snapshot."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.arrays = {}
+        self.meta = {}
+        self._ids = {}
+        self._strings = []
+        self.missing_id = None
+
+    def intern(self, values) -> np.ndarray:
+        """
+        String ids of ``values``, adding unseen strings in first-seen order. None and NaN
+        share one reserved id, so missing cells do not become the string "nan".
+        """
+        ids = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            if value is None or (isinstance(value, float) and value != value):
+                if self.missing_id is None:
+                    self.missing_id = len(self._strings)
+                    self._strings.append("")
+                ids[i] = self.missing_id
+                continue
+            value = str(value)
+            string_id = self._ids.get(value)
+            if string_id is None:
+                if _SEPARATOR in value:
+                    raise ValueError(f"NUL character in {self.kind} value: {value!r}")
+                string_id = self._ids[value] = len(self._strings)
+                self._strings.append(value)
+            ids[i] = string_id
+        return ids
+
+    def write(self, path: str, source_path: str, parser_version) -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=os.path.dirname(path), prefix=".compiling-")
+        try:
+            blob = np.frombuffer(_SEPARATOR.join(self._strings).encode("utf-8"), dtype=np.uint8)
+            manifest = {
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                "kind": self.kind,
+                "parser_version": str(parser_version),
+                "created_at": time.time(),
+                "source": {
+                    "path": os.path.abspath(source_path),
+                    "bytes": os.path.getsize(source_path),
+                    "sha256": file_digest(source_path),
+                },
+                "string_count": len(self._strings),
+                "missing_id": self.missing_id,
+                "meta": self.meta,
+                "arrays": _write_arrays(temp_dir, {_STRINGS: blob, **self.arrays}),
+            }
+            with open(os.path.join(temp_dir, _MANIFEST), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        _publish(temp_dir, path)
+        return path
+
+
+class Snapshot:
+    """A compiled snapshot directory: manifest, memory-mapped arrays and the string table."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, _MANIFEST), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format in {path}")
+        self._arrays = {}
+        self.strings = StringTable(self.array(_STRINGS), self.manifest["string_count"], self.manifest["missing_id"])
+
+    @property
+    def meta(self) -> dict:
+        return self.manifest["meta"]
+
+    def array(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            entry = self.manifest["arrays"][name]
+            file_path = os.path.join(self.path, entry["file"])
+            # Empty arrays cannot be memory-mapped
+            self._arrays[name] = np.load(file_path, mmap_mode="r" if np.prod(entry["shape"]) else None)
+        return self._arrays[name]
+
+    def load_derived(self, name: str):
+        """Memory-mapped arrays derived from this snapshot by ``save_derived``, or None."""
+        directory = os.path.join(self.path, "derived", name)
+        try:
+            with open(os.path.join(directory, _MANIFEST), "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return {
+            key: np.load(os.path.join(directory, entry["file"]), mmap_mode="r" if np.prod(entry["shape"]) else None)
+            for key, entry in entries.items()
+        }
+
+    def save_derived(self, name: str, arrays: dict) -> None:
+        """Stores arrays computed from the snapshot (e.g. a scoring encoding) next to it."""
+        parent = os.path.join(self.path, "derived")
+        os.makedirs(parent, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=parent, prefix=".compiling-")
+        try:
+            entries = _write_arrays(temp_dir, arrays)
+            with open(os.path.join(temp_dir, _MANIFEST), "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        _publish(temp_dir, os.path.join(parent, name))
+
+
+class StringColumn(Sequence):
+    """Read-only sequence of interned strings, decoded on first access."""
+
+    def __init__(self, snapshot: Snapshot, array_name: str):
+        self._snapshot = snapshot
+        self._array_name = array_name
+        self._values = None
+
+    def _decoded(self) -> np.ndarray:
+        if self._values is None:
+            self._values = self._snapshot.strings.take(self._snapshot.array(self._array_name))
+        return self._values
+
+    def __len__(self):
+        return len(self._snapshot.array(self._array_name))
+
+    def __getitem__(self, index):
+        return self._decoded()[index]
+
+    def __iter__(self):
+        return iter(self._decoded().tolist())
+
+    def tolist(self) -> list:
+        return self._decoded().tolist()
+
+    def to_python(self) -> list:
+        return self.tolist()
+
+
+class _KeyedColumns(Mapping):
+    """
+    Read-only name -> {field: value} mapping over snapshot columns. ``names`` and
+    ``field_array`` expose the columns for vectorized joins (see scoring_engine.align_sales).
+    """
+
+    fields = ()
+    int_fields = ()
+
+    def __init__(self, snapshot: Snapshot, prefix: str):
+        self.snapshot = snapshot
+        self._prefix = prefix
+        self._names = StringColumn(snapshot, f"{prefix}name_ids")
+        self._positions = None
+
+    @property
+    def names(self) -> np.ndarray:
+        return self._names._decoded()
+
+    def field_array(self, field: str) -> np.ndarray:
+        if field not in self.fields:
+            return np.zeros(len(self), dtype=np.float64)
+        return np.asarray(self.snapshot.array(f"{self._prefix}{field}"), dtype=np.float64)
+
+    def _record(self, position: int) -> dict:
+        record = {}
+        for field in self.fields:
+            value = self.snapshot.array(f"{self._prefix}{field}")[position]
+            record[field] = int(value) if field in self.int_fields else float(value)
+        return record
+
+    def __getitem__(self, name):
+        if self._positions is None:
+            import pandas as pd
+            self._positions = pd.Index(self.names)
+        try:
+            return self._record(self._positions.get_loc(name))
+        except (KeyError, TypeError):
+            raise KeyError(name)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def to_python(self) -> dict:
+        columns = [self.snapshot.array(f"{self._prefix}{field}").tolist() for field in self.fields]
+        return {
+            name: {
+                field: int(value) if field in self.int_fields else value
+                for field, value in zip(self.fields, values)
+            }
+            for name, *values in zip(self._names.tolist(), *columns)
+        }
+
+    def __reduce__(self):
+        return open_snapshot_dir, (self.snapshot.path,)
+
+
+class SalesSnapshot(_KeyedColumns):
+    """parse_sales_data's {name: {"total_units_sold": int}} over a snapshot."""
+
+    fields = ("total_units_sold",)
+    int_fields = ("total_units_sold",)
+
+    def __init__(self, snapshot: Snapshot):
+        super().__init__(snapshot, "")
+
+    def top(self, n: int = 5) -> list:
+        """(name, units) of the ``n`` best sellers, highest first."""
+        units = self.snapshot.array("total_units_sold")
+        order = np.argsort(-np.asarray(units), kind="stable")[:n]
+        return list(zip(self.names[order].tolist(), np.asarray(units)[order].tolist()))
+
+
+class PriceIndexSnapshot(_KeyedColumns):
+    """parse_competitor_data's "price_index" over a snapshot."""
+
+    fields = ("min_price", "median_price", "max_price", "source_count")
+    int_fields = ("source_count",)
+
+    def __init__(self, snapshot: Snapshot):
+        super().__init__(snapshot, "index_")
+
+    def top_listed(self, n: int = 5) -> list:
+        """(name, listing count) of the ``n`` products competitors list most, highest first."""
+        counts = np.asarray(self.snapshot.array("index_listing_count"))
+        order = np.argsort(-counts, kind="stable")[:n]
+        return list(zip(self.names[order].tolist(), counts[order].tolist()))
+
+    def __reduce__(self):
+        return _open_price_index, (self.snapshot.path,)
+
+
+def _vendor_catalog_class():
+    from tools.parse_vendor_catalog import VendorCatalogColumns
+
+    class SnapshotVendorCatalog(VendorCatalogColumns):
+        """
+        VendorCatalogColumns over a snapshot: prices, category ids and theme CSR arrays are
+        memory-mapped, string columns are decoded from the shared table on first access.
+        Category ids index the snapshot's string table, which doubles as their vocabulary.
+        """
+
+        def __init__(self, snapshot: Snapshot):
+            self.snapshot = snapshot
+            self.category_ids = snapshot.array("category_ids")
+            self.sub_category_ids = snapshot.array("sub_category_ids")
+            self.prices = snapshot.array("prices")
+            self.theme_offsets = snapshot.array("theme_offsets")
+            self.theme_ids = snapshot.array("theme_ids")
+            self.theme_vocab = snapshot.strings.take(snapshot.array("theme_vocab_ids")).tolist()
+            self._columns = {}
+
+        def _column(self, name: str) -> np.ndarray:
+            if name not in self._columns:
+                self._columns[name] = self.snapshot.strings.take(self.snapshot.array(f"{name}_ids"))
+            return self._columns[name]
+
+        names = property(lambda self: self._column("name"))
+        category_vocab = property(lambda self: self.snapshot.strings.array())
+        sub_category_vocab = property(lambda self: self.snapshot.strings.array())
+
+        def __len__(self):
+            return self.snapshot.meta["rows"]
+
+        def name_lookup(self):
+            """(per-product code, unique-name index): names are interned first, in first-seen order."""
+            import pandas as pd
+
+            unique_names = self.snapshot.strings.take(np.arange(self.snapshot.meta["unique_names"]))
+            return np.asarray(self.snapshot.array("name_ids"), dtype=np.int64), pd.Index(unique_names)
+
+        def load_derived(self, name: str):
+            return self.snapshot.load_derived(name)
+
+        def save_derived(self, name: str, arrays: dict) -> None:
+            self.snapshot.save_derived(name, arrays)
+
+        def __reduce__(self):
+            return open_snapshot_dir, (self.snapshot.path,)
+
+    return SnapshotVendorCatalog
+
+
+_SnapshotVendorCatalog = None
+
+
+def _compile_vendor(writer: SnapshotWriter, file_path: str):
+    from tools.parse_vendor_catalog import load_vendor_catalog
+
+    catalog = load_vendor_catalog(file_path, columnar=True)
+    # Names first, so a product's name id is also its pd.factorize code
+    writer.arrays["name_ids"] = writer.intern(catalog.names)
+    writer.meta["unique_names"] = len(writer._strings)
+    writer.meta["rows"] = len(catalog)
+    writer.arrays["category_ids"] = writer.intern(catalog.categories)
+    writer.arrays["sub_category_ids"] = writer.intern(catalog.sub_categories)
+    writer.arrays["theme_vocab_ids"] = writer.intern(catalog.theme_vocab)
+    writer.arrays["prices"] = np.asarray(catalog.prices, dtype=np.float64)
+    writer.arrays["theme_offsets"] = np.asarray(catalog.theme_offsets, dtype=np.int64)
+    writer.arrays["theme_ids"] = np.asarray(catalog.theme_ids, dtype=np.int32)
+
+
+def _compile_sales(writer: SnapshotWriter, file_path: str):
+    from tools.parse_sales_data import parse_sales_data
+
+    sales = parse_sales_data(file_path)
+    writer.arrays["name_ids"] = writer.intern(list(sales))
+    writer.arrays["total_units_sold"] = np.array(
+        [stats["total_units_sold"] for stats in sales.values()], dtype=np.int64
+    )
+
+
+def _compile_competitor(writer: SnapshotWriter, file_path: str):
+    import pandas as pd
+    from tools.parse_competitor_data import parse_competitor_data, COLUMN_DTYPES
+
+    competitor = parse_competitor_data(file_path)
+    index = competitor["price_index"]
+    writer.meta.update({key: competitor[key] for key in ("min_price", "max_price", "avg_price")})
+    writer.arrays["product_ids"] = writer.intern(competitor["products"])
+    writer.arrays["source_ids"] = writer.intern(competitor["sources"])
+    writer.arrays["index_name_ids"] = writer.intern(list(index))
+    for field, dtype in (("min_price", np.float64), ("median_price", np.float64),
+                         ("max_price", np.float64), ("source_count", np.int64)):
+        writer.arrays[f"index_{field}"] = np.array([stats[field] for stats in index.values()], dtype=dtype)
+
+    # Listings per product, for the "most listed" chart
+    counts = pd.Series(0, index=pd.Index(list(index)), dtype=np.int64)
+    reader = pd.read_csv(file_path, usecols=["name"], dtype={"name": COLUMN_DTYPES["name"]}, chunksize=1_000_000)
+    for chunk in reader:
+        counts = counts.add(chunk["name"].value_counts(), fill_value=0).astype(np.int64)
+    writer.arrays["index_listing_count"] = counts.reindex(list(index), fill_value=0).to_numpy(dtype=np.int64)
+
+
+_COMPILERS = {"vendor": _compile_vendor, "sales": _compile_sales, "competitor": _compile_competitor}
+
+
+def _parser_version(kind: str) -> str:
+    from tools import parse_vendor_catalog, parse_sales_data, parse_competitor_data
+
+    modules = {"vendor": parse_vendor_catalog, "sales": parse_sales_data, "competitor": parse_competitor_data}
+    return str(modules[kind].PARSER_VERSION)
+
+
+def snapshot_path(kind: str, file_path: str, snapshot_dir: str = None) -> str:
+    """Directory of the snapshot for the current content of ``file_path``."""
+    key = hashlib.sha256(
+        f"{kind}:{_parser_version(kind)}:{SNAPSHOT_FORMAT_VERSION}:{file_digest(file_path)}".encode("utf-8")
+    ).hexdigest()[:24]
+    return os.path.join(snapshot_dir or SNAPSHOT_DIR, f"{kind}-{key}")
+
+
+def compile_snapshot(kind: str, file_path: str, snapshot_dir: str = None, force: bool = False) -> str:
+    """
+    Validates and compiles ``file_path`` into a snapshot unless one exists for its content.
+
+    Args:
+        kind (str): "vendor", "sales" or "competitor".
+        file_path (str): Source CSV.
+        snapshot_dir (str, optional): Root directory; defaults to SNAPSHOT_DIR.
+        force (bool): Rebuild even if the snapshot exists.
+
+    Returns:
+        str: The snapshot directory.
+    """
+    if kind not in _COMPILERS:
+        raise ValueError(f"Unknown snapshot kind: {kind}")
+    path = snapshot_path(kind, file_path, snapshot_dir)
+    if os.path.isfile(os.path.join(path, _MANIFEST)) and not force:
+        return path
+    if force:
+        shutil.rmtree(path, ignore_errors=True)
+    start = time.perf_counter()
+    writer = SnapshotWriter(kind)
+    _COMPILERS[kind](writer, file_path)
+    writer.write(path, file_path, _parser_version(kind))
+    print(f"📦 Compiled {kind} snapshot in {time.perf_counter() - start:.2f}s: {path}")
+    prune_snapshots(os.path.dirname(path), keep=(path,))
+    return path
+
+
+def _directory_bytes(path: str) -> int:
+    total = 0
+    for directory, _, file_names in os.walk(path):
+        for file_name in file_names:
+            try:
+                total += os.path.getsize(os.path.join(directory, file_name))
+            except OSError:
+                pass
+    return total
+
+
+def prune_snapshots(snapshot_dir: str = None, keep=()) -> None:
+    """
+    Drops expired snapshots, then the least recently opened ones until under
+    SNAPSHOT_MAX_BYTES. Snapshots open in this process and ``keep`` are never removed.
+    """
+    root = snapshot_dir or SNAPSHOT_DIR
+    with _opened_lock:
+        in_use = {os.path.abspath(path) for path in (*_opened, *keep)}
+    try:
+        names = os.listdir(root)
+    except FileNotFoundError:
+        return
+    now = time.time()
+    total = 0
+    candidates = []
+    for name in names:
+        path = os.path.join(root, name)
+        if name.split("-", 1)[0] not in SNAPSHOT_KINDS:
+            continue
+        try:
+            stat = os.stat(os.path.join(path, _MANIFEST))
+        except OSError:
+            continue
+        size = _directory_bytes(path)
+        if os.path.abspath(path) in in_use:
+            total += size
+        elif now - stat.st_mtime > SNAPSHOT_MAX_AGE_SECONDS:
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            total += size
+            candidates.append((stat.st_atime, size, path))
+
+    for _, size, path in sorted(candidates):
+        if total <= SNAPSHOT_MAX_BYTES:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+
+def _view(snapshot: Snapshot):
+    global _SnapshotVendorCatalog
+    kind = snapshot.manifest["kind"]
+    if kind == "vendor":
+        if _SnapshotVendorCatalog is None:
+            _SnapshotVendorCatalog = _vendor_catalog_class()
+        return _SnapshotVendorCatalog(snapshot)
+    if kind == "sales":
+        return SalesSnapshot(snapshot)
+    return {
+        "min_price": snapshot.meta["min_price"],
+        "max_price": snapshot.meta["max_price"],
+        "avg_price": snapshot.meta["avg_price"],
+        "products": StringColumn(snapshot, "product_ids"),
+        "sources": snapshot.strings.take(snapshot.array("source_ids")).tolist(),
+        "price_index": PriceIndexSnapshot(snapshot),
+    }
+
+
+def open_snapshot_dir(path: str, shared: bool = True):
+    """
+    The view of the snapshot at ``path``; ``shared`` reuses the process-wide view (the
+    MAX_OPEN_SNAPSHOTS most recently used are kept).
+    """
+    if not shared:
+        return _view(Snapshot(path))
+    with _opened_lock:
+        view = _opened.get(path)
+        if view is None:
+            view = _opened[path] = _view(Snapshot(path))
+        _opened.move_to_end(path)
+        while len(_opened) > MAX_OPEN_SNAPSHOTS:
+            _opened.popitem(last=False)
+    return view
+
+
+def _open_price_index(path: str) -> PriceIndexSnapshot:
+    return open_snapshot_dir(path)["price_index"]
+
+
+def open_snapshot(kind: str, file_path: str, snapshot_dir: str = None):
+    """
+    Opens (compiling on first use) the snapshot of an input file.
+
+    Returns:
+        The parser-shaped view: a VendorCatalogColumns for "vendor", a read-only
+        {name: {"total_units_sold"}} mapping for "sales", and parse_competitor_data's dict
+        (with a mapping "price_index") for "competitor".
+    """
+    path = compile_snapshot(kind, file_path, snapshot_dir)
+    manifest = os.path.join(path, _MANIFEST)
+    try:
+        # Stamp the access time explicitly (pruning drops the least recently opened first)
+        os.utime(manifest, (time.time(), os.stat(manifest).st_mtime))
+    except OSError:
+        pass
+    return open_snapshot_dir(path)
+
+
+def to_python(value):
+    """``json.dumps`` default hook: converts snapshot views to the parsers' plain types."""
+    if hasattr(value, "to_python"):
+        return value.to_python()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile input files into memory-mapped snapshots.")
+    parser.add_argument("kind", choices=SNAPSHOT_KINDS)
+    parser.add_argument("file_paths", nargs="+")
+    parser.add_argument("--snapshot-dir", default=None)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+    for file_path in args.file_paths:
+        print(compile_snapshot(args.kind, file_path, args.snapshot_dir, args.force))
+
+
+if __name__ == "__main__":
+    main()
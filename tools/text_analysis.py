@@ -0,0 +1,143 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+
+from tools.llm import chat_completion
+
+# "llm": the whole analysis is one LLM prompt (original behaviour)
+# "local": lexicon sentiment, regex keyword themes and Counter word counts, no network
+# "hybrid": local themes and word counts, only the sentiment score comes from the LLM
+ANALYSIS_BACKENDS = ("llm", "local", "hybrid")
+DEFAULT_ANALYSIS_BACKEND = os.getenv("ANALYSIS_BACKEND", "llm").lower()
+
+_WORD_RE = re.compile(r"[a-z]+")
+_TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+# Word-level polarity in [-1, 1], tuned for campus-store feedback and social mentions
+SENTIMENT_LEXICON = {
+    "love": 0.8, "loved": 0.8, "loves": 0.8, "great": 0.7, "perfect": 0.8, "awesome": 0.8,
+    "amazing": 0.8, "excellent": 0.8, "best": 0.7, "good": 0.5, "nice": 0.5, "cool": 0.4,
+    "soft": 0.4, "comfortable": 0.5, "cozy": 0.5, "cute": 0.4, "fun": 0.4, "happy": 0.6,
+    "hit": 0.4, "popular": 0.4, "favorite": 0.6, "lifesaver": 0.7, "recommend": 0.5,
+    "recommended": 0.5, "trending": 0.3, "affordable": 0.4, "compact": 0.2, "loud": 0.1,
+    "useful": 0.4, "helpful": 0.4, "reliable": 0.4, "durable": 0.4, "quality": 0.3,
+    "stylish": 0.4, "gifts": 0.2, "gift": 0.2, "healthy": 0.3, "eco": 0.2, "friendly": 0.3,
+    "ergonomic": 0.2, "adjustable": 0.2, "worth": 0.4, "enjoy": 0.5, "like": 0.2,
+    "bad": -0.6, "poor": -0.6, "terrible": -0.8, "awful": -0.8, "hate": -0.8, "worst": -0.8,
+    "expensive": -0.5, "overpriced": -0.6, "pricey": -0.4, "cheap": -0.2, "broken": -0.7,
+    "broke": -0.6, "slow": -0.4, "late": -0.4, "delayed": -0.5, "missing": -0.4,
+    "disappointed": -0.6, "disappointing": -0.6, "uncomfortable": -0.5, "flimsy": -0.5,
+    "annoying": -0.5, "useless": -0.7, "problem": -0.4, "problems": -0.4, "issue": -0.3,
+    "issues": -0.3, "lack": -0.3, "limited": -0.3, "wish": -0.1, "hard": -0.2,
+    "difficult": -0.4, "noisy": -0.3, "ugly": -0.6, "boring": -0.4, "complain": -0.5,
+}
+_NEGATORS = {"not", "no", "never", "nothing", "hardly", "don't", "doesn't", "didn't",
+             "isn't", "wasn't", "aren't", "weren't", "can't", "won't", "without"}
+_INTENSIFIERS = {"very": 1.4, "really": 1.3, "so": 1.3, "too": 1.3, "extremely": 1.6,
+                 "super": 1.4, "always": 1.2, "especially": 1.2}
+_NEGATION_SCOPE = 3
+
+
+def resolve_backend(parser: str, backend: str = None) -> str:
+    """
+    Picks the analysis backend for ``parser`` ("trend" or "survey"): an explicit argument,
+    then <PARSER>_ANALYSIS_BACKEND, then ANALYSIS_BACKEND (default "llm").
+    """
+    backend = (backend or os.getenv(f"{parser.upper()}_ANALYSIS_BACKEND") or DEFAULT_ANALYSIS_BACKEND).lower()
+    if backend not in ANALYSIS_BACKENDS:
+        raise ValueError(f"Unknown analysis backend for {parser}: {backend}")
+    return backend
+
+
+def read_lines(file_path: str, label: str) -> list:
+    """Reads a text file into its non-empty, stripped lines."""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"{label} TXT file not found: {file_path}")
+    return [line.strip() for line in text.split("\n") if line.strip()]
+
+
+def line_sentiment(line: str) -> float:
+    """
+    Lexicon sentiment of one line in [-1, 1]. Negators flip the next few words and
+    intensifiers scale the next word; the sum is squashed VADER-style.
+    """
+    total = 0.0
+    negate_left = 0
+    boost = 1.0
+    for token in _TOKEN_RE.findall(line.lower()):
+        if token in _NEGATORS:
+            negate_left = _NEGATION_SCOPE
+            continue
+        if token in _INTENSIFIERS:
+            boost = _INTENSIFIERS[token]
+            continue
+        polarity = SENTIMENT_LEXICON.get(token)
+        if polarity is not None:
+            polarity *= boost
+            if negate_left:
+                polarity = -0.75 * polarity
+            total += polarity
+        boost = 1.0
+        negate_left = max(negate_left - 1, 0)
+    return total / math.sqrt(total * total + 1.0)
+
+
+def average_sentiment(lines) -> float:
+    if not lines:
+        return 0.0
+    return round(sum(line_sentiment(line) for line in lines) / len(lines), 3)
+
+
+def compile_keywords(keywords) -> dict:
+    """Case-insensitive whole-word prefix patterns, so "desk" also matches "desks"."""
+    return {keyword: re.compile(rf"\b{re.escape(keyword)}\w*", re.IGNORECASE) for keyword in keywords}
+
+
+def match_themes(lines, keyword_patterns: dict) -> dict:
+    """Maps every keyword to the lines mentioning it; a line may match several keywords."""
+    return {
+        keyword: [line for line in lines if pattern.search(line)]
+        for keyword, pattern in keyword_patterns.items()
+    }
+
+
+def line_words(line: str) -> list:
+    """Alphabetic lowercase words of one line."""
+    return _WORD_RE.findall(line.lower())
+
+
+def top_words(lines, n: int = 20) -> list:
+    """The ``n`` most frequent alphabetic lowercase words as [word, count] pairs."""
+    counts = Counter()
+    for line in lines:
+        counts.update(line_words(line))
+    return [[word, count] for word, count in counts.most_common(n)]
+
+
+def llm_average_sentiment(lines, temperature: float = 0.2) -> float:
+    """Asks the LLM for the average sentiment only (hybrid backend), per chunk for long inputs."""
+    from tools.chunked_analysis import use_chunking, chunked_average_sentiment
+
+    if use_chunking(lines):
+        return chunked_average_sentiment(lines, temperature)
+    prompt = f"""
+Analyze the sentiment of each line below (range -1 to 1) and return the average sentiment rounded to 3 decimals.
+Only respond with a JSON object like {{"average_sentiment": float}}. Do not explain anything.
+
+Lines:
+{json.dumps(lines)}
+"""
+    content = chat_completion(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": prompt.strip()}],
+        temperature=temperature
+    ).strip()
+    try:
+        return float(json.loads(content)["average_sentiment"])
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise ValueError("LLM response could not be parsed as JSON:\n" + content)
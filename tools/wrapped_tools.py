@@ -1,73 +1,148 @@
 import json
-from langchain.tools import tool
-from langchain_core.messages import ToolMessage
-
-from tools.parse_vendor_catalog import parse_vendor_catalog
-from tools.parse_sales_data import parse_sales_data
-from tools.parse_survey_feedback import parse_survey_feedback
-from tools.parse_trend_data import parse_trend_data
-from tools.parse_college_profile import parse_college_profile
-from tools.parse_competitor_data import parse_competitor_data
-
-
-@tool
-def vendor_tool(file_path: str):
-    """Parse the vendor catalog CSV file."""
-    parsed = parse_vendor_catalog(file_path)
-    return ToolMessage(
-        tool_call_id="vendor_tool",
-        content=json.dumps(parsed)
-    )
-
-@tool
-def sales_tool(file_path: str):
-    """Parse the sales data CSV file."""
-    parsed = parse_sales_data(file_path)
-    return ToolMessage(
-        tool_call_id="sales_tool",
-        content=json.dumps(parsed)
-    )
-
-@tool
-def survey_tool(file_path: str):
-    """Parse the survey feedback PDF."""
-    parsed = parse_survey_feedback(file_path)
-    print('\n\nparsed: wrapped: ', parsed)
-    return ToolMessage(
-        tool_call_id="survey_tool",
-        content=json.dumps(parsed)
-    )
-
-@tool
-def trend_tool(file_path: str):
-    """Parse the social trend mentions from text."""
-    parsed = parse_trend_data(file_path)
-    return ToolMessage(
-        tool_call_id="trend_tool",
-        content=json.dumps(parsed)
-    )
-
-@tool
-def college_profile_tool(file_path: str):
-    """Parse the college profile JSON."""
-    parsed = parse_college_profile(file_path)
-    print('\n\nparsed: profile: ', parsed)
-    return ToolMessage(
-        tool_call_id="college_profile_tool",
-        content=json.dumps(parsed)
-    )
-
-@tool
-def competitor_tool(file_path: str):
-    """Parse competitor product pricing data from CSV."""
-    parsed = parse_competitor_data(file_path)
-    return ToolMessage(
-        tool_call_id="competitor_tool",
-        content=json.dumps(parsed)
-    )
+import threading
 
+from tools import (
+    parse_vendor_catalog as vendor_parser,
+    parse_sales_data as sales_parser,
+    parse_survey_feedback as survey_parser,
+    parse_trend_data as trend_parser,
+    parse_college_profile as college_profile_parser,
+    parse_competitor_data as competitor_parser,
+)
+from tools.instrumentation import VERBOSE_LOGS
+from tools.parse_cache import cached_parse
+from tools.sales_aggregator import fold_delta
+from tools.snapshot import SNAPSHOTS_ENABLED, open_snapshot, to_python
+from tools.text_analysis import resolve_backend
+
+
+def parser_version(key: str) -> str:
+    """Version string of the parser for input ``key``, including its analysis backend."""
+    versions = {
+        "vendor": vendor_parser.PARSER_VERSION,
+        "sales": sales_parser.PARSER_VERSION,
+        "survey": f"{survey_parser.PARSER_VERSION}:{resolve_backend('survey')}",
+        "trend": f"{trend_parser.PARSER_VERSION}:{resolve_backend('trend')}",
+        "college_profile": college_profile_parser.PARSER_VERSION,
+        "competitor": competitor_parser.PARSER_VERSION,
+    }
+    return str(versions[key])
+
+def _vendor_columns(file_path: str) -> dict:
+    return vendor_parser.load_vendor_catalog(file_path, columnar=True).to_columns()
+
+def parse_vendor_input(file_path: str):
+    if SNAPSHOTS_ENABLED:
+        return open_snapshot("vendor", file_path)
+    # Cached as flat columns and rebuilt as the compact catalog rather than one dict per product
+    columns = cached_parse("vendor_catalog_columns", parser_version("vendor"), _vendor_columns, file_path)
+    return vendor_parser.VendorCatalogColumns.from_columns(columns)
+
+def parse_sales_input(file_path: str, store_id: str = None, delta: bool = False):
+    # A daily POS delta (opted into by the caller) is folded into its store's running aggregates
+    if delta:
+        return fold_delta(file_path, store_id)
+    if SNAPSHOTS_ENABLED:
+        return open_snapshot("sales", file_path)
+    return cached_parse("parse_sales_data", parser_version("sales"), sales_parser.parse_sales_data, file_path)
+
+def parse_survey_input(file_path: str):
+    return cached_parse("parse_survey_feedback", parser_version("survey"), survey_parser.parse_survey_feedback, file_path)
+
+def parse_trend_input(file_path: str):
+    return cached_parse("parse_trend_data", parser_version("trend"), trend_parser.parse_trend_data, file_path)
+
+def parse_college_profile_input(file_path: str):
+    return cached_parse("parse_college_profile", parser_version("college_profile"), college_profile_parser.parse_college_profile, file_path)
+
+def parse_competitor_input(file_path: str):
+    if SNAPSHOTS_ENABLED:
+        return open_snapshot("competitor", file_path)
+    return cached_parse("parse_competitor_data", parser_version("competitor"), competitor_parser.parse_competitor_data, file_path)
+
+
+# Plain parsers by input key: the in-process path hands their Python results straight
+# to downstream graph nodes, while the tools below wrap them in JSON ToolMessages.
+# With SNAPSHOTS on, vendor, sales and competitor results are memory-mapped snapshot views;
+# a sales delta yields a SalesWindows view of its store's running aggregates (the sales
+# parser alone also takes the store_id and the delta flag).
+PARSERS = {
+    "vendor": parse_vendor_input,
+    "sales": parse_sales_input,
+    "survey": parse_survey_input,
+    "trend": parse_trend_input,
+    "college_profile": parse_college_profile_input,
+    "competitor": parse_competitor_input,
+}
+
+
+# LangChain is only needed for the "toolmessage" handoff, so the tools are built on first use
+_tools = None
+_tools_lock = threading.Lock()
+
+
+def _build_tools():
+    from langchain.tools import tool
+    from langchain_core.messages import ToolMessage
+
+    @tool
+    def vendor_tool(file_path: str):
+        """Parse the vendor catalog CSV file."""
+        parsed = parse_vendor_input(file_path)
+        return ToolMessage(
+            tool_call_id="vendor_tool",
+            content=json.dumps(parsed, default=to_python)
+        )
+
+    @tool
+    def sales_tool(file_path: str, store_id: str = None, delta: bool = False):
+        """Parse the sales data CSV file (a ``delta`` folds into ``store_id``'s aggregates)."""
+        parsed = parse_sales_input(file_path, store_id, delta)
+        return ToolMessage(
+            tool_call_id="sales_tool",
+            content=json.dumps(parsed, default=to_python)
+        )
+
+    @tool
+    def survey_tool(file_path: str):
+        """Parse the survey feedback PDF."""
+        parsed = parse_survey_input(file_path)
+        if VERBOSE_LOGS:
+            print('\n\nparsed: wrapped: ', parsed)
+        return ToolMessage(
+            tool_call_id="survey_tool",
+            content=json.dumps(parsed, default=to_python)
+        )
+
+    @tool
+    def trend_tool(file_path: str):
+        """Parse the social trend mentions from text."""
+        parsed = parse_trend_input(file_path)
+        return ToolMessage(
+            tool_call_id="trend_tool",
+            content=json.dumps(parsed, default=to_python)
+        )
+
+    @tool
+    def college_profile_tool(file_path: str):
+        """Parse the college profile JSON."""
+        parsed = parse_college_profile_input(file_path)
+        if VERBOSE_LOGS:
+            print('\n\nparsed: profile: ', parsed)
+        return ToolMessage(
+            tool_call_id="college_profile_tool",
+            content=json.dumps(parsed, default=to_python)
+        )
+
+    @tool
+    def competitor_tool(file_path: str):
+        """Parse competitor product pricing data from CSV."""
+        parsed = parse_competitor_input(file_path)
+        return ToolMessage(
+            tool_call_id="competitor_tool",
+            content=json.dumps(parsed, default=to_python)
+        )
 
-def get_all_tools():
     return [
         vendor_tool,
         sales_tool,
@@ -75,4 +150,12 @@ def get_all_tools():
         trend_tool,
         college_profile_tool,
         competitor_tool
-    ]
\ No newline at end of file
+    ]
+
+
+def get_all_tools():
+    global _tools
+    with _tools_lock:
+        if _tools is None:
+            _tools = _build_tools()
+    return _tools